@@ -1,5 +1,5 @@
 # app.py - TELJES JAVÍTOTT VÁLTOZAT (2026.02.06)
-from flask import Flask, send_from_directory, render_template, jsonify, current_app
+from flask import Flask, render_template, jsonify, current_app
 from flask_mail import Mail
 from flask_cors import CORS
 from werkzeug.exceptions import HTTPException
@@ -8,12 +8,31 @@ import os  # ← FONTOS: LEGFELÜL!
 from config import Config
 from models import db
 from routes import register_routes
+from membership import init_membership
+from subject_cache import init_subject_cache
+from subject_index import init_subject_catalog
+from email_outbox import init_email_outbox, start_worker as start_email_worker
+from email_templates import init_email_templates
+from notifications import init_notifications, start_fanout
+from broker import init_broker
+from uploads import init_uploads
+from file_serving import init_file_serving
+from derivatives import init_derivatives
+from logging_setup import init_logging
+from metrics import init_metrics
+from query_guard import init_query_guard
 
-def create_app():
+def create_app(start_background=True):
+    """start_background=False: a háttérszálak nem indulnak (gunicorn --preload master, lásd wsgi.py)."""
     app = Flask(__name__)
     
     # 1. CONFIG ELŐBB (OS már importálva!)
     app.config.from_object(Config)
+    # Naplózás elsőként, hogy az inicializálás üzenetei is a JSON/queue úton menjenek (logging_setup.py)
+    init_logging(app)
+    # Kérésenkénti SQL-számlálás és késleltetés, GET /metrics (metrics.py); elöl, hogy a többi hookot is mérje
+    init_metrics(app)
+    init_query_guard(app)
     
     # 2. MAILTRAP CONFIG
     app.config['MAIL_PORT'] = 2525
@@ -24,8 +43,9 @@ def create_app():
     app.config['MAIL_DEFAULT_SENDER'] = 'noreply@studyconnect.hu'
     app.config['ELTE_EMAIL_REGEX'] = r'^[a-zA-Z0-9._%+-]+@(inf|student)\.elte\.hu$'
     
-    # 3. MAX FÁJL MÉRET (BIZTONSÁG)
-    app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024  # 10MB
+    # 3. MAX FÁJL MÉRET (BIZTONSÁG): MAX_CONTENT_LENGTH / UPLOAD_MAX_FILE_SIZE a Config-ból,
+    # a feltöltések streamelt mentése az uploads.UploadRequest-en át
+    init_uploads(app)
     
     # 4. CORS - Frontend támogatása
     CORS(app, 
@@ -54,6 +74,14 @@ def create_app():
     db.init_app(app)
     mail = Mail(app)
     migrate = Migrate(app, db)
+    init_membership(app)
+    init_subject_cache(app)
+    subject_catalog = init_subject_catalog(app)
+    init_email_outbox(app, start=start_background)
+    init_email_templates(app)
+    init_notifications(app, start=start_background)
+    init_broker(app, start=start_background)
+    init_derivatives(app)
 
     # 7. TESZT ROUTES
     @app.route("/")
@@ -68,31 +96,8 @@ def create_app():
     def test_page():
         return render_template("test.html")
 
-    # 8. 🔒 BIZTONSÁGOS FÁJLSZERVER - KRITIKUS!
-    @app.route("/uploads/<path:filepath>")
-    def uploaded_file(filepath):
-        """📁 posts/ és comments/ fájlok kiszolgálása"""
-        UPLOAD_FOLDER = "uploads"  # ← HARDCODE = BIZTOS MŰKÖDIK!
-        
-        # 1. DIRECTORY TRAVERSAL VÉDELEM
-        if '..' in filepath or filepath.startswith('/'):
-            print(f"🚫 BLOCKED: {filepath}")
-            return "Unauthorized!", 403
-        
-        # 2. CSAK ENGEDÉLYEZETT FÁJLTÍPUSOK
-        allowed_ext = {'.pdf', '.png', '.jpg', '.jpeg', '.gif', '.txt', '.docx'}
-        if not any(filepath.lower().endswith(ext) for ext in allowed_ext):
-            print(f"🚫 TYPE BLOCKED: {filepath}")
-            return "Tiltott fájltípus!", 403
-        
-        # 3. BIZTONSÁGOS ÚTVONAL ÉPÍTÉS
-        safe_path = os.path.join(UPLOAD_FOLDER, filepath)
-        if not os.path.exists(safe_path):
-            print(f"❌ 404: {safe_path}")
-            return jsonify({"error": "Fájl nem található"}), 404
-        
-        print(f"✅ Serving: /uploads/{filepath}")
-        return send_from_directory(UPLOAD_FOLDER, filepath)
+    # 8. 🔒 FÁJLSZERVER: /uploads/<path> (ETag, 304, Range, X-Accel-Redirect / X-Sendfile), lásd file_serving.py
+    init_file_serving(app)
 
     # 9. MAIN ROUTES REGISZTRÁLÁSA
     register_routes(app)
@@ -100,9 +105,35 @@ def create_app():
     # 10. DB LÉTREHOZÁS (FEJLESZTÉSI)
     with app.app_context():
         db.create_all()
+        # Offline tárgykatalógus betöltése a memóriabeli indexbe
+        subject_catalog.load_from_db()
 
     return app
 
+
+def start_background(app):
+    """Worker folyamatonkénti indítás a fork után (gunicorn.conf.py post_worker_init).
+
+    A master a create_app alatt (db.create_all, katalógus betöltés) nyitott
+    DB kapcsolatokat; ezeket a worker nem örökölheti, ezért eldobjuk őket.
+    """
+    with app.app_context():
+        db.engine.dispose(close=False)
+    start_email_worker(app)
+    start_fanout(app)
+    app.extensions["broker"].start()
+
+
+def stop_background(app):
+    """Leállításkor (graceful restart) a sorban lévő feladatok még lefutnak."""
+    app.extensions["notifications"].stop()
+    app.extensions["derivatives"].stop()
+    app.extensions["email_outbox"].stop()
+    app.extensions["broker"].close()
+
+
 if __name__ == "__main__":
+    # Fejlesztői szerver; debug (reloader + debugger) csak explicit FLASK_DEBUG=1 mellett.
+    # Élesben: gunicorn -c gunicorn.conf.py wsgi:app
     app = create_app()
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    app.run(host="0.0.0.0", port=int(os.getenv("PORT", 5000)), debug=os.getenv("FLASK_DEBUG") == "1")
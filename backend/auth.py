@@ -0,0 +1,130 @@
+"""JWT kezelés és közös autentikációs réteg a route-okhoz.
+
+A @login_required dekorátor egyszer dekódolja az Authorization fejlécben
+kapott tokent, a user id-t a flask.g.user_id-ba teszi, a User-t pedig a
+current_user() kérésenként legfeljebb egyszer tölti be.
+
+Az ellenőrzött tokenek (claim-ekkel együtt) egy folyamaton belüli LRU
+cache-be kerülnek, amiből a bejegyzés legkésőbb a token `exp` idejekor
+kiesik; ugyanattól a klienstől jövő ismételt kéréseknél így elmarad a HMAC
+és a claim-ellenőrzés. A kulcs a teljes token, nem csak az aláírás: ha csak
+az aláírásra kulcsolnánk, egy módosított payload érvényes aláírással
+átjuthatna az ellenőrzésen.
+"""
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+import jwt  # pyright: ignore[reportMissingImports]
+from flask import g, jsonify, request  # pyright: ignore[reportMissingImports]
+
+from cache import TTLCache
+from config import Config
+from models import db, User
+
+TOKEN_TTL = timedelta(hours=1)
+# Egy cache bejegyzés ennél tovább akkor sem él, ha a token még érvényes
+TOKEN_CACHE_MAX_TTL = 300
+
+_token_cache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_MAX_TTL)
+_stats_lock = threading.Lock()
+token_cache_stats = {"hits": 0, "misses": 0}
+
+
+def create_jwt_token(user_id):
+    expiration = datetime.now(timezone.utc) + TOKEN_TTL
+    payload = {
+        "user_id": user_id,
+        "exp": expiration
+    }
+
+    token = jwt.encode(payload, Config.SECRET_KEY, algorithm="HS256")
+    return token
+
+
+def verify_jwt_token(token):
+    try:
+        data = jwt.decode(token, Config.SECRET_KEY, algorithms=["HS256"])
+        return data
+    except jwt.ExpiredSignatureError:
+        return None
+    except jwt.InvalidTokenError:
+        return None
+
+
+def _count(key):
+    with _stats_lock:
+        token_cache_stats[key] += 1
+
+
+def decode_token(token):
+    """verify_jwt_token cache-elt változata. Érvénytelen/lejárt tokennél None."""
+    claims = _token_cache.get(token)
+    if claims is not None:
+        # A cache TTL az exp-hez igazodik, de a monotonic óra és a falióra eltérhet
+        if claims.get("exp", 0) > time.time():
+            _count("hits")
+            return claims
+        _token_cache.delete(token)
+
+    _count("misses")
+    claims = verify_jwt_token(token)
+    if claims is None:
+        return None
+
+    exp = claims.get("exp")
+    if exp is not None:
+        _token_cache.set(token, claims, ttl=min(TOKEN_CACHE_MAX_TTL, exp - time.time()))
+    return claims
+
+
+def _unauthorized(message):
+    return jsonify({"error": message}), 401
+
+
+def login_required(view=None, *, allow_query_token=False):
+    """Kötelező Bearer token. Siker esetén g.user_id és g.token_claims be van állítva.
+
+    OPTIONS (CORS preflight) kérések ellenőrzés nélkül átmennek.
+    allow_query_token: a token ?token= paraméterben is jöhet (EventSource nem
+    tud fejlécet küldeni); csak streamelő végpontokon használjuk.
+    """
+    if view is None:
+        return lambda v: login_required(v, allow_query_token=allow_query_token)
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if request.method == "OPTIONS":
+            return view(*args, **kwargs)
+
+        auth_header = request.headers.get("Authorization")
+        if not auth_header and allow_query_token and request.args.get("token"):
+            auth_header = f"Bearer {request.args['token']}"
+        if not auth_header:
+            return _unauthorized("Hiányzó token")
+
+        parts = auth_header.split(" ")
+        if len(parts) != 2 or not parts[1]:
+            return _unauthorized("Hibás token")
+
+        claims = decode_token(parts[1])
+        if not claims:
+            return _unauthorized("Érvénytelen vagy lejárt token")
+
+        user_id = claims.get("user_id")
+        if not user_id:
+            return _unauthorized("Token-ben nincs user_id")
+
+        g.user_id = user_id
+        g.token_claims = claims
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def current_user():
+    """A bejelentkezett User, kérésenként legfeljebb egy lekérdezéssel (None, ha törölték)."""
+    if "current_user" not in g:
+        g.current_user = db.session.get(User, g.user_id)
+    return g.current_user
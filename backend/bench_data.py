@@ -0,0 +1,193 @@
+"""Determinisztikus, nagy benchmark adathalmaz (bench_endpoints.py és a smoke teszt használja).
+
+    generate(scale=1.0, seed=7)   – aktív app kontextusban, üres adatbázisba
+
+scale=1.0 mellett nagyjából:
+  * 3000 felhasználó, 40 érdeklődési kör (felhasználónként 2–6),
+  * 8 tárgy × 200 csoport, csoportonként 3–40 tag,
+  * 20 000 poszt, 50 000 komment, 60 000 megtekintés (PostView),
+  * 5 000 esemény, 20 000 értesítés (+ olvasatlan számlálók),
+  * a tárgykatalógus (Subject) 400 sora az offline /subjects/search-höz.
+
+A posztok és kommentek eloszlása hatványszerű (néhány "forró" csoport és
+poszt viszi a forgalom nagyját), ahogy élesben. Ugyanazzal a seed-del és
+scale-lel bájtra ugyanaz az adatbázis jön létre: az id-k explicitek, az
+időbélyegek egy rögzített kezdőponthoz képest számolódnak.
+"""
+import itertools
+import random
+from datetime import datetime, timedelta
+
+from models import (
+    db, Comment, Event, Group, GroupMember, Interest, Notification, NotificationCounter, Post,
+    PostView, Subject, User, user_interests,
+)
+
+EPOCH = datetime(2026, 2, 2, 8, 0, 0)
+YEAR = "2025-2026-2"
+SUBJECTS = [
+    "Analízis I.", "Diszkrét matematika", "Programozás", "Algoritmusok és adatszerkezetek",
+    "Adatbázisok", "Operációs rendszerek", "Számítógépes hálózatok", "Valószínűségszámítás",
+]
+CHUNK = 5000
+
+BASE_COUNTS = {
+    "users": 3000,
+    "interests": 40,
+    "groups_per_subject": 200,
+    "posts": 20000,
+    "comments": 50000,
+    "post_views": 60000,
+    "events": 5000,
+    "notifications": 20000,
+    "catalog": 400,
+}
+MIN_COUNTS = {
+    "users": 20, "interests": 5, "groups_per_subject": 3, "posts": 60, "comments": 150,
+    "post_views": 100, "events": 10, "notifications": 30, "catalog": 20,
+}
+
+
+def counts_for(scale):
+    return {name: max(MIN_COUNTS[name], int(base * scale)) for name, base in BASE_COUNTS.items()}
+
+
+def _insert(table, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(db.insert(table), rows[start:start + CHUNK])
+
+
+def _skewed(rnd, n, k):
+    """k index 0..n-1-ből, 1/(rang) súlyozással (az alacsony indexek a "forrók")."""
+    weights = list(itertools.accumulate(1.0 / (i + 1) for i in range(n)))
+    return rnd.choices(range(n), cum_weights=weights, k=k)
+
+
+def _at(minutes):
+    return EPOCH + timedelta(minutes=minutes)
+
+
+def generate(scale=1.0, seed=7):
+    """Feltölti az (üres) adatbázist; visszaadja a benchmark kérésekhez szükséges azonosítókat."""
+    if db.session.query(User.id).first() is not None:
+        raise RuntimeError("A benchmark adathalmaz üres adatbázist vár")
+
+    rnd = random.Random(seed)
+    n = counts_for(scale)
+    user_ids = range(1, n["users"] + 1)
+
+    _insert(User, [
+        {"id": u, "email": f"bench{u}@inf.elte.hu", "secondary_email": f"bench{u}@gmail.com",
+         "password_hash": "x", "major": rnd.choice(["Programtervező informatikus", "Matematika", "Fizika"]),
+         "name": f"Bench Felhasználó {u}", "is_active": True, "created_at": _at(-u)}
+        for u in user_ids
+    ])
+    _insert(Interest, [{"id": i, "name": f"érdeklődés {i}"} for i in range(1, n["interests"] + 1)])
+    _insert(user_interests, [
+        {"user_id": u, "interest_id": i}
+        for u in user_ids
+        for i in rnd.sample(range(1, n["interests"] + 1), rnd.randint(2, min(6, n["interests"])))
+    ])
+
+    groups = []
+    for subject in SUBJECTS:
+        for k in range(n["groups_per_subject"]):
+            groups.append({
+                "id": len(groups) + 1, "name": f"{subject} – {k + 1}. csoport", "subject": subject,
+                "description": f"Felkészülés: {subject}", "creator_id": rnd.choice(user_ids),
+                "created_at": _at(len(groups)),
+            })
+    _insert(Group, groups)
+    group_ids = [grp["id"] for grp in groups]
+
+    # A benchmark felhasználó (id=1) minden tárgy első pár csoportjában tag, köztük a legforróbb (id=1) csoportban
+    members = {}
+    for grp in groups:
+        size = min(len(user_ids), rnd.randint(3, 40))
+        members[grp["id"]] = set(rnd.sample(user_ids, size))
+    for grp in groups[::n["groups_per_subject"]]:
+        for gid in range(grp["id"], min(grp["id"] + 3, len(groups) + 1)):
+            members[gid].add(1)
+    _insert(GroupMember, [
+        {"group_id": gid, "user_id": u, "joined_at": _at(gid), "role": "member"}
+        for gid in group_ids for u in sorted(members[gid])
+    ])
+    member_lists = {gid: sorted(us) for gid, us in members.items()}
+
+    posts = []
+    for i, g in enumerate(_skewed(rnd, len(group_ids), n["posts"])):
+        gid = group_ids[g]
+        posts.append({
+            "id": i + 1, "title": f"Poszt {i + 1}", "content": "Kérdés a zh-ról. " * rnd.randint(2, 30),
+            "group_id": gid, "author_id": rnd.choice(member_lists[gid]), "created_at": _at(i),
+        })
+    _insert(Post, posts)
+
+    _insert(Comment, [
+        {"id": i + 1, "comment": "Szerintem így: " + "bla " * rnd.randint(2, 40), "post_id": posts[p]["id"],
+         "author_id": rnd.choice(member_lists[posts[p]["group_id"]]), "created_at": _at(p + i)}
+        for i, p in enumerate(_skewed(rnd, len(posts), n["comments"]))
+    ])
+
+    # (user, poszt) páronként egy megtekintés; a forró posztoknál sok az ismétlődő húzás, ezért körökben
+    seen = set()
+    views = []
+    for _ in range(10):
+        for p in _skewed(rnd, len(posts), n["post_views"] - len(views)):
+            post = posts[p]
+            user_id = rnd.choice(member_lists[post["group_id"]])
+            if (user_id, post["id"]) not in seen:
+                seen.add((user_id, post["id"]))
+                views.append({"id": len(views) + 1, "user_id": user_id, "post_id": post["id"],
+                              "viewed_at": _at(p + 60)})
+        if len(views) >= n["post_views"]:
+            break
+    _insert(PostView, views)
+
+    _insert(Event, [
+        {"id": i + 1, "title": f"Konzultáció {i + 1}", "description": "Közös gyakorlás",
+         "event_date": _at(i * 30), "location": f"Déli tömb {rnd.randint(0, 7)}-{rnd.randint(100, 820)}",
+         "group_id": group_ids[g], "creator_id": rnd.choice(member_lists[group_ids[g]]), "created_at": _at(i)}
+        for i, g in enumerate(_skewed(rnd, len(group_ids), n["events"]))
+    ])
+
+    notifications = []
+    unread = {}
+    for i in range(n["notifications"]):
+        # A benchmark felhasználónak is jut bőven (minden tizedik)
+        user_id = 1 if i % 10 == 0 else rnd.choice(user_ids)
+        post = posts[rnd.randrange(len(posts))]
+        is_read = rnd.random() < 0.6
+        notifications.append({
+            "id": i + 1, "user_id": user_id, "type": "new_post", "content": f"Új poszt: {post['title']}",
+            "is_read": is_read, "group_id": post["group_id"], "actor_id": post["author_id"],
+            "ref_id": post["id"], "created_at": _at(i),
+        })
+        if not is_read:
+            unread[user_id] = unread.get(user_id, 0) + 1
+    _insert(Notification, notifications)
+    _insert(NotificationCounter, [{"user_id": u, "unread": c} for u, c in sorted(unread.items())])
+
+    _insert(Subject, [
+        {"id": i + 1, "year": YEAR, "code": f"IP-{i + 1:04d}",
+         "name": f"{SUBJECTS[i % len(SUBJECTS)]} {'gyakorlat' if i % 2 else 'előadás'} {i // len(SUBJECTS) + 1}"}
+        for i in range(n["catalog"])
+    ])
+    db.session.commit()
+
+    # A forró csoport legtöbb kommentet kapó (legalacsonyabb indexű) posztja
+    hot_post = next((post for post in posts if post["group_id"] == 1), posts[0])
+    return {
+        "user_id": 1,
+        "group_id": 1,
+        "post_id": hot_post["id"],
+        "subject": SUBJECTS[0],
+        "search": "Anal",
+        "year": YEAR,
+        "counts": {
+            "users": len(user_ids), "groups": len(groups),
+            "memberships": sum(len(us) for us in members.values()),
+            "posts": len(posts), "comments": n["comments"], "post_views": len(views),
+            "events": n["events"], "notifications": len(notifications), "subjects": n["catalog"],
+        },
+    }
@@ -0,0 +1,199 @@
+"""Olvasó végpontok időmérése nagy, determinisztikus adathalmazon (bench_data.py).
+
+    python bench_endpoints.py --scale 1 --iterations 50 --output bench.json
+    python bench_endpoints.py --compare bench.json              # regresszió esetén kilépési kód 1
+    python bench_endpoints.py --scale 0.1 --only group_posts,post_comments
+
+Egy ideiglenes SQLite adatbázist tölt fel (vagy --database-url, üres DB),
+majd a Flask test clienttel, HTTP szerver nélkül méri a végpontokat:
+végpontonként --warmup bemelegítő és --iterations mért kérés. Az eredmény
+JSON: futási adatok (commit, scale, seed, sorok száma) és végpontonként
+mean/p50/p95/max ms, az SQL utasítások száma (X-Query-Count) és a válasz
+mérete.
+
+--compare egy korábbi JSON-hoz hasonlít: regresszió, ha a p50 több mint
+--tolerance aránnyal (és legalább NOISE_FLOOR_MS-mal) lassabb, vagy ha nőtt
+a lekérdezések száma (ez adatbázistól és géptől független).
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (név, útvonal) – a dataset mezőivel kitöltve
+ENDPOINTS = [
+    ("groups_search", "/groups/search?q={search}"),
+    ("groups_by_subject", "/groups/by-subject?name={subject}"),
+    ("my_groups", "/groups/my-groups"),
+    ("group_posts", "/groups/{group_id}/posts?limit=20"),
+    ("group_members", "/groups/{group_id}/members"),
+    ("group_events", "/groups/{group_id}/events"),
+    ("unread_counts", "/groups/unread-counts"),
+    ("post_comments", "/posts/{post_id}/comments?limit=50"),
+    ("notifications", "/notifications?limit=20"),
+    ("notification_unread_count", "/notifications/unread-count"),
+    ("subjects_search", "/subjects/search?q={search}&year={year}"),
+]
+NOISE_FLOOR_MS = 0.5
+
+
+def _summary(timings):
+    ms = sorted(t * 1000 for t in timings)
+    pct = statistics.quantiles(ms, n=20) if len(ms) > 1 else ms * 19
+    return {
+        "mean_ms": round(statistics.fmean(ms), 3),
+        "p50_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(pct[18], 3),
+        "max_ms": round(ms[-1], 3),
+    }
+
+
+def run_endpoints(client, dataset, iterations=50, warmup=5, only=None):
+    """Végpontonkénti eredmények; a kliens app-jának aktív app kontextusban kell lennie (JWT)."""
+    from auth import create_jwt_token
+
+    client.application.extensions["metrics"].debug_headers = True
+    headers = {"Authorization": f"Bearer {create_jwt_token(dataset['user_id'])}"}
+    results = {}
+    for name, template in ENDPOINTS:
+        if only and name not in only:
+            continue
+        path = template.format(**dataset)
+        for _ in range(warmup):
+            client.get(path, headers=headers)
+
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            res = client.get(path, headers=headers)
+            timings.append(time.perf_counter() - started)
+
+        results[name] = {
+            "path": path,
+            "status": res.status_code,
+            "queries": int(res.headers.get("X-Query-Count", -1)),
+            "bytes": len(res.get_data()),
+            "iterations": iterations,
+            **_summary(timings),
+        }
+    return results
+
+
+def compare(baseline, current, tolerance=0.2):
+    """[(név, régi p50, új p50, régi lekérdezésszám, új lekérdezésszám, regresszió-e)]"""
+    rows = []
+    for name, new in current["endpoints"].items():
+        old = baseline["endpoints"].get(name)
+        if old is None:
+            continue
+        slower = (new["p50_ms"] > old["p50_ms"] * (1 + tolerance)
+                  and new["p50_ms"] - old["p50_ms"] > NOISE_FLOOR_MS)
+        more_queries = new["queries"] > old["queries"]
+        rows.append((name, old["p50_ms"], new["p50_ms"], old["queries"], new["queries"], slower or more_queries))
+    return rows
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scale, seed, iterations, warmup, database_url=None, only=None):
+    workdir = tempfile.mkdtemp(prefix="studybuddy-bench-")
+    os.environ.update({
+        "DATABASE_URL": database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "UPLOAD_FOLDER": os.path.join(workdir, "uploads"),
+        "EMAIL_OUTBOX_WORKER": "off",
+        "NOTIFICATION_FANOUT": "manual",
+        "DERIVATIVES_MODE": "manual",
+        "LOG_LEVEL": os.getenv("LOG_LEVEL", "WARNING"),
+    })
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+    from bench_data import generate
+    from models import db
+
+    try:
+        app = create_app(start_background=False)
+        with app.app_context():
+            started = time.perf_counter()
+            dataset = generate(scale=scale, seed=seed)
+            seed_seconds = time.perf_counter() - started
+            app.extensions["subject_catalog"].load_from_db()
+
+            endpoints = run_endpoints(app.test_client(), dataset, iterations, warmup, only)
+            dialect = db.engine.dialect.name
+            db.session.remove()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "database": dialect,
+            "cpu_count": os.cpu_count(),
+            "scale": scale,
+            "seed": seed,
+            "iterations": iterations,
+            "seed_seconds": round(seed_seconds, 2),
+            "rows": dataset["counts"],
+        },
+        "endpoints": endpoints,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--only", help="Vesszővel elválasztott végpontnevek.")
+    parser.add_argument("--database-url", help="Üres adatbázis (alapból ideiglenes SQLite fájl).")
+    parser.add_argument("--output", help="Az eredmény JSON ide (alapból a stdout-ra).")
+    parser.add_argument("--compare", help="Korábbi eredmény JSON, amihez hasonlítunk.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    only = set(args.only.split(",")) if args.only else None
+    result = run(args.scale, args.seed, args.iterations, args.warmup, args.database_url, only)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+    elif not args.compare:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    failed = [name for name, r in result["endpoints"].items() if r["status"] != 200]
+    for name in failed:
+        print(f"HIBA: {name} -> {result['endpoints'][name]['status']}", file=sys.stderr)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"{'végpont':<28}{'p50 régi':>10}{'p50 új':>10}{'SQL régi':>10}{'SQL új':>8}")
+        for name, old_ms, new_ms, old_q, new_q, regressed in compare(baseline, result, args.tolerance):
+            print(f"{name:<28}{old_ms:>10}{new_ms:>10}{old_q:>10}{new_q:>8}{'  REGRESSZIÓ' if regressed else ''}")
+            if regressed:
+                regressions.append(name)
+
+    sys.exit(1 if failed or regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
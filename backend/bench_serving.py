@@ -0,0 +1,210 @@
+"""Áteresztőképesség: fejlesztői szerver vs. gunicorn, ugyanazon a kérésmixen.
+
+    python bench_serving.py --duration 15 --concurrency 32
+    python bench_serving.py --modes gunicorn --workers 4 --threads 8
+
+Egy ideiglenes SQLite adatbázist tölt fel (csoport, tagok, posztok,
+kommentek, értesítések, egy blob csatolmány), elindítja a szervert a
+választott módban, majd --concurrency párhuzamos keep-alive klienssel
+--duration másodpercig küldi a kérésmixet. Módonként req/s, p50/p95/p99
+késleltetés és hibaszám. Az eredmény a magok számától függ; egymagos
+gépen a több worker előnye nem jön ki.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests  # pyright: ignore[reportMissingImports]
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (súly, útvonal) – a feed megnyitásának tipikus kérései
+MIX = [
+    (40, "/groups/{group_id}/posts?limit=20"),
+    (20, "/posts/{post_id}/comments?limit=50"),
+    (15, "/notifications/unread-count"),
+    (10, "/groups/unread-counts"),
+    (5, "/groups/search?q=Anal"),
+    (10, "{blob_url}"),
+]
+
+
+def seed(env, posts=200, comments_per_post=5, members=50):
+    """Benchmark adatbázis; visszaadja a kérésekhez szükséges azonosítókat és a tokent."""
+    os.environ.update(env)
+    sys.path.insert(0, BACKEND_DIR)
+    from app import create_app
+    from auth import create_jwt_token
+    from models import db, Blob, Comment, Group, GroupMember, Post, PostAttachment, User
+
+    app = create_app(start_background=False)
+    with app.app_context():
+        users = [
+            {"email": f"bench{u}@inf.elte.hu", "secondary_email": f"bench{u}@gmail.com",
+             "password_hash": "x", "major": "Informatika", "name": f"Bench {u}", "is_active": True}
+            for u in range(members)
+        ]
+        db.session.execute(db.insert(User), users)
+        user_ids = [u.id for u in User.query.order_by(User.id)]
+        group = Group(name="Analízis bench", subject="Analízis", creator_id=user_ids[0])
+        db.session.add(group)
+        db.session.flush()
+        db.session.execute(db.insert(GroupMember), [{"group_id": group.id, "user_id": u} for u in user_ids])
+
+        rnd = random.Random(7)
+        db.session.execute(db.insert(Post), [
+            {"title": f"Poszt {i}", "content": "x" * rnd.randint(50, 500), "group_id": group.id,
+             "author_id": rnd.choice(user_ids)}
+            for i in range(posts)
+        ])
+        post_ids = [p.id for p in Post.query.order_by(Post.id)]
+        db.session.execute(db.insert(Comment), [
+            {"comment": "válasz " * 10, "post_id": p, "author_id": rnd.choice(user_ids)}
+            for p in post_ids for _ in range(comments_per_post)
+        ])
+
+        payload = os.urandom(256 * 1024)
+        digest = hashlib.sha256(payload).hexdigest()
+        key = f"blobs/{digest[:2]}/{digest}"
+        os.makedirs(os.path.join(env["UPLOAD_FOLDER"], os.path.dirname(key)), exist_ok=True)
+        with open(os.path.join(env["UPLOAD_FOLDER"], key), "wb") as f:
+            f.write(payload)
+        blob = Blob(sha256=digest, size=len(payload), path=key, ref_count=1)
+        db.session.add(blob)
+        db.session.flush()
+        db.session.add(PostAttachment(post_id=post_ids[-1], filename="eloadas.pdf", file_url=f"/uploads/{key}.pdf",
+                                      mime_type="application/pdf", blob_id=blob.id))
+        db.session.commit()
+
+        return {
+            "group_id": group.id,
+            "post_id": post_ids[-1],
+            "blob_url": f"/uploads/{key}.pdf",
+            "token": create_jwt_token(user_ids[1]),
+        }
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode, port, env, workers, threads):
+    env = {**os.environ, **env, "PORT": str(port)}
+    if mode == "dev":
+        cmd = [sys.executable, "-m", "flask", "--app", "app", "run", "--port", str(port)]
+    else:
+        env.update(WEB_CONCURRENCY=str(workers), GUNICORN_THREADS=str(threads), GUNICORN_ACCESS_LOG="")
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--bind", f"127.0.0.1:{port}", "wsgi:app"]
+    proc = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except requests.RequestException:
+            if proc.poll() is not None:
+                raise RuntimeError(f"{mode} szerver nem indult el (kilépési kód: {proc.returncode})")
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError(f"{mode} szerver nem válaszolt 30 mp alatt")
+
+
+def run_load(port, ids, duration, concurrency):
+    paths = [path.format(**ids) for weight, path in MIX for _ in range(weight)]
+    headers = {"Authorization": f"Bearer {ids['token']}"}
+    latencies, errors, lock = [], [0], threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def client(seed_):
+        rnd = random.Random(seed_)
+        session = requests.Session()
+        local, failed = [], 0
+        while time.monotonic() < deadline:
+            started = time.perf_counter()
+            try:
+                res = session.get(f"http://127.0.0.1:{port}{rnd.choice(paths)}", headers=headers, timeout=30)
+                ok = res.status_code < 400
+            except requests.RequestException:
+                ok = False
+            local.append(time.perf_counter() - started)
+            failed += not ok
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(concurrency) as pool:
+        for i in range(concurrency):
+            pool.submit(client, i)
+    elapsed = time.monotonic() - started
+
+    latencies.sort()
+    pct = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0] * 99
+    return {
+        "requests": len(latencies),
+        "errors": errors[0],
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(pct[49] * 1000, 1),
+        "p95_ms": round(pct[94] * 1000, 1),
+        "p99_ms": round(pct[98] * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", default="dev,gunicorn")
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--json", action="store_true", help="Eredmény JSON-ként a stdout-ra.")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="studybuddy-bench-")
+    env = {
+        "DATABASE_URL": f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        "UPLOAD_FOLDER": os.path.join(workdir, "uploads"),
+        "SECRET_KEY": os.getenv("SECRET_KEY", "bench-secret"),
+        "EMAIL_OUTBOX_WORKER": "off",
+        "NOTIFICATION_FANOUT": "manual",
+        "FLASK_DEBUG": "0",
+    }
+    results = {}
+    try:
+        ids = seed(env)
+        for mode in args.modes.split(","):
+            port = free_port()
+            proc = start_server(mode, port, env, args.workers, args.threads)
+            try:
+                run_load(port, ids, min(2, args.duration), args.concurrency)  # bemelegítés
+                results[mode] = run_load(port, ids, args.duration, args.concurrency)
+            finally:
+                proc.terminate()
+                proc.wait(15)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps({"cpu_count": os.cpu_count(), "concurrency": args.concurrency, "results": results}))
+        return
+    print(f"{'mód':<10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'hiba':>8}")
+    for mode, r in results.items():
+        print(f"{mode:<10}{r['rps']:>10}{r['p50_ms']:>10}{r['p95_ms']:>10}{r['p99_ms']:>10}{r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""Tartalom szerint címzett csatolmány-tárolás, deduplikációval.
+
+Minden feltöltött fájl a SHA-256-ja alapján kerül a helyére, kiterjesztés
+nélkül:
+
+    UPLOAD_FOLDER/blobs/<sha[:2]>/<sha256>
+
+Egy tartalomhoz egy Blob sor és egy fájl tartozik; a PostAttachment és
+CommentAttachment sorok blob_id-val hivatkoznak rá, a ref_count a
+hivatkozások száma. A kiterjesztés (és így a kiszolgált Content-Type) a
+csatolmány sorhoz tartozik: a file_url "/uploads/blobs/<sha[:2]>/<sha256><ext>"
+a saját fájlnevéből kapja, a kiszolgálás ezt a blob fájljára képezi le:
+ugyanaz a tartalom .txt-ként és .pdf-ként feltöltve egy fájl, két URL.
+
+Ha már ismert tartalom érkezik újra (ugyanaz az előadás-PDF több
+csoportba), az ideiglenes fájl eldobódik, és csak a számláló nő: nincs
+második fájl, nincs fsync/rename.
+
+A számláló növelése és csökkentése ugyanabban a tranzakcióban fut, mint a
+csatolmány sor beszúrása/törlése, így a kettő nem csúszik szét. Ha a
+számláló 0-ra esik, a Blob sor ugyanebben a tranzakcióban törlődik, a
+fájlt (és a bélyegképeit, lásd derivatives.py) pedig a hívó a commit után
+távolítja el (remove_garbage). Ami ebből mégis kimarad (pl. commit előtt
+elhalt kérés után árván maradt fájl), azt a "manage.py gc-blobs"
+(collect_garbage) takarítja.
+"""
+import logging
+import os
+import time
+
+from sqlalchemy.exc import IntegrityError  # pyright: ignore[reportMissingImports]
+
+import uploads
+from models import db, Blob, CommentAttachment, PostAttachment
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = "blobs"
+
+
+def blob_key(sha256):
+    return f"{BLOB_DIR}/{sha256[:2]}/{sha256}"
+
+
+def attachment_url(sha256, filename):
+    """A csatolmány URL-je: a blob kulcsa + a feltöltött fájlnév kiterjesztése."""
+    return uploads.url_for_key(blob_key(sha256) + os.path.splitext(filename)[1].lower())
+
+
+def _acquire(blob_id):
+    """ref_count += 1 egyetlen UPDATE-tel; False, ha a blobot közben törölték."""
+    return Blob.query.filter_by(id=blob_id).update(
+        {"ref_count": Blob.ref_count + 1}, synchronize_session=False
+    ) == 1
+
+
+def _place(spool, key):
+    path = uploads.path_for_key(key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    spool.commit_to(path)
+
+
+def store(file_storage):
+    """Feltöltött fájl -> blob + hivatkozás. A hívó commitol a csatolmány sorral együtt."""
+    filename = uploads.safe_filename(file_storage)
+    spool = uploads.spool(file_storage)
+    digest = spool.hexdigest()
+
+    blob = Blob.query.filter_by(sha256=digest).first()
+    if blob is not None and _acquire(blob.id):
+        if os.path.exists(uploads.path_for_key(blob.path)):
+            spool.close()
+        else:
+            # A sor megvan, a fájl nincs (pl. kézi takarítás): a mostani feltöltésből pótoljuk
+            _place(spool, blob.path)
+    else:
+        key = blob_key(digest)
+        _place(spool, key)
+        blob = Blob(sha256=digest, size=spool.size, path=key, ref_count=1)
+        try:
+            with db.session.begin_nested():
+                db.session.add(blob)
+        except IntegrityError:
+            # Párhuzamos feltöltés ugyanezzel a tartalommal előbb szúrta be: azt használjuk
+            blob = Blob.query.filter_by(sha256=digest).one()
+            _acquire(blob.id)
+
+    return uploads.StoredFile(
+        path=uploads.path_for_key(blob.path),
+        url=attachment_url(digest, filename),
+        filename=filename,
+        mime_type=file_storage.content_type,
+        sha256=digest,
+        size=spool.size,
+        blob_id=blob.id,
+        thumbnail_url=_url(blob.thumbnail_path),
+        preview_url=_url(blob.preview_path),
+    )
+
+
+def _url(key):
+    return uploads.url_for_key(key) if key else None
+
+
+def _keys(blob_path, thumbnail_path, preview_path):
+    return [key for key in (blob_path, thumbnail_path, preview_path) if key]
+
+
+def release(blob_id):
+    """Egy hivatkozás elengedése (a csatolmány sor törlése után, még commit előtt).
+
+    Ha ez volt az utolsó, a Blob sor is törlődik; ilyenkor a commit után
+    törlendő fájlok (eredeti + származékok) kulcsait adja vissza, egyébként üres listát.
+    """
+    db.session.flush()
+    Blob.query.filter_by(id=blob_id).update({"ref_count": Blob.ref_count - 1}, synchronize_session=False)
+
+    row = (
+        db.session.query(Blob.path, Blob.thumbnail_path, Blob.preview_path)
+        .filter(Blob.id == blob_id, Blob.ref_count <= 0)
+        .first()
+    )
+    if row is None:
+        return []
+    Blob.query.filter(Blob.id == blob_id, Blob.ref_count <= 0).delete(synchronize_session=False)
+    return _keys(*row)
+
+
+def remove_garbage(keys):
+    """A release() által visszaadott fájlok törlése, a commit után."""
+    if not keys:
+        return
+    # Ha közben ugyanez a tartalom újra feltöltődött, a fájljai megmaradnak
+    if db.session.query(Blob.id).filter(Blob.path == keys[0]).first() is not None:
+        return
+    for key in keys:
+        uploads.remove_file(uploads.url_for_key(key))
+
+
+def delete_attachment(attachment):
+    """Csatolmány sor törlése és commit; a fájl csak akkor törlődik, ha már senki sem hivatkozik rá."""
+    blob_id, file_url = attachment.blob_id, attachment.file_url
+    db.session.delete(attachment)
+    keys = release(blob_id) if blob_id is not None else []
+    db.session.commit()
+
+    try:
+        if blob_id is not None:
+            remove_garbage(keys)
+        else:
+            # Régi, saját fájlos csatolmány
+            uploads.remove_file(file_url)
+    except OSError:
+        logger.exception("csatolmány fájl törlése sikertelen", extra={"blob_id": blob_id, "file_url": file_url})
+
+
+def collect_garbage(min_age=3600):
+    """Számlálók újraszámolása a csatolmányokból, hivatkozatlan blobok és árva fájlok törlése.
+
+    A min_age másodpercnél frissebb fájlokhoz nem nyúl (folyamatban lévő
+    feltöltés lehet). Visszaadja: (törölt sorok, törölt fájlok).
+    """
+    refs = (
+        db.select(db.func.count()).select_from(PostAttachment).where(PostAttachment.blob_id == Blob.id)
+        .scalar_subquery()
+        + db.select(db.func.count()).select_from(CommentAttachment).where(CommentAttachment.blob_id == Blob.id)
+        .scalar_subquery()
+    )
+    Blob.query.update({"ref_count": refs}, synchronize_session=False)
+    deleted_rows = Blob.query.filter(Blob.ref_count <= 0).delete(synchronize_session=False)
+    db.session.commit()
+
+    known = {
+        key
+        for row in db.session.query(Blob.path, Blob.thumbnail_path, Blob.preview_path)
+        for key in _keys(*row)
+    }
+    root = uploads.upload_root()
+    cutoff = time.time() - min_age
+    deleted_files = 0
+    for dirpath, _, files in os.walk(os.path.join(root, BLOB_DIR)):
+        for name in files:
+            path = os.path.join(dirpath, name)
+            key = os.path.relpath(path, root).replace(os.sep, "/")
+            if key not in known and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                deleted_files += 1
+    return deleted_rows, deleted_files
@@ -0,0 +1,226 @@
+"""Folyamaton belüli pub/sub a GET /stream (Server-Sent Events) végponthoz.
+
+Csatornák: "group:<id>" (új poszt, komment, esemény) és "user:<id>"
+(olvasottság, tagság változása). Minden feliratkozás egy korlátos sor; ha
+egy lassú kliens sora betelik, az újabb eseményeket eldobjuk és a
+feliratkozás "lagged" lesz, a stream ilyenkor resync eseményt küld (a
+kliens egyszer újratölti a listáit), így egy kliens sem tudja a publikálót
+blokkolni vagy a memóriát elfogyasztani.
+
+A backend cserélhető (BROKER_BACKEND):
+  * memory – csak az adott folyamat feliratkozói kapják meg (alapértelmezett),
+  * redis  – PUBLISH egy közös csatornára, minden worker egy listener szálon
+    át kézbesíti a saját feliratkozóinak, így a több workeres telepítésben
+    is mindenki megkapja az eseményt.
+
+Több workeres futásnál (SERVER_WORKERS > 1, gunicorn) a memory backenddel
+a streamek az események egy részét csendben elveszítenék (a publikáló
+kérés másik workerre esett), ezért ilyenkor a broker "disabled", és a
+GET /stream 503-at ad, amíg BROKER_BACKEND nem redis.
+
+Egy nyitott stream a gthread worker egy szálát foglalja (sse.MAX_SECONDS-ig),
+ezért a worker egyszerre legfeljebb STREAM_MAX_CONNECTIONS feliratkozást
+enged (0: korlátlan; a gunicorn.conf.py a stream-szálak számára állítja),
+a többi kérésnek így mindig marad szabad szál.
+"""
+import itertools
+import json
+import logging
+import os
+import queue
+import threading
+
+from flask import current_app  # pyright: ignore[reportMissingImports]
+
+SUBSCRIPTION_QUEUE_SIZE = 256
+
+
+class BrokerFull(Exception):
+    """Elfogyott a workeren a stream-helyek száma (STREAM_MAX_CONNECTIONS)."""
+
+logger = logging.getLogger(__name__)
+
+
+def group_channel(group_id):
+    return f"group:{group_id}"
+
+
+def user_channel(user_id):
+    return f"user:{user_id}"
+
+
+class Subscription:
+    def __init__(self, broker, channels, maxsize=SUBSCRIPTION_QUEUE_SIZE):
+        self._broker = broker
+        self.channels = set(channels)
+        self._queue = queue.Queue(maxsize=maxsize)
+        self.lagged = False
+        self.closed = False
+
+    def _put(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.lagged = True
+
+    def get(self, timeout=None):
+        """A következő esemény, vagy None, ha timeout alatt nem jött semmi."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def add(self, channel):
+        self._broker._attach(self, channel)
+
+    def remove(self, channel):
+        self._broker._detach(self, channel)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            for channel in list(self.channels):
+                self._broker._detach(self, channel)
+            self._broker._release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class MemoryBackend:
+    def start(self, deliver):
+        self._deliver = deliver
+
+    def publish(self, channel, event):
+        self._deliver(channel, event)
+
+    def stop(self):
+        pass
+
+
+class RedisBackend:
+    def __init__(self, client, channel="studybuddy:events"):
+        self.client = client
+        self.channel = channel
+        self._thread = None
+        self._pubsub = None
+
+    def start(self, deliver):
+        self._pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(self.channel)
+
+        def listen():
+            for message in self._pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                data = json.loads(message["data"])
+                deliver(data["channel"], data["event"])
+
+        self._thread = threading.Thread(target=listen, name="broker-redis", daemon=True)
+        self._thread.start()
+
+    def publish(self, channel, event):
+        self.client.publish(self.channel, json.dumps({"channel": channel, "event": event}))
+
+    def stop(self):
+        if self._pubsub is not None:
+            self._pubsub.close()
+
+
+class Broker:
+    def __init__(self, backend=None, start=True, enabled=True, max_subscriptions=0):
+        self.backend = backend or MemoryBackend()
+        self.enabled = enabled
+        self.max_subscriptions = max_subscriptions
+        self._open = 0
+        self._subscribers = {}  # channel -> set(Subscription)
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._started = False
+        if start:
+            self.start()
+
+    def start(self):
+        """A backend indítása (redis: listener szál + saját kapcsolat, ezért fork után kell)."""
+        if not self._started:
+            self._started = True
+            self.backend.start(self._deliver)
+
+    def subscribe(self, channels, maxsize=SUBSCRIPTION_QUEUE_SIZE):
+        """Új feliratkozás; BrokerFull, ha már max_subscriptions nyitott feliratkozás van."""
+        with self._lock:
+            if self.max_subscriptions and self._open >= self.max_subscriptions:
+                raise BrokerFull()
+            self._open += 1
+        subscription = Subscription(self, (), maxsize=maxsize)
+        for channel in channels:
+            self._attach(subscription, channel)
+        return subscription
+
+    def _attach(self, subscription, channel):
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+            subscription.channels.add(channel)
+
+    def _release(self):
+        with self._lock:
+            self._open -= 1
+
+    def _detach(self, subscription, channel):
+        with self._lock:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+            subscription.channels.discard(channel)
+
+    def publish(self, channel, event_type, data):
+        self.backend.publish(channel, {"type": event_type, "data": data})
+
+    def _deliver(self, channel, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        if not subscribers:
+            return
+        event = {**event, "id": next(self._ids)}
+        for subscription in subscribers:
+            subscription._put(event)
+
+    def subscriber_count(self):
+        with self._lock:
+            return len({s for subs in self._subscribers.values() for s in subs})
+
+    def close(self):
+        self.backend.stop()
+
+
+def init_broker(app, start=True):
+    backend_name = app.config.get("BROKER_BACKEND", os.getenv("BROKER_BACKEND", "memory"))
+
+    if backend_name == "redis":
+        import redis  # pyright: ignore[reportMissingImports]
+
+        backend = RedisBackend(redis.Redis.from_url(app.config.get("REDIS_URL", os.getenv("REDIS_URL"))))
+        enabled = True
+    else:
+        backend = MemoryBackend()
+        enabled = int(app.config.get("SERVER_WORKERS", 1)) <= 1
+        if not enabled:
+            logger.warning("Több worker fut, de BROKER_BACKEND=%s: a GET /stream kikapcsolva "
+                           "(BROKER_BACKEND=redis kell hozzá)", backend_name)
+
+    max_subscriptions = int(app.config.get("STREAM_MAX_CONNECTIONS", os.getenv("STREAM_MAX_CONNECTIONS", 0)))
+    app.extensions["broker"] = Broker(backend, start=start, enabled=enabled, max_subscriptions=max_subscriptions)
+    return app.extensions["broker"]
+
+
+def get_broker():
+    return current_app.extensions["broker"]
+
+
+def publish(channel, event_type, data):
+    get_broker().publish(channel, event_type, data)
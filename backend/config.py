@@ -1,5 +1,7 @@
 import os
 
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+
 class Config:
     # ENV-ből olvassa (Render/Railway), local fallback
     db_url = os.getenv('DATABASE_URL') or os.getenv('MYSQL_URL') or 'mysql+pymysql://user:password@db:3306/studybuddy'
@@ -8,3 +10,58 @@ class Config:
         db_url = db_url.replace('mysql://', 'mysql+pymysql://', 1)
     
     SQLALCHEMY_DATABASE_URI = db_url
+
+    SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-key-change-me")
+
+    # Olvasottság követése: "postview" (posztonkénti PostView sorok) vagy
+    # "watermark" (csoportonkénti vízjel + PostView kivételek, lásd read_tracking.py)
+    READ_TRACKING_MODE = os.getenv('READ_TRACKING_MODE', 'postview')
+
+    # Tárgykereső: a tanrend proxy címe (a válaszokat a subject_cache tárolja)
+    TANREND_API_URL = os.getenv('TANREND_API_URL', 'https://elte-orarend.vercel.app')
+
+    # Kimenő email sor (email_outbox.py): "thread" = háttérszál az app folyamatában,
+    # "off" = külön folyamat küld (`python manage.py email-worker`)
+    EMAIL_OUTBOX_WORKER = os.getenv('EMAIL_OUTBOX_WORKER', 'thread')
+
+    # Értesítés fan-out: "thread" = háttérszál, "manual" = csak drain() futtatja (tesztek)
+    NOTIFICATION_FANOUT = os.getenv('NOTIFICATION_FANOUT', 'thread')
+
+    # Naplózás (logging_setup.py): gyökér szint, modulonkénti szintek ("routes=DEBUG,..."),
+    # szintenkénti mintavétel ("DEBUG=0.05"), formátum ("json" | "text")
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.getenv('LOG_LEVELS', '')
+    LOG_SAMPLE_RATES = os.getenv('LOG_SAMPLE_RATES', '')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+
+    # Metrikák (metrics.py, GET /metrics): METRICS_DIR = a workerek pillanatképeinek közös mappája
+    # (gunicorn), METRICS_TOKEN = Bearer token a végponthoz (üres: nyitott),
+    # QUERY_DEBUG_HEADERS = X-Query-Count / Server-Timing fejlécek (alapból csak FLASK_DEBUG=1 mellett)
+    METRICS_DIR = os.getenv('METRICS_DIR', '')
+    METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', 5))
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+    QUERY_DEBUG_HEADERS = os.getenv('QUERY_DEBUG_HEADERS', os.getenv('FLASK_DEBUG', '0')) == '1'
+
+    # N+1 / lekérdezés-keret ellenőrzés (query_guard.py): "off" | "warn" | "raise" (tesztek)
+    QUERY_GUARD = os.getenv('QUERY_GUARD', 'off')
+    QUERY_GUARD_THRESHOLD = int(os.getenv('QUERY_GUARD_THRESHOLD', 3))
+
+    # Feltöltések (uploads.py): gyökérmappa, fájlonkénti és kérésenkénti méretkorlát bájtban
+    UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', os.path.join(BASE_DIR, 'uploads'))
+    UPLOAD_MAX_FILE_SIZE = int(os.getenv('UPLOAD_MAX_FILE_SIZE', 10 * 1024 * 1024))
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_REQUEST_SIZE', 10 * 1024 * 1024))
+
+    # Fájlkiszolgálás (file_serving.py): "" = a Flask küldi, "x-accel" = nginx X-Accel-Redirect
+    # (az UPLOAD_ACCEL_PREFIX egy internal location az UPLOAD_FOLDER-re), "x-sendfile" = Apache/lighttpd
+    UPLOAD_SENDFILE = os.getenv('UPLOAD_SENDFILE', '')
+    UPLOAD_ACCEL_PREFIX = os.getenv('UPLOAD_ACCEL_PREFIX', '/protected-uploads')
+
+    # Bélyegkép/előnézet készítés (derivatives.py): "thread" = háttér pool, "manual" = csak drain() (tesztek)
+    DERIVATIVES_MODE = os.getenv('DERIVATIVES_MODE', 'thread')
+    DERIVATIVE_WORKERS = int(os.getenv('DERIVATIVE_WORKERS', 2))
+
+    # A kiszolgáló folyamatok száma (a gunicorn.conf.py állítja be). Több worker mellett a "memory"
+    # tagság-cache és SSE broker csak a saját folyamatában látszik, ezért ilyenkor a tagság-cache
+    # kikapcsol, a /stream pedig 503-at ad: MEMBERSHIP_CACHE_BACKEND=redis, BROKER_BACKEND=redis és
+    # REDIS_URL kell hozzájuk
+    SERVER_WORKERS = int(os.getenv('SERVER_WORKERS', 1))
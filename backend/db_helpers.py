@@ -0,0 +1,93 @@
+"""Dialektus-függő SQL segédfüggvények (MySQL élesben, SQLite a tesztekben)."""
+from sqlalchemy.dialects import mysql, postgresql, sqlite  # pyright: ignore[reportMissingImports]
+
+from models import db
+
+
+def upsert(model, values, update_columns):
+    """INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE egyetlen utasításként.
+
+    values: a beszúrandó sor (dict), update_columns: ütközéskor felülírandó oszlopok nevei.
+    """
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+    update = {name: values[name] for name in update_columns}
+
+    if dialect == "mysql":
+        stmt = mysql.insert(table).values(**values).on_duplicate_key_update(**update)
+    elif dialect in ("sqlite", "postgresql"):
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(table).values(**values).on_conflict_do_update(
+            index_elements=[c.name for c in table.primary_key.columns],
+            set_=update,
+        )
+    else:
+        raise NotImplementedError(f"upsert nem támogatott: {dialect}")
+
+    return db.session.execute(stmt)
+
+
+def insert_ignore(model, rows):
+    """INSERT IGNORE (MySQL) / INSERT OR IGNORE (SQLite) / ON CONFLICT DO NOTHING több sorra.
+
+    Az egyedi kulcsba ütköző sorokat (pl. egy párhuzamos kérés épp beszúrta)
+    csendben kihagyja. Visszaadja a ténylegesen beszúrt sorok számát.
+    """
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        stmt = postgresql.insert(table).on_conflict_do_nothing()
+    elif dialect in ("mysql", "sqlite"):
+        stmt = db.insert(table).prefix_with("IGNORE", dialect="mysql").prefix_with("OR IGNORE", dialect="sqlite")
+    else:
+        raise NotImplementedError(f"insert_ignore nem támogatott: {dialect}")
+
+    return db.session.execute(stmt, rows).rowcount
+
+
+def insert_ignore_from_select(model, columns, select):
+    """INSERT IGNORE ... SELECT (MySQL) / INSERT OR IGNORE ... SELECT (SQLite) egyetlen utasításként.
+
+    Az egyedi kulcsba ütköző sorokat csendben kihagyja, így párhuzamos kérések
+    sem dobnak IntegrityError-t. Visszaadja a ténylegesen beszúrt sorok számát.
+    """
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "postgresql":
+        stmt = postgresql.insert(table).from_select(columns, select).on_conflict_do_nothing()
+    elif dialect in ("mysql", "sqlite"):
+        stmt = (
+            db.insert(table)
+            .from_select(columns, select)
+            .prefix_with("IGNORE", dialect="mysql")
+            .prefix_with("OR IGNORE", dialect="sqlite")
+        )
+    else:
+        raise NotImplementedError(f"insert_ignore nem támogatott: {dialect}")
+
+    return db.session.execute(stmt).rowcount
+
+
+def upsert_from_select(model, columns, select, update):
+    """INSERT ... SELECT ... ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE egyetlen utasításként.
+
+    update: {oszlopnév: kifejezés} ütközéskor, pl. {"unread": table.c.unread + 1}.
+    """
+    table = model.__table__
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "mysql":
+        stmt = mysql.insert(table).from_select(columns, select).on_duplicate_key_update(**update)
+    elif dialect in ("sqlite", "postgresql"):
+        # SQLite-nál a SELECT-nek kell WHERE, különben az ON CONFLICT nem értelmezhető
+        insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+        stmt = insert(table).from_select(columns, select).on_conflict_do_update(
+            index_elements=[c.name for c in table.primary_key.columns],
+            set_=update,
+        )
+    else:
+        raise NotImplementedError(f"upsert nem támogatott: {dialect}")
+
+    return db.session.execute(stmt)
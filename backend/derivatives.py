@@ -0,0 +1,269 @@
+"""Bélyegképek és előnézetek a csatolmányokhoz, a kérésen kívül.
+
+Feltöltés után a route (commit után) csak beküldi a blob id-t a poolba
+(enqueue_for); a renderelés egy ThreadPoolExecutor-ban fut. A kimenet a
+blob mellé kerül, szintén tartalom szerint címezve, így az immutable cache
+rá is érvényes:
+
+    blobs/ab/<sha256>.thumb.jpg     – THUMBNAIL_SIZE-ba férő JPEG (képekhez, PDF-hez)
+    blobs/ab/<sha256>.preview.jpg   – PREVIEW_SIZE-ba férő JPEG (kép, ill. a PDF első oldala)
+
+A forrás típusát (kép / PDF) a tartalom első bájtjai döntik el, nem a
+fájlnév: a blob kulcsa kiterjesztés nélküli (blobs.py).
+
+Egy tartalomhoz egyszer készül el (a Blob sor derivatives_status-a), az
+URL-ek a csatolmány sorokra is rákerülnek, így a listázás nem igényel
+külön lekérdezést.
+
+Képekhez Pillow kell, PDF-hez a poppler pdftoppm programja; ha valamelyik
+hiányzik, az adott típusra egyszerűen nem készül származék. A Pillow a
+dekódolás/átméretezés alatt, a pdftoppm mint külön folyamat elengedi a
+GIL-t, ezért elég a szálas pool. DERIVATIVES_MODE=thread (alapértelmezett)
+vagy manual (csak drain() futtatja, tesztekhez).
+"""
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from flask import current_app  # pyright: ignore[reportMissingImports]
+
+try:
+    from PIL import Image, ImageOps  # pyright: ignore[reportMissingImports]
+except ImportError:  # opcionális függőség
+    Image = ImageOps = None
+
+import uploads
+from models import db, Blob, CommentAttachment, PostAttachment
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_SIZE = (320, 320)
+PREVIEW_SIZE = (1280, 1280)
+JPEG_QUALITY = 80
+PDFTOPPM_TIMEOUT = 30
+
+IMAGE = "image"
+PDF = "pdf"
+# A blob kulcsának nincs kiterjesztése (és a feltöltő fájlneve amúgy sem megbízható): a típus a tartalomból
+_SIGNATURES = (
+    (b"%PDF-", PDF),
+    (b"\x89PNG\r\n\x1a\n", IMAGE),
+    (b"\xff\xd8\xff", IMAGE),
+    (b"GIF87a", IMAGE),
+    (b"GIF89a", IMAGE),
+)
+
+DONE = "done"
+UNSUPPORTED = "unsupported"
+FAILED = "failed"
+
+
+def derivative_key(blob_key, kind):
+    return f"{os.path.splitext(blob_key)[0]}.{kind}.jpg"
+
+
+def _pdftoppm():
+    return shutil.which("pdftoppm")
+
+
+def sniff(path):
+    """IMAGE, PDF vagy None a fájl első bájtjai alapján."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(8)
+    except OSError:
+        return None
+    for signature, kind in _SIGNATURES:
+        if head.startswith(signature):
+            return kind
+    return None
+
+
+def supports(path):
+    kind = sniff(path)
+    if kind == IMAGE:
+        return Image is not None
+    if kind == PDF:
+        return _pdftoppm() is not None
+    return False
+
+
+def _temp_beside(dest):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(dest), prefix=".derivative-", suffix=".jpg")
+    os.close(fd)
+    return tmp
+
+
+def _save_jpeg(image, size, dest):
+    image = image.copy()
+    image.thumbnail(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    if image.mode not in ("RGB", "L"):
+        # Átlátszó PNG/GIF: fehér háttérre
+        rgba = image.convert("RGBA")
+        image = Image.new("RGB", rgba.size, "white")
+        image.paste(rgba, mask=rgba.getchannel("A"))
+
+    tmp = _temp_beside(dest)
+    try:
+        image.save(tmp, "JPEG", quality=JPEG_QUALITY, optimize=True, progressive=True)
+        os.replace(tmp, dest)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _render_image(src, thumb_dest, preview_dest):
+    with Image.open(src) as image:
+        # JPEG-nél a dekóder már csökkentett felbontásban olvas (DCT skálázás)
+        image.draft("RGB", PREVIEW_SIZE)
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(PREVIEW_SIZE, Image.Resampling.LANCZOS, reducing_gap=3.0)
+        _save_jpeg(image, PREVIEW_SIZE, preview_dest)
+        _save_jpeg(image, THUMBNAIL_SIZE, thumb_dest)
+
+
+def _pdf_first_page(src, dest, size):
+    tmp = _temp_beside(dest)
+    try:
+        subprocess.run(
+            [_pdftoppm(), "-f", "1", "-l", "1", "-singlefile", "-jpeg",
+             "-jpegopt", f"quality={JPEG_QUALITY}", "-scale-to", str(max(size)),
+             src, tmp[:-len(".jpg")]],
+            check=True, capture_output=True, timeout=PDFTOPPM_TIMEOUT,
+        )
+        os.replace(tmp, dest)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def _render_pdf(src, thumb_dest, preview_dest):
+    _pdf_first_page(src, preview_dest, PREVIEW_SIZE)
+    if Image is not None:
+        with Image.open(preview_dest) as preview:
+            _save_jpeg(preview, THUMBNAIL_SIZE, thumb_dest)
+    else:
+        _pdf_first_page(src, thumb_dest, THUMBNAIL_SIZE)
+
+
+def render(blob_key):
+    """A blob származékainak elkészítése; (thumbnail kulcs, preview kulcs) vagy None, ha nem támogatott."""
+    source = uploads.path_for_key(blob_key)
+    if not supports(source):
+        return None
+    thumb_key = derivative_key(blob_key, "thumb")
+    preview_key = derivative_key(blob_key, "preview")
+    args = (source, uploads.path_for_key(thumb_key), uploads.path_for_key(preview_key))
+
+    if sniff(source) == PDF:
+        _render_pdf(*args)
+    else:
+        _render_image(*args)
+    return thumb_key, preview_key
+
+
+def _propagate(blob):
+    values = {
+        "thumbnail_url": uploads.url_for_key(blob.thumbnail_path) if blob.thumbnail_path else None,
+        "preview_url": uploads.url_for_key(blob.preview_path) if blob.preview_path else None,
+    }
+    for model in (PostAttachment, CommentAttachment):
+        model.query.filter_by(blob_id=blob.id).update(values, synchronize_session=False)
+
+
+def generate(blob_id):
+    """Egy blob feldolgozása (idempotens). Visszaadja a blob derivatives_status-át."""
+    blob = db.session.get(Blob, blob_id)
+    if blob is None:
+        return None
+
+    if blob.derivatives_status is None:
+        try:
+            keys = render(blob.path)
+        except Exception as e:  # sérült/túl nagy kép, hibás PDF, pdftoppm timeout
+            logger.warning("származék készítése sikertelen (%s): %s", blob.path, e)
+            blob.derivatives_status = FAILED
+        else:
+            if keys is None:
+                blob.derivatives_status = UNSUPPORTED
+            else:
+                blob.thumbnail_path, blob.preview_path = keys
+                blob.derivatives_status = DONE
+
+    # Már kész blobnál is lefut: az azóta létrehozott csatolmány sorok is megkapják az URL-eket
+    if blob.derivatives_status == DONE:
+        _propagate(blob)
+    db.session.commit()
+    return blob.derivatives_status
+
+
+class DerivativePool:
+    def __init__(self, app, workers=2, manual=False):
+        self.app = app
+        self._executor = None if manual else ThreadPoolExecutor(workers, thread_name_prefix="derivatives")
+        self._pending = []
+        self._futures = set()
+        self._lock = threading.Lock()
+
+    def submit(self, blob_id):
+        if self._executor is None:
+            with self._lock:
+                self._pending.append(blob_id)
+            return
+        future = self._executor.submit(self._run, blob_id)
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._forget)
+
+    def _forget(self, future):
+        with self._lock:
+            self._futures.discard(future)
+
+    def _run(self, blob_id):
+        with self.app.app_context():
+            try:
+                return generate(blob_id)
+            except Exception:
+                db.session.rollback()
+                logger.exception("származék feladat sikertelen: blob %s", blob_id)
+            finally:
+                db.session.remove()
+
+    def drain(self):
+        """Futó poolnál megvárja a beküldött feladatokat, manual módban itt futtatja őket."""
+        if self._executor is not None:
+            with self._lock:
+                futures = list(self._futures)
+            wait(futures)
+            return
+        while True:
+            with self._lock:
+                if not self._pending:
+                    return
+                blob_id = self._pending.pop(0)
+            self._run(blob_id)
+
+    def stop(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+def init_derivatives(app):
+    manual = app.config.get("DERIVATIVES_MODE", os.getenv("DERIVATIVES_MODE", "thread")) == "manual"
+    workers = int(app.config.get("DERIVATIVE_WORKERS", os.getenv("DERIVATIVE_WORKERS", 2)))
+    pool = DerivativePool(app, workers=workers, manual=manual)
+    app.extensions["derivatives"] = pool
+    return pool
+
+
+def enqueue_for(stored):
+    """A commit után hívandó: ha a feltöltött tartalomnak még nincs (vagy lehet) származéka, sorba teszi."""
+    if stored.blob_id is None or stored.thumbnail_url is not None:
+        return
+    if supports(stored.path):
+        current_app.extensions["derivatives"].submit(stored.blob_id)
@@ -0,0 +1,238 @@
+"""Tartós kimenő email sor (Brevo).
+
+A route-ok a saját tranzakciójukban csak egy EmailOutbox sort írnak
+(enqueue), így a válasz nem vár a Brevo-ra, és egy Brevo-kiesés sem okoz
+500-at. A küldést a worker végzi kötegekben:
+
+  * foglalás: a soron következő sorok next_attempt_at-ját LEASE-szel
+    előretolja (MySQL-en FOR UPDATE SKIP LOCKED mellett, így több worker
+    sem küldi kétszer ugyanazt),
+  * küldés előtt: ha a foglalásból kevesebb van hátra LEASE_RENEW_BELOW-nál
+    (lassú Brevo, hosszú köteg), feltételesen megújítja; ha közben lejárt és
+    egy másik worker már elvitte a sort, kihagyja,
+  * siker: status=sent, a törzsek törlődnek,
+  * hiba: exponenciális visszalépés (BACKOFF_BASE * 2^(próbálkozás-1),
+    legfeljebb BACKOFF_MAX), MAX_ATTEMPTS után status=failed.
+
+Futtatás: EMAIL_OUTBOX_WORKER=thread (alapértelmezett, háttérszál az app
+folyamatában) vagy off, és külön folyamatban `python manage.py email-worker`.
+"""
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app  # pyright: ignore[reportMissingImports]
+
+import http_client
+from models import db, EmailOutbox
+
+PENDING = "pending"
+SENT = "sent"
+FAILED = "failed"
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 8
+LEASE = timedelta(minutes=5)
+# Egy küldés ennyin belül befejeződik (http_client timeout); ennél rövidebb hátralévő foglalást megújítunk
+LEASE_RENEW_BELOW = timedelta(minutes=1)
+BACKOFF_BASE = timedelta(seconds=30)
+BACKOFF_MAX = timedelta(hours=1)
+
+BREVO_API_URL = "https://api.brevo.com/v3/smtp/email"
+SENDER = {'name': 'StudyConnect', 'email': 'studyconnectnoreply@gmail.com'}
+
+
+class EmailSendError(Exception):
+    pass
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def backoff(attempts):
+    return min(BACKOFF_BASE * (2 ** (attempts - 1)), BACKOFF_MAX)
+
+
+def enqueue(to_email, subject, html_body, text_body=None, to_name=None):
+    """Email felvétele a sorba a hívó tranzakciójában (a commit a hívó dolga)."""
+    message = EmailOutbox(
+        to_email=to_email,
+        to_name=to_name,
+        subject=subject,
+        html_body=html_body,
+        text_body=text_body,
+        status=PENDING,
+        attempts=0,
+        next_attempt_at=_utcnow(),
+    )
+    db.session.add(message)
+    return message
+
+
+class BrevoSender:
+    def __init__(self, api_url=BREVO_API_URL, api_key=None):
+        self.api_url = api_url
+        self.api_key = api_key
+
+    def __call__(self, message):
+        payload = {
+            'sender': SENDER,
+            'to': [{'email': message.to_email, 'name': message.to_name or message.to_email}],
+            'subject': message.subject,
+            'htmlContent': message.html_body,
+        }
+        if message.text_body:
+            payload['textContent'] = message.text_body
+
+        response = http_client.post(
+            self.api_url,
+            headers={
+                'accept': 'application/json',
+                'api-key': self.api_key,
+                'content-type': 'application/json'
+            },
+            json=payload,
+        )
+        if response.status_code not in (200, 201, 202):
+            raise EmailSendError(f"Brevo {response.status_code}: {response.text[:200]}")
+
+
+def _lease_until(now):
+    # Egész másodperc: az adatbázisból (MySQL DATETIME) visszaolvasva is pontosan egyezik
+    return (now + LEASE).replace(microsecond=0)
+
+
+def _hold_lease(message_id, lease_until):
+    """Igaz, ha a sor foglalása még a miénk, és kitart a küldés végéig (szükség esetén megújítva)."""
+    if _utcnow() < lease_until - LEASE_RENEW_BELOW:
+        return True  # a lejárat előtt senki más nem foglalhatja le
+    # Csak akkor hosszabbítunk, ha senki nem foglalta újra (az ő foglalása más next_attempt_at-ot írt)
+    renewed = (
+        EmailOutbox.query
+        .filter(EmailOutbox.id == message_id, EmailOutbox.status == PENDING,
+                EmailOutbox.next_attempt_at == lease_until)
+        .update({EmailOutbox.next_attempt_at: _lease_until(_utcnow())}, synchronize_session=False)
+    )
+    db.session.commit()
+    return renewed == 1
+
+
+def process_batch(sender, batch_size=BATCH_SIZE):
+    """Egy köteg esedékes email kiküldése. Visszaadja: (feldolgozott, sikeresen elküldött)."""
+    now = _utcnow()
+    messages = (
+        EmailOutbox.query
+        .filter(EmailOutbox.status == PENDING, EmailOutbox.next_attempt_at <= now)
+        .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .all()
+    )
+    lease_until = _lease_until(now)
+    for message in messages:
+        message.attempts += 1
+        message.next_attempt_at = lease_until
+    db.session.commit()
+
+    processed = sent = 0
+    for message in messages:
+        if not _hold_lease(message.id, lease_until):
+            continue  # a foglalás lejárt, a sort már egy másik worker küldi
+        processed += 1
+        try:
+            sender(message)
+        except Exception as e:
+            message.last_error = str(e)[:500]
+            if message.attempts >= MAX_ATTEMPTS:
+                message.status = FAILED
+                # A törzs (benne pl. az ideiglenes jelszó) végleges hiba után sem marad az adatbázisban
+                message.html_body = None
+                message.text_body = None
+            else:
+                message.next_attempt_at = _utcnow() + backoff(message.attempts)
+        else:
+            message.status = SENT
+            message.sent_at = _utcnow()
+            message.html_body = None
+            message.text_body = None
+            message.last_error = None
+            sent += 1
+        # Soronként commit: egy későbbi hiba ne küldesse újra a már elmenteket
+        db.session.commit()
+
+    return processed, sent
+
+
+class OutboxWorker:
+    def __init__(self, app, sender, batch_size=BATCH_SIZE, poll_interval=5.0):
+        self.app = app
+        self.sender = sender
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def run_once(self):
+        with self.app.app_context():
+            try:
+                return process_batch(self.sender, self.batch_size)
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception("email outbox: köteg feldolgozása sikertelen")
+                return 0, 0
+            finally:
+                db.session.remove()
+
+    def run_forever(self):
+        while not self._stop.is_set():
+            processed, _ = self.run_once()
+            # Teli köteg után azonnal jöhet a következő, egyébként várunk (vagy notify ébreszt)
+            if processed < self.batch_size:
+                self._wake.wait(self.poll_interval)
+                self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run_forever, name="email-outbox", daemon=True)
+            self._thread.start()
+        return self
+
+    def notify(self):
+        self._wake.set()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+
+def init_email_outbox(app, start=True):
+    sender = BrevoSender(
+        app.config.get("BREVO_API_URL", BREVO_API_URL),
+        api_key=app.config.get("BREVO_API_KEY", os.getenv("BREVO_API_KEY")),
+    )
+    worker = OutboxWorker(app, sender)
+    app.extensions["email_outbox"] = worker
+    if start:
+        start_worker(app)
+    return worker
+
+
+def start_worker(app):
+    """A háttérszál indítása, ha EMAIL_OUTBOX_WORKER=thread (gunicorn alatt a fork után, lásd gunicorn.conf.py)."""
+    if app.config.get("EMAIL_OUTBOX_WORKER", os.getenv("EMAIL_OUTBOX_WORKER", "thread")) == "thread":
+        app.extensions["email_outbox"].start()
+
+
+def notify():
+    """A worker felébresztése a commit után (ha ebben a folyamatban fut)."""
+    current_app.extensions["email_outbox"].notify()
@@ -0,0 +1,60 @@
+"""Email sablonok (templates/emails) egyszer lefordítva, memóriában tartva.
+
+Minden emailhez tartozik egy <név>.html és egy <név>.txt (sima szöveges
+változat) sablon, a tárgy pedig a SUBJECTS-ben. Induláskor minden sablon
+(és az öröklött base.html) lefordul; auto_reload nélkül a Jinja ezután már
+nem nyúl a fájlrendszerhez, így egy render csak változó-behelyettesítés
+(tömeges értesítéseknél is).
+"""
+import os
+
+from flask import current_app  # pyright: ignore[reportMissingImports]
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape  # pyright: ignore[reportMissingImports]
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "emails")
+
+SUBJECTS = {
+    "welcome": "🎓 StudyConnect - Üdv, {{ first_name }}!",
+    "temp_password": "🔑 StudyConnect - Új ideiglenes jelszó",
+}
+
+
+class EmailTemplates:
+    def __init__(self, template_dir=TEMPLATE_DIR, subjects=SUBJECTS):
+        self.env = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(["html"]),
+            undefined=StrictUndefined,
+            auto_reload=False,
+            cache_size=-1,
+        )
+        # A tárgy sima szöveg (email fejléc): külön, escape nélküli környezetben fordul
+        self.subject_env = Environment(autoescape=False, undefined=StrictUndefined)
+        # Minden fájl (a base.html is) most fordul le és kerül a Jinja cache-be
+        for template_name in self.env.list_templates():
+            self.env.get_template(template_name)
+        self._compiled = {
+            name: (
+                self.subject_env.from_string(subject),
+                self.env.get_template(f"{name}.html"),
+                self.env.get_template(f"{name}.txt"),
+            )
+            for name, subject in subjects.items()
+        }
+
+    def names(self):
+        return sorted(self._compiled)
+
+    def render(self, name, **context):
+        """(tárgy, html, szöveg) hármas."""
+        subject, html, text = self._compiled[name]
+        return subject.render(context), html.render(context), text.render(context)
+
+
+def init_email_templates(app):
+    app.extensions["email_templates"] = EmailTemplates()
+    return app.extensions["email_templates"]
+
+
+def render(name, **context):
+    return current_app.extensions["email_templates"].render(name, **context)
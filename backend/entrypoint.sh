@@ -2,4 +2,11 @@
 set -e
 
 python /app/wait_for_db.py
-exec flask run --host=0.0.0.0 --port=5000 --debug
+
+# Fejlesztés (docker-compose: FLASK_DEBUG=1): reloader + debugger, egy folyamat.
+# Minden más esetben a több workeres gunicorn fut (gunicorn.conf.py).
+if [ "${FLASK_DEBUG}" = "1" ]; then
+    exec flask run --host=0.0.0.0 --port=5000 --debug
+fi
+
+exec gunicorn -c /app/gunicorn.conf.py wsgi:app
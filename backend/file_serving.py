@@ -0,0 +1,112 @@
+"""Feltöltött fájlok kiszolgálása: GET /uploads/<path>.
+
+A csatolmány URL-je /uploads/blobs/<aa>/<sha256><ext>, a fájl a lemezen
+kiterjesztés nélkül, blobs/<aa>/<sha256> néven van (blobs.py): a
+kiterjesztés az adott csatolmányé, ez dönti el az engedélyezést és a
+Content-Type-ot.
+
+A blobok és bélyegképeik neve a SHA-256-ból áll, így az ETag
+erős és a tartalomból jön, a válasz pedig "immutable": ugyanazon az URL-en
+sosem lesz más tartalom, a böngésző évekig cache-elheti. If-None-Match egyezésnél 304,
+Range kérésre 206 megy ki (nagy PDF-ek lapozása, megszakított letöltés
+folytatása). A régi, blob előtti fájlok (posts/, comments/) rövidebb
+cache-t és mtime/méret alapú ETag-et kapnak.
+
+UPLOAD_SENDFILE szerint a bájtokat nem a Python worker streameli:
+  * ""          – a Flask/Werkzeug küldi (send_file, wsgi.file_wrapper),
+  * "x-accel"   – nginx: X-Accel-Redirect az UPLOAD_ACCEL_PREFIX alatti
+                  internal location-re (a Range-et is nginx kezeli),
+  * "x-sendfile" – Apache mod_xsendfile / lighttpd: X-Sendfile abszolút útvonallal.
+"""
+import mimetypes
+import os
+import stat
+
+from flask import current_app, jsonify, request, send_file  # pyright: ignore[reportMissingImports]
+from werkzeug.security import safe_join  # pyright: ignore[reportMissingImports]
+
+from blobs import BLOB_DIR
+
+ALLOWED_EXTENSIONS = frozenset({".pdf", ".png", ".jpg", ".jpeg", ".gif", ".txt", ".docx"})
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+MUTABLE_MAX_AGE = 3600
+
+
+def blob_etag(filepath):
+    """blobs/<aa>/<sha256>[.thumb|.preview].<ext> -> erős ETag (a kiterjesztés nélküli név), egyébként None."""
+    parts = filepath.split("/")
+    if len(parts) != 3 or parts[0] != BLOB_DIR:
+        return None
+    name = os.path.splitext(parts[2])[0]
+    digest = name.split(".", 1)[0]
+    if len(digest) == 64 and digest.startswith(parts[1]):
+        return name
+    return None
+
+
+def storage_key(filepath):
+    """Kiszolgált útvonal -> a fájl kulcsa a lemezen: blob eredetinél a kiterjesztés nélküli hash."""
+    etag = blob_etag(filepath)
+    if etag is None or "." in etag:
+        return filepath  # nem blob, vagy származék (<sha>.thumb.jpg néven van a lemezen)
+    return f"{BLOB_DIR}/{etag[:2]}/{etag}"
+
+
+def _stat(root, key):
+    path = safe_join(root, key)
+    if path is None:
+        return None, None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return path, None
+    return path, st if stat.S_ISREG(st.st_mode) else None
+
+
+def _accel_response(key, mimetype, st, etag, max_age):
+    prefix = current_app.config.get("UPLOAD_ACCEL_PREFIX", "/protected-uploads").rstrip("/")
+    # A Content-Type innen megy ki (nginx az eredeti válasz fejlécét tartja meg), nem a kulcs nevéből
+    rv = current_app.response_class(mimetype=mimetype)
+    rv.headers["X-Accel-Redirect"] = f"{prefix}/{key}"
+    rv.set_etag(etag or f"{st.st_mtime_ns:x}-{st.st_size:x}")
+    rv.last_modified = int(st.st_mtime)
+    rv.cache_control.max_age = max_age
+    # A 304-et itt döntjük el; a Range kérést nginx szolgálja ki a belső átirányításon
+    return rv.make_conditional(request)
+
+
+def serve(filepath):
+    if os.path.splitext(filepath)[1].lower() not in ALLOWED_EXTENSIONS:
+        return "Tiltott fájltípus!", 403
+
+    root = current_app.config["UPLOAD_FOLDER"]
+    if safe_join(root, filepath) is None:
+        return "Unauthorized!", 403
+
+    key = storage_key(filepath)
+    path, st = _stat(root, key)
+    if st is None:
+        return jsonify({"error": "Fájl nem található"}), 404
+
+    etag = blob_etag(filepath)
+    max_age = IMMUTABLE_MAX_AGE if etag else MUTABLE_MAX_AGE
+    mimetype = mimetypes.guess_type(filepath)[0] or "application/octet-stream"
+
+    if current_app.config.get("UPLOAD_SENDFILE") == "x-accel":
+        rv = _accel_response(key, mimetype, st, etag, max_age)
+    else:
+        # conditional=True: If-None-Match / If-Modified-Since -> 304, Range -> 206
+        rv = send_file(path, mimetype=mimetype, conditional=True, etag=etag or True, max_age=max_age)
+
+    rv.cache_control.public = True
+    if etag:
+        rv.cache_control.immutable = True
+    return rv
+
+
+def init_file_serving(app):
+    app.config.setdefault("UPLOAD_SENDFILE", "")
+    # X-Sendfile módban a send_file maga teszi ki a fejlécet, törzs nélkül
+    if app.config["UPLOAD_SENDFILE"] == "x-sendfile":
+        app.config["USE_X_SENDFILE"] = True
+    app.add_url_rule("/uploads/<path:filepath>", "uploaded_file", serve)
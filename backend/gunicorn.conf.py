@@ -0,0 +1,94 @@
+"""Gunicorn beállítások az éles futtatáshoz (entrypoint.sh, FLASK_DEBUG nélkül).
+
+gthread worker: worker folyamatonként GUNICORN_THREADS szál. A DB-re és a
+külső API-kra váró kérések szálon párhuzamosak, a CPU-munka a folyamatok
+között oszlik el. A GET /stream (SSE) kapcsolat a nyitva tartása alatt egy
+szálat foglal, ezért a szálszám alapból GUNICORN_REQUEST_THREADS (rendes
+kérések) + GUNICORN_STREAM_THREADS (egyidejű streamek workerenként), és a
+broker a stream-szálaknál több streamet nem enged meg.
+
+A tagság-cache és az SSE broker csak Redis-szel (MEMBERSHIP_CACHE_BACKEND=redis,
+BROKER_BACKEND=redis, REDIS_URL) osztható meg a folyamatok között; e nélkül
+alapból egy worker fut, és a párhuzamosságot a szálak adják.
+Minden érték felülírható környezeti változóval.
+"""
+import glob
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+
+
+def _cpu_count():
+    # A konténer cpuset korlátját is figyelembe veszi (a cpu_count() a gép összes magját adja)
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # nem Linux
+        return os.cpu_count() or 1
+
+
+# Folyamatszám a magok számából, de csak megosztott (Redis) backendekkel: különben több worker
+# mellett a tagság-cache kikapcsolna, a /stream pedig 503-at adna (membership.py, broker.py)
+shared_backends = os.getenv("MEMBERSHIP_CACHE_BACKEND") == "redis" and os.getenv("BROKER_BACKEND") == "redis"
+workers = int(os.getenv("WEB_CONCURRENCY", _cpu_count() * 2 + 1 if shared_backends else 1))
+worker_class = "gthread"
+# A szálak két részre oszlanak: rendes kérések és nyitott SSE streamek (egy stream sse.MAX_SECONDS-ig
+# tart egy szálat, közben a broker sorára vár). A stream szálak olcsók (nem tartanak DB kapcsolatot).
+# Ha a /stream úgysem elérhető (több worker Redis broker nélkül), nem foglalunk neki szálat.
+streams_enabled = workers == 1 or os.getenv("BROKER_BACKEND") == "redis"
+request_threads = int(os.getenv("GUNICORN_REQUEST_THREADS", 8))
+stream_threads = int(os.getenv("GUNICORN_STREAM_THREADS", 64 if streams_enabled else 0))
+threads = int(os.getenv("GUNICORN_THREADS", request_threads + stream_threads))
+# Workerenként legfeljebb ennyi stream lehet nyitva (broker.py, a többi 503 + Retry-After),
+# így a streamek nem szoríthatják ki a rendes kéréseket
+os.environ["STREAM_MAX_CONNECTIONS"] = str(max(1, min(stream_threads, threads - request_threads)))
+
+# Az app egyszer töltődik be a masterben, a workerek fork-kal kapják meg
+preload_app = True
+
+# Keep-alive: a proxy (nginx) újrahasználhatja a kapcsolatot a kérések között
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+# gthread alatt a timeout a worker életjelére vonatkozik, nem egy-egy kérésre (SSE)
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+# Graceful restart (HUP / új deploy): ennyi ideje van a futó kéréseknek befejeződni
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+# Workerek fokozatos cseréje (szivárgó memória ellen), szórással, hogy ne egyszerre induljanak újra
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 200))
+
+# A worker életjel fájlja memóriában (Docker overlay fs-en a /tmp lassú lehet)
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+# Üres érték: nincs access log (pl. benchmark alatt)
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+# A /metrics bármelyik workerre eshet: a workerek ide írják a pillanatképüket (metrics.py).
+# A Config import előtt kell beállítani (preload: az app a konfiguráció után töltődik be).
+os.environ.setdefault("METRICS_DIR", os.path.join(worker_tmp_dir or "/tmp", "studybuddy-metrics"))
+# Több worker mellett a memory tagság-cache és SSE broker nem osztható meg (membership.py, broker.py)
+os.environ["SERVER_WORKERS"] = str(workers)
+
+
+def on_starting(server):
+    # Új szerverindítás: az előző futás számlálói nem folytatódnak
+    for path in glob.glob(os.path.join(os.environ["METRICS_DIR"], "*.json")):
+        os.unlink(path)
+
+
+def post_worker_init(worker):
+    import app as app_module
+    import wsgi
+
+    app_module.start_background(wsgi.app)
+
+
+def worker_exit(server, worker):
+    import app as app_module
+    import wsgi
+
+    app_module.stop_background(wsgi.app)
+    # A számlálók a közös összesítőbe kerülnek, a worker saját fájlja törlődik (metrics.py)
+    wsgi.app.extensions["metrics"].retire()
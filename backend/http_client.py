@@ -0,0 +1,240 @@
+"""Közös kimenő HTTP kliens (tanrend, Brevo).
+
+Hostonként egy keep-alive requests.Session saját connection poollal, így a
+TCP/TLS kapcsolat újrahasznosul a kérések között. Két védelem van, hogy egy
+lassú külső szolgáltatás ne kösse le az összes worker szálat:
+
+  * párhuzamossági korlát: hostonként legfeljebb max_concurrent kérés fut
+    egyszerre; ha acquire_timeout alatt nem jut hely, PoolSaturatedError,
+  * circuit breaker: failure_threshold egymás utáni hiba (kapcsolódási hiba,
+    timeout, 5xx) után a host reset_timeout másodpercig "open", a hívások
+    azonnal CircuitOpenError-ral térnek vissza. Utána egy próbakérés mehet
+    ki (half-open): ha sikeres, a breaker zár, ha nem, újra nyit.
+
+Mindkét hiba a requests.RequestException leszármazottja, így a hívók
+meglévő hibakezelése változatlanul működik. Állapot és számlálók: stats().
+Beállítás: HTTP_POOL_SIZE, HTTP_MAX_CONCURRENT, HTTP_ACQUIRE_TIMEOUT,
+HTTP_BREAKER_FAILURES, HTTP_BREAKER_RESET, HTTP_TIMEOUT.
+"""
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests  # pyright: ignore[reportMissingImports]
+from requests.adapters import HTTPAdapter  # pyright: ignore[reportMissingImports]
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class OutboundError(requests.RequestException):
+    pass
+
+
+class CircuitOpenError(OutboundError):
+    """A host breakere nyitva van, a kérés ki sem ment."""
+
+
+class PoolSaturatedError(OutboundError):
+    """A host párhuzamossági korlátja betelt."""
+
+
+class HostPolicy:
+    def __init__(self, pool_size=None, max_concurrent=None, acquire_timeout=None,
+                 failure_threshold=None, reset_timeout=None, timeout=None):
+        self.pool_size = pool_size or int(os.getenv("HTTP_POOL_SIZE", 10))
+        self.max_concurrent = max_concurrent or int(os.getenv("HTTP_MAX_CONCURRENT", 8))
+        self.acquire_timeout = acquire_timeout if acquire_timeout is not None else float(os.getenv("HTTP_ACQUIRE_TIMEOUT", 0.5))
+        self.failure_threshold = failure_threshold or int(os.getenv("HTTP_BREAKER_FAILURES", 5))
+        self.reset_timeout = reset_timeout if reset_timeout is not None else float(os.getenv("HTTP_BREAKER_RESET", 30))
+        # (connect, read) másodpercben
+        self.timeout = timeout or (3.05, float(os.getenv("HTTP_TIMEOUT", 10)))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold, reset_timeout, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self._clock() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+            # Half-open állapotban egyszerre csak egy próbakérés mehet ki
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def release_trial(self):
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    self.times_opened += 1
+                self.state = OPEN
+                self.opened_at = self._clock()
+
+
+class HostClient:
+    def __init__(self, host, policy, clock=time.monotonic):
+        self.host = host
+        self.policy = policy
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=1, pool_maxsize=policy.pool_size)
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_timeout, clock=clock)
+        self._slots = threading.BoundedSemaphore(policy.max_concurrent)
+        self._lock = threading.Lock()
+        self.counters = {
+            "requests": 0, "failures": 0, "rejected_open": 0, "rejected_saturated": 0,
+            "in_flight": 0, "max_in_flight": 0,
+        }
+
+    def _count(self, key, delta=1):
+        with self._lock:
+            self.counters[key] += delta
+            if key == "in_flight":
+                self.counters["max_in_flight"] = max(self.counters["max_in_flight"], self.counters["in_flight"])
+
+    def request(self, method, url, **kwargs):
+        if not self.breaker.allow():
+            self._count("rejected_open")
+            raise CircuitOpenError(f"{self.host}: circuit breaker nyitva")
+
+        if not self._slots.acquire(timeout=self.policy.acquire_timeout):
+            # Nem a host hibája: a breaker állapota nem romlik, csak a próbakérés helye szabadul fel
+            self.breaker.release_trial()
+            self._count("rejected_saturated")
+            raise PoolSaturatedError(f"{self.host}: túl sok párhuzamos kérés")
+
+        self._count("in_flight")
+        self._count("requests")
+        kwargs.setdefault("timeout", self.policy.timeout)
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            self._count("failures")
+            self.breaker.record_failure()
+            raise
+        finally:
+            self._count("in_flight", -1)
+            self._slots.release()
+
+        if response.status_code >= 500:
+            self._count("failures")
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return response
+
+    def connections_opened(self):
+        total = 0
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is not None:
+                total += pool.num_connections
+        return total
+
+    def stats(self):
+        with self._lock:
+            counters = dict(self.counters)
+        return {
+            **counters,
+            "connections_opened": self.connections_opened(),
+            "pool_size": self.policy.pool_size,
+            "max_concurrent": self.policy.max_concurrent,
+            "breaker_state": self.breaker.state,
+            "breaker_failures": self.breaker.failures,
+            "breaker_opened": self.breaker.times_opened,
+        }
+
+    def close(self):
+        self.session.close()
+
+
+class OutboundHTTP:
+    """Hostonkénti HostClient-ek; a policy hostonként felülírható (configure)."""
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._clients = {}
+        self._policies = {}
+        self._lock = threading.Lock()
+
+    def configure(self, host, **policy):
+        with self._lock:
+            self._policies[host] = HostPolicy(**policy)
+            old = self._clients.pop(host, None)
+        if old is not None:
+            old.close()
+
+    def client_for(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            client = self._clients.get(host)
+            if client is None:
+                client = HostClient(host, self._policies.get(host) or HostPolicy(), clock=self._clock)
+                self._clients[host] = client
+            return client
+
+    def request(self, method, url, **kwargs):
+        return self.client_for(url).request(method, url, **kwargs)
+
+    def stats(self):
+        with self._lock:
+            clients = dict(self._clients)
+        return {host: client.stats() for host, client in clients.items()}
+
+    def close(self):
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for client in clients.values():
+            client.close()
+
+
+# Folyamatonként egy példány: a session-ök és a breaker állapot a worker szálak között közös
+default_client = OutboundHTTP()
+
+
+def request(method, url, **kwargs):
+    return default_client.request(method, url, **kwargs)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+def configure(host, **policy):
+    default_client.configure(host, **policy)
+
+
+def stats():
+    return default_client.stats()
@@ -0,0 +1,214 @@
+"""Strukturált, aszinkron naplózás.
+
+A kérést kiszolgáló szál csak egy QueueHandler-be tesz rekordot (nem
+blokkol: ha a sor betelt, a rekord eldobódik és számolódik); a kiírást
+(JSON sor a stdout-ra) egy QueueListener háttérszál végzi. Egy rekord:
+
+    {"ts": "2026-10-18T20:15:03.120Z", "level": "INFO", "logger": "routes",
+     "msg": "...", "request_id": "...", "method": "GET", "path": "/groups/1/posts", ...extra}
+
+Beállítások (Config / környezet):
+  * LOG_LEVEL         – gyökér szint (alapértelmezett INFO),
+  * LOG_LEVELS        – modulonként, pl. "routes=DEBUG,sqlalchemy.engine=WARNING",
+  * LOG_SAMPLE_RATES  – szintenkénti mintavétel, pl. "DEBUG=0.05" (a DEBUG rekordok 5%-a),
+  * LOG_FORMAT        – "json" (alapértelmezett) vagy "text" (fejlesztéshez).
+
+A listener szál a fork-ot nem éli túl, ezért a gyermekfolyamat (gunicorn
+worker) új sort és listenert kap (os.register_at_fork).
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+from datetime import datetime, timezone
+
+from flask import g, has_request_context, request  # pyright: ignore[reportMissingImports]
+
+QUEUE_SIZE = 10000
+
+# A LogRecord saját mezői; minden más az extra={...}-ból jön és a JSON-ba kerül
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_service = None
+
+
+def parse_levels(value):
+    """"routes=DEBUG,subject_cache=WARNING" -> {"routes": "DEBUG", ...}"""
+    levels = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def parse_sample_rates(value):
+    return {level: float(rate) for level, rate in parse_levels(value).items()}
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        data = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds")
+            .replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_FIELDS and not key.startswith("_"):
+                data[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data["exc"] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class ContextFilter(logging.Filter):
+    """A kérés adatai a rekordra, még a kérés szálán (a listener szál már nem látja a kérést)."""
+
+    def filter(self, record):
+        if has_request_context():
+            record.request_id = g.get("request_id")
+            record.method = request.method
+            record.path = request.path
+            if g.get("user_id") is not None:
+                record.user_id = g.user_id
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rates=None, rng=random.random):
+        super().__init__()
+        self.rates = rates or {}
+        self.rng = rng
+
+    def filter(self, record):
+        rate = self.rates.get(record.levelname)
+        return rate is None or self.rng() < rate
+
+
+class AsyncQueueHandler(logging.handlers.QueueHandler):
+    """Nem blokkoló QueueHandler: teli sornál eldob és számol."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # A szöveg és a traceback itt, a hívó szálán készül el; az args/exc_info nem utazik tovább
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LoggingService:
+    def __init__(self, level="INFO", levels=None, sample_rates=None, stream=None, fmt="json",
+                 queue_size=QUEUE_SIZE):
+        self.stream = stream
+        self.fmt = fmt
+        self.queue_size = queue_size
+        self.queue = queue.Queue(queue_size)
+        self.handler = AsyncQueueHandler(self.queue)
+        self.handler.addFilter(ContextFilter())
+        self.sampling = SamplingFilter(sample_rates)
+        self.handler.addFilter(self.sampling)
+        self.output = logging.StreamHandler(stream or sys.stdout)
+        self.output.setFormatter(
+            JsonFormatter() if fmt == "json" else logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
+        )
+        self.listener = logging.handlers.QueueListener(self.queue, self.output, respect_handler_level=True)
+
+        root = logging.getLogger()
+        root.setLevel(level.upper())
+        root.addHandler(self.handler)
+        self.set_levels(levels or {})
+        self.listener.start()
+
+    def set_levels(self, levels):
+        for name, level in levels.items():
+            logging.getLogger(name).setLevel(level)
+
+    def flush(self):
+        """Megvárja, amíg a listener minden eddigi rekordot kiírt."""
+        self.queue.join()
+
+    def shutdown(self):
+        logging.getLogger().removeHandler(self.handler)
+        self.listener.stop()
+
+    def _after_fork(self):
+        self.queue = queue.Queue(self.queue_size)
+        self.handler.queue = self.queue
+        self.listener = logging.handlers.QueueListener(self.queue, self.output, respect_handler_level=True)
+        self.listener.start()
+
+
+def configure(**options):
+    """A folyamat naplózásának (újra)beállítása; a korábbi listenert leállítja."""
+    global _service
+    if _service is not None:
+        _service.shutdown()
+    _service = LoggingService(**options)
+    return _service
+
+
+def _after_fork_in_child():
+    if _service is not None:
+        _service._after_fork()
+
+
+def _at_exit():
+    if _service is not None:
+        _service.shutdown()
+
+
+os.register_at_fork(after_in_child=_after_fork_in_child)
+atexit.register(_at_exit)
+
+
+def init_logging(app):
+    """Egy folyamatban egyszer állítja be; további app példányoknál csak a szinteket frissíti."""
+    def setting(name, default):
+        return app.config.get(name, os.getenv(name, default))
+
+    levels = parse_levels(setting("LOG_LEVELS", ""))
+    if _service is None:
+        configure(
+            level=setting("LOG_LEVEL", "INFO"),
+            levels=levels,
+            sample_rates=parse_sample_rates(setting("LOG_SAMPLE_RATES", "")),
+            fmt=setting("LOG_FORMAT", "json"),
+        )
+    else:
+        _service.set_levels(levels)
+    app.extensions["logging"] = _service
+
+    @app.before_request
+    def assign_request_id():
+        g.request_id = request.headers.get("X-Request-ID", "")[:64] or uuid.uuid4().hex
+
+    @app.after_request
+    def echo_request_id(response):
+        if "request_id" in g:
+            response.headers["X-Request-ID"] = g.request_id
+        return response
+
+    return _service
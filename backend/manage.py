@@ -1,11 +1,68 @@
-from app import app
-from models import db
-from flask_migrate import Migrate
+import os
+
+import click
 from flask.cli import FlaskGroup
 
-# Inicializáld újra a Flask-Migrate-et itt is
-migrate = Migrate(app, db) 
-cli = FlaskGroup(app)
+# Karbantartó parancsok alatt ne induljon háttérben email küldés; erre az email-worker parancs való
+os.environ["EMAIL_OUTBOX_WORKER"] = "off"
+
+from app import create_app  # noqa: E402
+
+# A Flask-Migrate a create_app-ban inicializálódik, így a "db" parancsok is elérhetők
+cli = FlaskGroup(create_app=create_app)
+
+
+@cli.command("compact-read-state")
+@click.option("--user-id", type=int, default=None, help="Csak ennek a usernek a sorait tömöríti.")
+def compact_read_state(user_id):
+    """PostView sorok tömörítése csoportonkénti vízjellé (READ_TRACKING_MODE=watermark)."""
+    import read_tracking
+
+    watermarks, deleted = read_tracking.compact_post_views(user_id)
+    click.echo(f"{watermarks} vízjel beállítva, {deleted} PostView sor törölve.")
+
+
+@cli.command("import-subjects")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--year", required=True, help="Félév, pl. 2025-2026-2.")
+def import_subjects(path, year):
+    """Egy félév tárgylistájának importja JSON/CSV dumpból (a meglévő pillanatképet lecseréli)."""
+    import subject_index
+
+    subjects = subject_index.read_dump(path)
+    count = subject_index.import_snapshot(year, subjects)
+    click.echo(f"{count} tárgy importálva ({year}). A futó szerverek újraindításkor töltik be.")
+
+
+@cli.command("gc-blobs")
+@click.option("--min-age", type=int, default=3600, show_default=True,
+              help="Ennél frissebb (mp) árva fájlokhoz nem nyúl.")
+def gc_blobs(min_age):
+    """Blob hivatkozásszámlálók újraszámolása, hivatkozatlan blobok és árva fájlok törlése."""
+    import blobs
+
+    rows, files = blobs.collect_garbage(min_age)
+    click.echo(f"{rows} hivatkozatlan blob és {files} árva fájl törölve.")
+
+
+@cli.command("email-worker")
+@click.option("--once", is_flag=True, help="Csak egy köteget dolgoz fel, utána kilép.")
+def email_worker(once):
+    """Az email outbox kiküldése külön folyamatban (EMAIL_OUTBOX_WORKER=off mellett)."""
+    from flask import current_app
+
+    worker = current_app.extensions["email_outbox"]
+    if once:
+        processed, sent = worker.run_once()
+        click.echo(f"{processed} email feldolgozva, {sent} elküldve.")
+        return
+
+    click.echo("Email worker fut (Ctrl+C a leállításhoz)...")
+    try:
+        worker.run_forever()
+    except KeyboardInterrupt:
+        worker.stop()
+
 
 if __name__ == '__main__':
-    cli()
\ No newline at end of file
+    cli()
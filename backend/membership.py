@@ -0,0 +1,166 @@
+"""Csoport-tagság ellenőrzés egy lekérdezéssel, rövid TTL-es cache-sel.
+
+A csoport-szintű végpontok (poszt, esemény, olvasottság) eddig két kérést
+futtattak jogosultság-ellenőrzésre (Group.query.get + GroupMember lookup).
+A status() ezt egyetlen LEFT JOIN-nal kérdezi le, és az eredményt rövid
+ideig cache-eli (a GROUP_MISSING-et nem). A join_group és a leavegroup
+invalidálja a bejegyzést.
+
+A cache backend cserélhető:
+  * MemoryBackend – folyamaton belüli LRU (alapértelmezett),
+  * RedisBackend  – bármilyen Redis-kompatibilis kliens (get/set(ex=)/delete),
+    több worker esetén így az invalidálás mindegyiknél látszik.
+Beállítás: MEMBERSHIP_CACHE_BACKEND=memory|redis, REDIS_URL, MEMBERSHIP_CACHE_TTL.
+
+Több workeres futásnál (SERVER_WORKERS > 1, gunicorn) a memory backend egy
+másik worker invalidálását nem látná, és a kilépett tag a TTL-ig még
+hozzáférne a csoporthoz: ilyenkor a cache kikapcsol (NullBackend), és
+minden ellenőrzés az adatbázisból jön.
+"""
+import logging
+import os
+from functools import wraps
+
+from flask import current_app, g, jsonify  # pyright: ignore[reportMissingImports]
+
+from cache import TTLCache
+from models import db, Group, GroupMember
+
+MEMBER = "member"
+NOT_MEMBER = "not_member"
+GROUP_MISSING = "group_missing"
+
+DEFAULT_TTL = 30
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryBackend:
+    def __init__(self, maxsize=50_000):
+        self._cache = TTLCache(maxsize=maxsize)
+
+    def get(self, key):
+        return self._cache.get(key)
+
+    def set(self, key, value, ttl):
+        self._cache.set(key, value, ttl=ttl)
+
+    def delete(self, key):
+        self._cache.delete(key)
+
+
+class NullBackend:
+    """Nem cache-el: több worker mellett, Redis nélkül."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def delete(self, key):
+        pass
+
+
+class RedisBackend:
+    def __init__(self, client, prefix="membership:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        if isinstance(value, bytes):
+            value = value.decode("utf-8")
+        return value
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+
+class MembershipService:
+    def __init__(self, backend=None, ttl=DEFAULT_TTL):
+        self.backend = backend or MemoryBackend()
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(user_id, group_id):
+        return f"{group_id}:{user_id}"
+
+    def status(self, user_id, group_id):
+        """MEMBER, NOT_MEMBER vagy GROUP_MISSING."""
+        key = self._key(user_id, group_id)
+        cached = self.backend.get(key)
+        if cached is not None:
+            return cached
+
+        row = (
+            db.session.query(Group.id, GroupMember.user_id)
+            .outerjoin(GroupMember, db.and_(
+                GroupMember.group_id == Group.id,
+                GroupMember.user_id == user_id,
+            ))
+            .filter(Group.id == group_id)
+            .first()
+        )
+        if row is None:
+            status = GROUP_MISSING
+        elif row.user_id is None:
+            status = NOT_MEMBER
+        else:
+            status = MEMBER
+
+        # A "nincs ilyen csoport" nem kerül cache-be: egy utána létrehozott csoport ne adjon 404-et a TTL-ig
+        if status != GROUP_MISSING:
+            self.backend.set(key, status, self.ttl)
+        return status
+
+    def invalidate(self, user_id, group_id):
+        self.backend.delete(self._key(user_id, group_id))
+
+
+def init_membership(app):
+    backend_name = app.config.get("MEMBERSHIP_CACHE_BACKEND", os.getenv("MEMBERSHIP_CACHE_BACKEND", "memory"))
+    ttl = int(app.config.get("MEMBERSHIP_CACHE_TTL", os.getenv("MEMBERSHIP_CACHE_TTL", DEFAULT_TTL)))
+
+    if backend_name == "redis":
+        import redis  # pyright: ignore[reportMissingImports]
+
+        backend = RedisBackend(redis.Redis.from_url(app.config.get("REDIS_URL", os.getenv("REDIS_URL"))))
+    elif int(app.config.get("SERVER_WORKERS", 1)) > 1:
+        logger.warning("Több worker fut, de MEMBERSHIP_CACHE_BACKEND=%s: a tagság-cache kikapcsolva "
+                       "(MEMBERSHIP_CACHE_BACKEND=redis kell hozzá)", backend_name)
+        backend = NullBackend()
+    else:
+        backend = MemoryBackend()
+
+    app.extensions["membership"] = MembershipService(backend, ttl=ttl)
+    return app.extensions["membership"]
+
+
+def get_service():
+    return current_app.extensions["membership"]
+
+
+def membership_status(user_id, group_id):
+    return get_service().status(user_id, group_id)
+
+
+def invalidate(user_id, group_id):
+    get_service().invalidate(user_id, group_id)
+
+
+def group_member_required(view):
+    """A <group_id> csoport létezését és g.user_id tagságát ellenőrzi (a @login_required után)."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        status = membership_status(g.user_id, kwargs["group_id"])
+        if status == GROUP_MISSING:
+            return jsonify({"error": "Csoport nem található"}), 404
+        if status == NOT_MEMBER:
+            return jsonify({"error": "Nem vagy tagja a csoportnak"}), 403
+        return view(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,401 @@
+"""Kérésenkénti SQL-számlálás és késleltetés metrikák, Prometheus formátumban (GET /metrics).
+
+Végpontonként (a route szabálya, pl. "/groups/<int:group_id>/posts", így
+a címkék száma korlátos):
+
+  * http_requests_total{method, endpoint, status}
+  * http_request_duration_seconds{method, endpoint}       – hisztogram
+  * http_response_size_bytes{endpoint}                    – hisztogram (streamelt válasz nélkül)
+  * db_queries_per_request{endpoint}                      – hisztogram
+  * db_queries_total{endpoint}, db_query_seconds_total{endpoint}
+
+A folyamat többi moduljának számlálói (a pillanatkép / a /metrics előtt
+olvassa ki őket a registry):
+
+  * http_client_requests_total{host}, http_client_failures_total{host}
+  * http_client_rejected_total{host, reason}                – nyitott breaker / teli pool
+  * http_client_connections_opened_total{host}, http_client_breaker_opened_total{host}
+  * http_client_in_flight{host}, http_client_max_concurrent{host}   – gauge
+  * http_client_breaker_state{host, state}                  – gauge, 1 az aktuális állapotnál
+  * auth_token_cache_total{result}                          – hit / miss
+
+Az SQL utasításokat a SQLAlchemy before/after_cursor_execute eseményei
+számolják egy ContextVar-ban tartott, kérésenkénti számlálóba (háttérszálak
+lekérdezései nem számítanak bele).
+
+Több worker folyamat (gunicorn) esetén METRICS_DIR-rel minden worker
+legfeljebb METRICS_FLUSH_INTERVAL másodpercenként kiírja a saját
+pillanatképét (<pid>.json), a /metrics pedig ezeket összegezve adja vissza.
+A kilépő worker (gunicorn worker_exit, pl. max_requests utáni csere) a
+számlálóit a közös retired.json-ba olvasztja, és törli a saját fájlját, így
+a mappa a workerek számával arányos marad, a számlálók pedig nem esnek
+vissza. METRICS_DIR nélkül csak a kiszolgáló folyamat számai látszanak.
+
+A query_guard.py ugyanezt a számlálót használja az N+1 lekérdezések és a
+kérésenkénti lekérdezés-keret ellenőrzésére.
+
+Nem éles módban (QUERY_DEBUG_HEADERS=1, alapból FLASK_DEBUG=1 mellett) a
+válasz X-Query-Count és Server-Timing fejlécet is kap.
+"""
+import bisect
+import contextvars
+import glob
+import json
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # nem POSIX (fejlesztői gép): ott nincs több workeres gunicorn
+    fcntl = None
+
+from flask import current_app, request  # pyright: ignore[reportMissingImports]
+from sqlalchemy import event  # pyright: ignore[reportMissingImports]
+from sqlalchemy.engine import Engine  # pyright: ignore[reportMissingImports]
+
+import auth
+import http_client
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, 144)
+DEFAULT_FLUSH_INTERVAL = 5
+RETIRED_SNAPSHOT = "retired.json"
+
+UNMATCHED = "<unmatched>"
+
+
+class RequestStats:
+    __slots__ = ("started", "queries", "db_seconds", "statements")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.statements = None  # a query_guard kapcsolja be (lista), egyébként nem gyűjtjük
+
+
+_current = contextvars.ContextVar("request_stats", default=None)
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name, documentation, labels):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.values = {}
+
+    def inc(self, labels, amount=1):
+        self.values[labels] = self.values.get(labels, 0) + amount
+
+    def set(self, labels, value):
+        # Máshol (pl. http_client) számolt, folyamaton belül monoton érték átvétele
+        self.values[labels] = value
+
+    def snapshot(self):
+        return [[list(labels), value] for labels, value in self.values.items()]
+
+    def merge(self, data):
+        for labels, value in data:
+            self.inc(tuple(labels), value)
+
+    def samples(self):
+        for labels, value in sorted(self.values.items()):
+            yield self.name, self.labels, labels, value
+
+
+class Gauge(Counter):
+    """Pillanatnyi érték; a workerek értékei összeadódnak, a kilépett workeré nem marad meg."""
+    kind = "gauge"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labels, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        self.buckets = buckets
+        self.values = {}  # labels -> [bucket számlálók (nem kumulatív) ..., +Inf, sum]
+
+    def _series(self, labels):
+        series = self.values.get(labels)
+        if series is None:
+            series = self.values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        return series
+
+    def observe(self, labels, value):
+        series = self._series(labels)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def snapshot(self):
+        return [[list(labels), series] for labels, series in self.values.items()]
+
+    def merge(self, data):
+        for labels, series in data:
+            target = self._series(tuple(labels))
+            for i, value in enumerate(series):
+                target[i] += value
+
+    def samples(self):
+        bounds = [_format_value(b) for b in self.buckets] + ["+Inf"]
+        for labels, series in sorted(self.values.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                yield f"{self.name}_bucket", self.labels + ("le",), labels + (bound,), cumulative
+            yield f"{self.name}_sum", self.labels, labels, series[-1]
+            yield f"{self.name}_count", self.labels, labels, cumulative
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value)) if abs(value) < 1e15 else repr(value)
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = Counter("http_requests_total", "HTTP kérések száma.", ("method", "endpoint", "status"))
+        self.latency = Histogram("http_request_duration_seconds", "Kérés kiszolgálási ideje.",
+                                 ("method", "endpoint"), LATENCY_BUCKETS)
+        self.response_size = Histogram("http_response_size_bytes", "Válasz törzsének mérete.",
+                                       ("endpoint",), SIZE_BUCKETS)
+        self.queries_per_request = Histogram("db_queries_per_request", "SQL utasítások száma kérésenként.",
+                                             ("endpoint",), QUERY_BUCKETS)
+        self.queries = Counter("db_queries_total", "SQL utasítások száma.", ("endpoint",))
+        self.db_seconds = Counter("db_query_seconds_total", "SQL utasításokkal töltött idő.", ("endpoint",))
+        self.outbound_requests = Counter("http_client_requests_total", "Kimenő HTTP kérések száma.", ("host",))
+        self.outbound_failures = Counter("http_client_failures_total", "Sikertelen kimenő HTTP kérések.", ("host",))
+        self.outbound_rejected = Counter("http_client_rejected_total", "Küldés nélkül elutasított kimenő kérések.",
+                                         ("host", "reason"))
+        self.outbound_connections = Counter("http_client_connections_opened_total",
+                                            "A host poolja által nyitott kapcsolatok.", ("host",))
+        self.breaker_opened = Counter("http_client_breaker_opened_total", "A circuit breaker nyitásai.", ("host",))
+        self.outbound_in_flight = Gauge("http_client_in_flight", "Folyamatban lévő kimenő kérések.", ("host",))
+        self.outbound_limit = Gauge("http_client_max_concurrent", "Egyidejű kimenő kérések korlátja.", ("host",))
+        self.breaker_state = Gauge("http_client_breaker_state", "A circuit breaker állapota.", ("host", "state"))
+        self.token_cache = Counter("auth_token_cache_total", "JWT token cache találatok.", ("result",))
+        self.metrics = (self.requests, self.latency, self.response_size,
+                        self.queries_per_request, self.queries, self.db_seconds,
+                        self.outbound_requests, self.outbound_failures, self.outbound_rejected,
+                        self.outbound_connections, self.breaker_opened, self.outbound_in_flight,
+                        self.outbound_limit, self.breaker_state, self.token_cache)
+        self._collectors = []
+
+    def add_collector(self, collect):
+        """collect(registry) a pillanatkép és a renderelés előtt, a registry zárja alatt fut."""
+        self._collectors.append(collect)
+
+    def _refresh(self):
+        for collect in self._collectors:
+            collect(self)
+
+    def record(self, method, endpoint, status, seconds, size, stats):
+        with self._lock:
+            self.requests.inc((method, endpoint, str(status)))
+            self.latency.observe((method, endpoint), seconds)
+            if size is not None:
+                self.response_size.observe((endpoint,), size)
+            self.queries_per_request.observe((endpoint,), stats.queries)
+            self.queries.inc((endpoint,), stats.queries)
+            self.db_seconds.inc((endpoint,), stats.db_seconds)
+
+    def snapshot(self, gauges=True):
+        with self._lock:
+            self._refresh()
+            return {m.name: m.snapshot() for m in self.metrics if gauges or m.kind != "gauge"}
+
+    def merge(self, snapshot):
+        with self._lock:
+            for m in self.metrics:
+                m.merge(snapshot.get(m.name, []))
+
+    def render(self):
+        lines = []
+        with self._lock:
+            self._refresh()
+            for m in self.metrics:
+                lines.append(f"# HELP {m.name} {m.documentation}")
+                lines.append(f"# TYPE {m.name} {m.kind}")
+                for name, label_names, label_values, value in m.samples():
+                    labels = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(label_names, label_values))
+                    lines.append(f"{name}{{{labels}}} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class Metrics:
+    def __init__(self, directory=None, flush_interval=DEFAULT_FLUSH_INTERVAL, debug_headers=False):
+        self.registry = Registry()
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.debug_headers = debug_headers
+        self._last_flush = 0.0
+        self._retired = False
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _write(self, name, snapshot):
+        path = self._path(name)
+        tmp = f"{path}.tmp.{os.getpid()}"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp, path)
+
+    def _lock(self, exclusive):
+        """Fájlzár a mappán: a retire() kizárólagosan, a collect() megosztva fogja."""
+        f = open(self._path(".lock"), "a")
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        return f
+
+    def flush(self, force=False):
+        """A folyamat pillanatképének kiírása METRICS_DIR-be (atomikusan), legfeljebb flush_interval-onként."""
+        if not self.directory or self._retired:
+            return  # retire() után a számok már a retired.json-ban vannak
+        now = time.monotonic()
+        if not force and now - self._last_flush < self.flush_interval:
+            return
+        self._last_flush = now
+        os.makedirs(self.directory, exist_ok=True)
+        self._write(f"{os.getpid()}.json", self.registry.snapshot())
+
+    def retire(self):
+        """Kilépő worker: a számlálói a retired.json-ba kerülnek, a <pid>.json törlődik."""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with self._lock(exclusive=True):
+            merged = Registry()
+            try:
+                with open(self._path(RETIRED_SNAPSHOT), encoding="utf-8") as f:
+                    merged.merge(json.load(f))
+            except (OSError, ValueError):
+                pass  # még nincs (vagy sérült) összesítő
+            # A gauge-ek (pl. folyamatban lévő kérések) a kilépő workerrel együtt megszűnnek
+            merged.merge(self.registry.snapshot(gauges=False))
+            self._write(RETIRED_SNAPSHOT, merged.snapshot())
+            self._retired = True
+            try:
+                os.unlink(self._path(f"{os.getpid()}.json"))
+            except FileNotFoundError:
+                pass
+
+    def collect(self):
+        """Prometheus szöveg; METRICS_DIR esetén az összes (élő és kilépett) worker összegével."""
+        if not self.directory:
+            return self.registry.render()
+        self.flush(force=True)
+        merged = Registry()
+        # Megosztott zár: egy épp kilépő worker számai se kétszer, se egyszer sem ne hiányozzanak
+        with self._lock(exclusive=False):
+            for path in glob.glob(os.path.join(self.directory, "*.json")):
+                try:
+                    with open(path, encoding="utf-8") as f:
+                        merged.merge(json.load(f))
+                except (OSError, ValueError):
+                    continue  # sérült pillanatkép
+        return merged.render()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("metrics_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    started = conn.info.get("metrics_started")
+    if stats is None or not started:
+        return
+    stats.queries += 1
+    stats.db_seconds += time.perf_counter() - started.pop()
+    if stats.statements is not None:
+        stats.statements.append(statement)
+
+
+def current_stats():
+    return _current.get()
+
+
+def collect_outbound_http(registry):
+    for host, stats in http_client.stats().items():
+        labels = (host,)
+        registry.outbound_requests.set(labels, stats["requests"])
+        registry.outbound_failures.set(labels, stats["failures"])
+        registry.outbound_rejected.set((host, "breaker_open"), stats["rejected_open"])
+        registry.outbound_rejected.set((host, "pool_saturated"), stats["rejected_saturated"])
+        registry.outbound_connections.set(labels, stats["connections_opened"])
+        registry.breaker_opened.set(labels, stats["breaker_opened"])
+        registry.outbound_in_flight.set(labels, stats["in_flight"])
+        registry.outbound_limit.set(labels, stats["max_concurrent"])
+        for state in (http_client.CLOSED, http_client.OPEN, http_client.HALF_OPEN):
+            registry.breaker_state.set((host, state), int(stats["breaker_state"] == state))
+
+
+def collect_token_cache(registry):
+    stats = dict(auth.token_cache_stats)
+    registry.token_cache.set(("hit",), stats["hits"])
+    registry.token_cache.set(("miss",), stats["misses"])
+
+
+def init_metrics(app):
+    metrics = Metrics(
+        directory=app.config.get("METRICS_DIR") or None,
+        flush_interval=float(app.config.get("METRICS_FLUSH_INTERVAL", DEFAULT_FLUSH_INTERVAL)),
+        debug_headers=bool(app.config.get("QUERY_DEBUG_HEADERS")),
+    )
+    metrics.registry.add_collector(collect_outbound_http)
+    metrics.registry.add_collector(collect_token_cache)
+    app.extensions["metrics"] = metrics
+
+    @app.before_request
+    def start_request_stats():
+        request.environ["metrics.token"] = _current.set(RequestStats())
+
+    @app.after_request
+    def record_request_stats(response):
+        stats = _current.get()
+        if stats is None:
+            return response
+        elapsed = time.perf_counter() - stats.started
+        endpoint = request.url_rule.rule if request.url_rule is not None else UNMATCHED
+        size = None if response.is_streamed else response.calculate_content_length()
+        metrics.registry.record(request.method, endpoint, response.status_code, elapsed, size, stats)
+        metrics.flush()
+
+        if metrics.debug_headers:
+            response.headers["X-Query-Count"] = str(stats.queries)
+            response.headers["Server-Timing"] = (
+                f'db;dur={stats.db_seconds * 1000:.1f};desc="{stats.queries} queries", '
+                f"app;dur={elapsed * 1000:.1f}"
+            )
+        return response
+
+    @app.teardown_request
+    def reset_request_stats(exc):
+        token = request.environ.pop("metrics.token", None)
+        if token is not None:
+            _current.reset(token)
+
+    def metrics_endpoint():
+        token = current_app.config.get("METRICS_TOKEN")
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            return "Unauthorized", 401
+        return current_app.response_class(metrics.collect(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    app.add_url_rule("/metrics", "metrics", metrics_endpoint)
+    return metrics
@@ -0,0 +1,79 @@
+"""add interests + user_interests, backfill from users.hobbies
+
+Revision ID: a1c4e2b7d9f0
+Revises: 3ed4ac7724a6
+Create Date: 2026-10-18 10:12:31.104522
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1c4e2b7d9f0'
+down_revision = '3ed4ac7724a6'
+branch_labels = None
+depends_on = None
+
+
+BATCH_SIZE = 1000
+
+
+def upgrade():
+    op.create_table('interests',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('interests', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_interests_name'), ['name'], unique=True)
+
+    op.create_table('user_interests',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('interest_id', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['interest_id'], ['interests.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'interest_id')
+    )
+    with op.batch_alter_table('user_interests', schema=None) as batch_op:
+        batch_op.create_index('ix_user_interests_interest_user', ['interest_id', 'user_id'], unique=False)
+
+    # Backfill a meglévő, vesszővel elválasztott users.hobbies mezőből
+    bind = op.get_bind()
+    users = sa.table('users', sa.column('id', sa.Integer), sa.column('hobbies', sa.Text))
+    interests = sa.table('interests', sa.column('id', sa.Integer), sa.column('name', sa.String))
+    links = sa.table('user_interests', sa.column('user_id', sa.Integer), sa.column('interest_id', sa.Integer))
+
+    user_names = {}
+    for user_id, hobbies in bind.execute(sa.select(users.c.id, users.c.hobbies).where(users.c.hobbies.isnot(None))):
+        names = {h.strip().lower()[:100] for h in hobbies.split(",") if h.strip()}
+        if names:
+            user_names[user_id] = names
+
+    all_names = sorted(set().union(*user_names.values())) if user_names else []
+    if all_names:
+        op.bulk_insert(interests, [{"name": n} for n in all_names])
+
+    ids_by_name = dict(
+        (name, interest_id)
+        for interest_id, name in bind.execute(sa.select(interests.c.id, interests.c.name))
+    )
+
+    rows = [
+        {"user_id": user_id, "interest_id": ids_by_name[name]}
+        for user_id, names in user_names.items()
+        for name in names
+    ]
+    for i in range(0, len(rows), BATCH_SIZE):
+        op.bulk_insert(links, rows[i:i + BATCH_SIZE])
+
+
+def downgrade():
+    with op.batch_alter_table('user_interests', schema=None) as batch_op:
+        batch_op.drop_index('ix_user_interests_interest_user')
+
+    op.drop_table('user_interests')
+    with op.batch_alter_table('interests', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_interests_name'))
+
+    op.drop_table('interests')
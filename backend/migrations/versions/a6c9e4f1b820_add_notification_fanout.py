@@ -0,0 +1,52 @@
+"""notification fan-out: notification refs, keyset index, per-user unread counters
+
+Revision ID: a6c9e4f1b820
+Revises: f3a8d2e5b716
+Create Date: 2026-10-18 15:48:30.642871
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6c9e4f1b820'
+down_revision = 'f3a8d2e5b716'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('group_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('actor_id', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('ref_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_notifications_group_id', 'study_groups', ['group_id'], ['id'])
+        batch_op.create_foreign_key('fk_notifications_actor_id', 'users', ['actor_id'], ['id'])
+        batch_op.create_index('ix_notifications_user_created', ['user_id', 'created_at', 'id'], unique=False)
+
+    op.create_table('notification_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('unread', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+
+    # Backfill: a meglévő olvasatlan értesítésekből induló számlálók
+    op.execute(
+        "INSERT INTO notification_counters (user_id, unread) "
+        "SELECT user_id, COUNT(*) FROM notifications "
+        "WHERE (is_read = 0 OR is_read IS NULL) AND deleted_at IS NULL GROUP BY user_id"
+    )
+
+
+def downgrade():
+    op.drop_table('notification_counters')
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('ix_notifications_user_created')
+        batch_op.drop_constraint('fk_notifications_actor_id', type_='foreignkey')
+        batch_op.drop_constraint('fk_notifications_group_id', type_='foreignkey')
+        batch_op.drop_column('ref_id')
+        batch_op.drop_column('actor_id')
+        batch_op.drop_column('group_id')
@@ -0,0 +1,27 @@
+"""add posts (group_id, deleted_at, created_at) index for unread counts
+
+Revision ID: b7e3f1a20c5d
+Revises: a1c4e2b7d9f0
+Create Date: 2026-10-18 11:02:47.551830
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e3f1a20c5d'
+down_revision = 'a1c4e2b7d9f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A post_views (user_id, post_id) összetett indexet a meglévő unique_user_post_view adja
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.create_index('ix_posts_group_deleted_created', ['group_id', 'deleted_at', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('posts', schema=None) as batch_op:
+        batch_op.drop_index('ix_posts_group_deleted_created')
@@ -0,0 +1,46 @@
+"""content-addressed attachment storage: blobs table, attachment blob refs
+
+Revision ID: b8d4f2a6c193
+Revises: a6c9e4f1b820
+Create Date: 2026-10-18 19:12:05.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8d4f2a6c193'
+down_revision = 'a6c9e4f1b820'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('blobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('sha256', sa.String(length=64), nullable=False),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('path', sa.String(length=500), nullable=False),
+        sa.Column('ref_count', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('sha256')
+    )
+
+    # A meglévő csatolmányok blob_id nélkül maradnak (saját fájljuk uploads/posts, uploads/comments alatt)
+    for table in ('post_attachments', 'comment_attachments'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('blob_id', sa.Integer(), nullable=True))
+            batch_op.create_index(batch_op.f(f'ix_{table}_blob_id'), ['blob_id'], unique=False)
+            batch_op.create_foreign_key(f'fk_{table}_blob_id', 'blobs', ['blob_id'], ['id'])
+
+
+def downgrade():
+    for table in ('comment_attachments', 'post_attachments'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_constraint(f'fk_{table}_blob_id', type_='foreignkey')
+            batch_op.drop_index(batch_op.f(f'ix_{table}_blob_id'))
+            batch_op.drop_column('blob_id')
+
+    op.drop_table('blobs')
@@ -0,0 +1,40 @@
+"""attachment thumbnails and previews: blob derivative paths, attachment urls
+
+Revision ID: c2e7a9d4b318
+Revises: b8d4f2a6c193
+Create Date: 2026-10-18 20:03:41.527716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2e7a9d4b318'
+down_revision = 'b8d4f2a6c193'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('blobs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('thumbnail_path', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('preview_path', sa.String(length=500), nullable=True))
+        batch_op.add_column(sa.Column('derivatives_status', sa.String(length=20), nullable=True))
+
+    for table in ('post_attachments', 'comment_attachments'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('thumbnail_url', sa.String(length=500), nullable=True))
+            batch_op.add_column(sa.Column('preview_url', sa.String(length=500), nullable=True))
+
+
+def downgrade():
+    for table in ('comment_attachments', 'post_attachments'):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('preview_url')
+            batch_op.drop_column('thumbnail_url')
+
+    with op.batch_alter_table('blobs', schema=None) as batch_op:
+        batch_op.drop_column('derivatives_status')
+        batch_op.drop_column('preview_path')
+        batch_op.drop_column('thumbnail_path')
@@ -0,0 +1,39 @@
+"""add group_read_states (per-group read watermark)
+
+Revision ID: c4d82e9f6a13
+Revises: b7e3f1a20c5d
+Create Date: 2026-10-18 11:48:05.317264
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d82e9f6a13'
+down_revision = 'b7e3f1a20c5d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Backfill nem kell: vízjel hiányában a meglévő PostView sorok kivételként érvényesek.
+    # A tömörítést a `python manage.py compact-read-state` végzi, a watermark módra váltás után.
+    op.create_table('group_read_states',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('group_id', sa.Integer(), nullable=False),
+        sa.Column('last_read_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['group_id'], ['study_groups.id'], ),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+        sa.PrimaryKeyConstraint('user_id', 'group_id')
+    )
+    with op.batch_alter_table('group_read_states', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_group_read_states_group_id'), ['group_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('group_read_states', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_group_read_states_group_id'))
+
+    op.drop_table('group_read_states')
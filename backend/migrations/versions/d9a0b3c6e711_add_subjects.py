@@ -0,0 +1,32 @@
+"""add subjects (offline subject catalogue snapshots)
+
+Revision ID: d9a0b3c6e711
+Revises: c4d82e9f6a13
+Create Date: 2026-10-18 13:02:41.508113
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd9a0b3c6e711'
+down_revision = 'c4d82e9f6a13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Adatot a `python manage.py import-subjects <fájl> --year <félév>` tölt bele
+    op.create_table('subjects',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('year', sa.String(length=20), nullable=False),
+        sa.Column('code', sa.String(length=50), nullable=False),
+        sa.Column('name', sa.String(length=255), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('year', 'code', name='unique_subject_year_code')
+    )
+
+
+def downgrade():
+    op.drop_table('subjects')
@@ -0,0 +1,26 @@
+"""add email_outbox.text_body (plain-text alternative)
+
+Revision ID: f3a8d2e5b716
+Revises: e2f7c1d4a905
+Create Date: 2026-10-18 15:05:52.118904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a8d2e5b716'
+down_revision = 'e2f7c1d4a905'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('text_body', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('email_outbox', schema=None) as batch_op:
+        batch_op.drop_column('text_body')
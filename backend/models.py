@@ -32,12 +32,51 @@ class User(db.Model):
     posts = relationship('Post', backref='author', lazy=True, cascade="all, delete-orphan")
     comments = relationship('Comment', backref='author', lazy=True, cascade="all, delete-orphan")
     
-    notifications = relationship('Notification', backref='recipient', lazy=True, cascade="all, delete-orphan")
+    notifications = relationship('Notification', backref='recipient', lazy=True, foreign_keys='Notification.user_id', cascade="all, delete-orphan")
+
+    interests = relationship('Interest', secondary='user_interests', backref='users', lazy=True)
 
     def __repr__(self):
         return f"<User {self.email}>"
 
 
+# User <-> Interest kapcsolótábla, mindkét irányban indexelve:
+# a PK (user_id, interest_id) a user -> érdeklődés irányt,
+# az ix_user_interests_interest_user az érdeklődés -> user irányt szolgálja ki.
+user_interests = db.Table(
+    'user_interests',
+    db.Column('user_id', db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('interest_id', db.Integer, db.ForeignKey('interests.id', ondelete='CASCADE'), primary_key=True),
+    db.Index('ix_user_interests_interest_user', 'interest_id', 'user_id'),
+)
+
+
+class Interest(db.Model):
+    __tablename__ = 'interests'
+
+    id = db.Column(db.Integer, primary_key=True)
+    # Normalizált (kisbetűs, levágott) név
+    name = db.Column(db.String(100), unique=True, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<Interest {self.name}>"
+
+
+class Subject(db.Model):
+    """Félévenkénti tárgylista-pillanatkép (manage.py import-subjects), lásd subject_index.py."""
+    __tablename__ = 'subjects'
+
+    id = db.Column(db.Integer, primary_key=True)
+    year = db.Column(db.String(20), nullable=False)  # pl. "2025-2026-2"
+    code = db.Column(db.String(50), nullable=False)
+    name = db.Column(db.String(255), nullable=False)
+
+    __table_args__ = (db.UniqueConstraint('year', 'code', name='unique_subject_year_code'),)
+
+    def __repr__(self):
+        return f"<Subject {self.year} {self.code}>"
+
+
 class GroupMember(db.Model):
     __tablename__ = 'group_members'
     
@@ -112,6 +151,9 @@ class Post(db.Model):
     
     comments = relationship('Comment', backref='post', lazy=True, cascade="all, delete-orphan")
 
+    # Olvasatlan számlálóhoz és a csoport feedhez: csoporton belüli, nem törölt posztok időrendben
+    __table_args__ = (db.Index('ix_posts_group_deleted_created', 'group_id', 'deleted_at', 'created_at'),)
+
     def __repr__(self):
         return f"<Post {self.title[:20]}>"
 
@@ -150,6 +192,24 @@ class PostView(db.Model):
         return f"<PostView User:{self.user_id} Post:{self.post_id}>"
 
 
+class GroupReadState(db.Model):
+    """Csoportonkénti "eddig olvastam" vízjel (READ_TRACKING_MODE=watermark).
+
+    A last_read_at-nál nem újabb posztok olvasottnak számítanak; az ennél újabb,
+    egyenként megnyitott posztokat a PostView sorok jelölik (kivétel-halmaz).
+    """
+    __tablename__ = 'group_read_states'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    group_id = db.Column(db.Integer, db.ForeignKey('study_groups.id'), primary_key=True, index=True)
+
+    last_read_at = db.Column(db.DateTime, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<GroupReadState User:{self.user_id} Group:{self.group_id} {self.last_read_at}>"
+
+
 class Notification(db.Model):
     __tablename__ = 'notifications'
     
@@ -164,10 +224,84 @@ class Notification(db.Model):
     deleted_at = db.Column(db.DateTime, nullable=True, index=True)
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Mire vonatkozik (notifications.py fan-out tölti ki)
+    group_id = db.Column(db.Integer, db.ForeignKey('study_groups.id'), nullable=True)
+    actor_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    ref_id = db.Column(db.Integer, nullable=True)  # poszt / komment / esemény id, a type szerint
+
+    # GET /notifications: user szerinti keyset lapozás (created_at DESC, id DESC)
+    __table_args__ = (db.Index('ix_notifications_user_created', 'user_id', 'created_at', 'id'),)
     
     def __repr__(self):
         return f"<Notification ID:{self.id} Type:{self.type}>"    
+
+
+class NotificationCounter(db.Model):
+    """Userenkénti olvasatlan értesítés-számláló (a fan-out növeli, az olvasottnak jelölés csökkenti)."""
+    __tablename__ = 'notification_counters'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    unread = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<NotificationCounter User:{self.user_id} {self.unread}>"
     
+class EmailOutbox(db.Model):
+    """Kimenő email sor (email_outbox.py): a route csak beírja, a worker küldi el.
+
+    A next_attempt_at egyben a foglalás (lease) is: kiküldés előtt a worker
+    előretolja, így egy összeomlott worker sorai a lease lejárta után újra
+    sorra kerülnek. Sikeres küldés után a törzsek törlődnek (ideiglenes jelszót is tartalmazhatnak).
+    """
+    __tablename__ = 'email_outbox'
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    to_email = db.Column(db.String(120), nullable=False)
+    to_name = db.Column(db.String(100), nullable=True)
+    subject = db.Column(db.String(255), nullable=False)
+    html_body = db.Column(db.Text, nullable=True)
+    text_body = db.Column(db.Text, nullable=True)
+
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending | sent | failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.String(500), nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),)
+
+    def __repr__(self):
+        return f"<EmailOutbox ID:{self.id} {self.status} -> {self.to_email}>"
+
+
+class Blob(db.Model):
+    """Tartalom szerint címzett fájl (blobs.py): azonos tartalom egyszer van lemezen.
+
+    A ref_count a rá mutató PostAttachment/CommentAttachment sorok száma; az
+    utolsó hivatkozás törlésekor a sor és a fájl is törlődik.
+    """
+    __tablename__ = "blobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    sha256 = db.Column(db.String(64), nullable=False, unique=True)
+    size = db.Column(db.BigInteger, nullable=False)
+    path = db.Column(db.String(500), nullable=False)  # az UPLOAD_FOLDER-hez relatív, pl. blobs/ab/ab12... (kiterjesztés nélkül)
+    ref_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Bélyegkép / előnézet (derivatives.py), a blob mellett: blobs/ab/<sha>.thumb.jpg, .preview.jpg
+    thumbnail_path = db.Column(db.String(500), nullable=True)
+    preview_path = db.Column(db.String(500), nullable=True)
+    derivatives_status = db.Column(db.String(20), nullable=True)  # NULL | done | unsupported | failed
+
+    def __repr__(self):
+        return f"<Blob {self.sha256[:12]} refs:{self.ref_count}>"
+
+
 class PostAttachment(db.Model):
     __tablename__ = "post_attachments"
 
@@ -178,6 +312,11 @@ class PostAttachment(db.Model):
     file_url = db.Column(db.String(500), nullable=False)
     mime_type = db.Column(db.String(100), nullable=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # NULL: a tartalom-címzett tárolás előtti, saját fájlos csatolmány
+    blob_id = db.Column(db.Integer, db.ForeignKey("blobs.id"), nullable=True, index=True)
+    # A blob bélyegképe/előnézete, a listázáshoz ide másolva (a derivatives worker tölti ki)
+    thumbnail_url = db.Column(db.String(500), nullable=True)
+    preview_url = db.Column(db.String(500), nullable=True)
 
     post = relationship("Post", backref="attachments")
 
@@ -195,6 +334,11 @@ class CommentAttachment(db.Model):
     file_url = db.Column(db.String(500), nullable=False)
     mime_type = db.Column(db.String(100), nullable=True)
     uploaded_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # NULL: a tartalom-címzett tárolás előtti, saját fájlos csatolmány
+    blob_id = db.Column(db.Integer, db.ForeignKey("blobs.id"), nullable=True, index=True)
+    # A blob bélyegképe/előnézete, a listázáshoz ide másolva (a derivatives worker tölti ki)
+    thumbnail_url = db.Column(db.String(500), nullable=True)
+    preview_url = db.Column(db.String(500), nullable=True)
 
     comment = relationship("Comment", backref="attachments")
 
@@ -0,0 +1,196 @@
+"""Értesítések: háttérben futó fan-out a csoporttagok felé.
+
+Poszt, komment vagy esemény létrehozásakor a route a commit után csak egy
+fan-out feladatot tesz a sorba (enqueue_fanout); a kérésen belül nem fut
+semmi. A feladat két utasítás:
+
+    INSERT INTO notifications (...) SELECT gm.user_id, ... FROM group_members gm
+        WHERE gm.group_id = :group AND gm.user_id != :actor
+    INSERT INTO notification_counters (user_id, unread) SELECT gm.user_id, 1 ...
+        ON DUPLICATE KEY UPDATE unread = unread + 1
+
+így a tagok számától függetlenül két kérés. Az olvasatlan szám a
+notification_counters sorból jön, nem COUNT(*)-ból; az olvasottnak jelölés
+a ténylegesen átállított sorok számával csökkenti.
+
+A sor folyamaton belüli (queue.Queue + egy worker szál), újraindításkor a
+még ki nem osztott feladatok elvesznek. NOTIFICATION_FANOUT=thread
+(alapértelmezett) vagy manual (a feladatokat drain() futtatja, tesztekhez).
+"""
+import os
+import queue
+import threading
+from datetime import datetime, timezone
+
+from flask import current_app  # pyright: ignore[reportMissingImports]
+
+from db_helpers import upsert_from_select
+from models import db, GroupMember, Notification, NotificationCounter, User
+
+POST = "post"
+COMMENT = "comment"
+EVENT = "event"
+
+_STOP = object()
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _content(kind, actor_name, title):
+    if kind == POST:
+        return f"{actor_name} új posztot írt: {title}"
+    if kind == COMMENT:
+        return f"{actor_name} hozzászólt: {title}"
+    return f"Új esemény: {title}"
+
+
+def fan_out(kind, group_id, actor_id, ref_id, title):
+    """Értesítés a csoport összes tagjának (a szerzőn kívül). Visszaadja a címzettek számát."""
+    actor_name = db.session.query(User.name).filter(User.id == actor_id).scalar() or "Valaki"
+    content = _content(kind, actor_name, title)[:1000]
+
+    recipients = (GroupMember.group_id == group_id, GroupMember.user_id != actor_id)
+    rows = db.select(
+        GroupMember.user_id,
+        db.literal(kind, db.String),
+        db.literal(content, db.Text),
+        db.literal(group_id, db.Integer),
+        db.literal(actor_id, db.Integer),
+        db.literal(ref_id, db.Integer),
+        db.literal(False, db.Boolean),
+        db.literal(_utcnow(), db.DateTime),
+    ).where(*recipients)
+
+    inserted = db.session.execute(
+        db.insert(Notification).from_select(
+            ["user_id", "type", "content", "group_id", "actor_id", "ref_id", "is_read", "created_at"],
+            rows,
+        )
+    ).rowcount
+
+    counters = NotificationCounter.__table__
+    upsert_from_select(
+        NotificationCounter,
+        ["user_id", "unread"],
+        db.select(GroupMember.user_id, db.literal(1, db.Integer)).where(*recipients),
+        {"unread": counters.c.unread + 1},
+    )
+    db.session.commit()
+    return inserted
+
+
+def unread_count(user_id):
+    counter = db.session.get(NotificationCounter, user_id)
+    return counter.unread if counter else 0
+
+
+def _decrement(user_id, n):
+    if n <= 0:
+        return
+    NotificationCounter.query.filter_by(user_id=user_id).update(
+        {"unread": db.case((NotificationCounter.unread > n, NotificationCounter.unread - n), else_=0)},
+        synchronize_session=False,
+    )
+
+
+def _unread(user_id):
+    return (
+        Notification.user_id == user_id,
+        db.or_(Notification.is_read.is_(False), Notification.is_read.is_(None)),
+        Notification.deleted_at.is_(None),
+    )
+
+
+def mark_read(user_id, notification_id):
+    """Egy értesítés olvasottnak jelölése; True, ha eddig olvasatlan volt."""
+    changed = Notification.query.filter(Notification.id == notification_id, *_unread(user_id)).update(
+        {"is_read": True}, synchronize_session=False
+    )
+    _decrement(user_id, changed)
+    db.session.commit()
+    return changed == 1
+
+
+def mark_all_read(user_id):
+    changed = Notification.query.filter(*_unread(user_id)).update({"is_read": True}, synchronize_session=False)
+    _decrement(user_id, changed)
+    db.session.commit()
+    return changed
+
+
+class FanoutQueue:
+    def __init__(self, app):
+        self.app = app
+        self._queue = queue.Queue()
+        self._thread = None
+
+    def submit(self, **job):
+        self._queue.put(job)
+
+    def _run(self, job):
+        with self.app.app_context():
+            try:
+                fan_out(**job)
+            except Exception:
+                db.session.rollback()
+                self.app.logger.exception("értesítés fan-out sikertelen: %s", job)
+            finally:
+                db.session.remove()
+
+    def _loop(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                self._run(job)
+            finally:
+                self._queue.task_done()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="notification-fanout", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def drain(self):
+        """Futó szálnál megvárja a sor kiürülését, egyébként itt futtatja a feladatokat."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+            return
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._run(job)
+            self._queue.task_done()
+
+
+def init_notifications(app, start=True):
+    fanout = FanoutQueue(app)
+    app.extensions["notifications"] = fanout
+    if start:
+        start_fanout(app)
+    return fanout
+
+
+def start_fanout(app):
+    """A fan-out szál indítása, ha NOTIFICATION_FANOUT=thread (gunicorn alatt a fork után)."""
+    if app.config.get("NOTIFICATION_FANOUT", os.getenv("NOTIFICATION_FANOUT", "thread")) == "thread":
+        app.extensions["notifications"].start()
+
+
+def enqueue_fanout(kind, group_id, actor_id, ref_id, title):
+    """A commit után hívandó: a fan-out a háttérben fut, nem a kérésben."""
+    current_app.extensions["notifications"].submit(
+        kind=kind, group_id=group_id, actor_id=actor_id, ref_id=ref_id, title=title
+    )
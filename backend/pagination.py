@@ -0,0 +1,76 @@
+"""Kurzor (keyset) alapú lapozás (created_at, id) párra.
+
+A kurzor egy átlátszatlan, URL-biztos string, ami az utolsó visszaadott sor
+(created_at, id) értékét kódolja. Így a következő oldal lekérése indexen
+futó tartomány-szűrés, nem OFFSET, és a költsége nem nő a lista hosszával.
+"""
+import base64
+from datetime import datetime, timezone
+
+from models import db
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """(created_at, id) a kurzorból; hibás kurzor esetén ValueError."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8")
+        created_str, id_str = raw.rsplit("|", 1)
+        created_at = datetime.fromisoformat(created_str)
+        row_id = int(id_str)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Hibás kurzor") from e
+
+    # Az adatbázisban naiv UTC időpontok vannak
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc).replace(tzinfo=None)
+    return created_at, row_id
+
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE):
+    """A ?limit= paraméter 1..MAX_PAGE_SIZE közé szorítva; hibás érték esetén ValueError."""
+    if value is None or value == "":
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError("A limit legalább 1 legyen")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def before(model, cursor):
+    """Szűrő: a kurzornál régebbi sorok (created_at DESC, id DESC rendezéshez)."""
+    created_at, row_id = decode_cursor(cursor)
+    return db.or_(
+        model.created_at < created_at,
+        db.and_(model.created_at == created_at, model.id < row_id),
+    )
+
+
+def after(model, cursor):
+    """Szűrő: a kurzornál újabb sorok (created_at ASC, id ASC rendezéshez)."""
+    created_at, row_id = decode_cursor(cursor)
+    return db.or_(
+        model.created_at > created_at,
+        db.and_(model.created_at == created_at, model.id > row_id),
+    )
+
+
+def page(rows, limit, key=None):
+    """A limit+1 sorral lekért listából (oldal, next_cursor).
+
+    key: ha a sorok nem maguk a modellek (pl. (Post, comment_count) tuple-ök),
+    ez adja vissza a sorhoz tartozó modellt.
+    """
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = key(rows[-1]) if key else rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
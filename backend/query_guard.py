@@ -0,0 +1,100 @@
+"""N+1 lekérdezések és a kérésenkénti lekérdezés-keret ellenőrzése (tesztekhez, fejlesztéshez).
+
+A metrics.py kérésenkénti számlálója mellé a kérés összes SQL utasítását
+is gyűjti, majd a kérés végén "alakjuk" szerint csoportosítja őket: a
+paraméterek, literálok és az IN listák hossza nem számít, így a ciklusban
+soronként kiadott
+
+    SELECT ... FROM users WHERE users.id = ?     (× taglétszám)
+
+egyetlen alakra esik. Ha ugyanaz a SELECT alak QUERY_GUARD_THRESHOLD-szor
+(alapból 3) vagy többször fut egy kérésben, az N+1 gyanú.
+
+QUERY_GUARD:
+  * "off"   – nincs gyűjtés (éles alapértelmezés),
+  * "warn"  – figyelmeztetés a naplóba,
+  * "raise" – QueryGuardError a kérés végén (tesztek: a teszt elbukik).
+
+QUERY_BUDGET (szám vagy None): a kérésenként megengedett SQL utasítások
+száma; a tesztekben a @pytest.mark.query_budget(n) jelölés állítja be.
+"""
+import logging
+import re
+from collections import Counter
+
+from flask import current_app, request  # pyright: ignore[reportMissingImports]
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 3
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?|(?<!:):\w+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE = re.compile(r"\s+")
+
+
+class QueryGuardError(RuntimeError):
+    pass
+
+
+def normalize(statement):
+    """Az utasítás alakja: paraméterek/literálok helyén ?, az IN listák egy elemre vonva."""
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _PLACEHOLDER.sub("?", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+def repeated_selects(statements, threshold=DEFAULT_THRESHOLD):
+    """[(alak, darab)] azokra a SELECT alakokra, amelyek legalább threshold-szor futottak."""
+    shapes = Counter(
+        normalize(s) for s in statements if s.lstrip().upper().startswith("SELECT")
+    )
+    return [(shape, count) for shape, count in shapes.most_common() if count >= threshold]
+
+
+def check(statements, budget=None, threshold=DEFAULT_THRESHOLD):
+    """A hibák szövegei (üres lista, ha minden rendben)."""
+    problems = [
+        f"N+1 gyanú: {count}× ugyanaz a lekérdezés: {shape}"
+        for shape, count in repeated_selects(statements, threshold)
+    ]
+    if budget is not None and len(statements) > budget:
+        problems.append(f"lekérdezés-keret túllépve: {len(statements)} > {budget}")
+    return problems
+
+
+def init_query_guard(app):
+    """A metrics.init_metrics után hívandó (annak a kérésenkénti számlálóját bővíti)."""
+    app.config.setdefault("QUERY_GUARD", "off")
+    app.config.setdefault("QUERY_GUARD_THRESHOLD", DEFAULT_THRESHOLD)
+    app.config.setdefault("QUERY_BUDGET", None)
+
+    @app.before_request
+    def collect_statements():
+        stats = metrics.current_stats()
+        if stats is not None and current_app.config["QUERY_GUARD"] != "off":
+            stats.statements = []
+
+    @app.after_request
+    def check_statements(response):
+        stats = metrics.current_stats()
+        if stats is None or stats.statements is None:
+            return response
+        problems = check(
+            stats.statements,
+            budget=current_app.config["QUERY_BUDGET"],
+            threshold=int(current_app.config["QUERY_GUARD_THRESHOLD"]),
+        )
+        if not problems:
+            return response
+        message = f"{request.method} {request.path}: " + "; ".join(problems)
+        if current_app.config["QUERY_GUARD"] == "raise":
+            raise QueryGuardError(message)
+        logger.warning(message)
+        return response
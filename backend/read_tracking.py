@@ -0,0 +1,216 @@
+"""Olvasatlan posztok számolása és olvasottnak jelölés.
+
+Két mód van (Config.READ_TRACKING_MODE):
+
+* "postview": minden olvasott poszthoz egy PostView sor (users x posts méretű tábla).
+* "watermark": (user, group) páronként egy GroupReadState vízjel. A vízjelnél
+  nem újabb posztok olvasottak; az ennél újabb, egyenként megnyitott posztokat
+  a PostView sorok jelölik (kis kivétel-halmaz). Az "összes olvasott" egyetlen
+  upsert, az olvasatlan szám pedig egy időtartomány-számlálás.
+
+Az olvasatlan számláló mindkét módban egyetlen csoportosított anti-join:
+
+    group_members gm
+      [LEFT JOIN group_read_states rs ON rs.user_id = gm.user_id AND rs.group_id = gm.group_id]
+      LEFT JOIN posts p       ON p.group_id = gm.group_id AND p.deleted_at IS NULL
+                             AND p.created_at >= gm.joined_at AND p.author_id != :user
+                             [AND (rs.last_read_at IS NULL OR p.created_at > rs.last_read_at)]
+      LEFT JOIN post_views pv ON pv.post_id = p.id AND pv.user_id = :user
+    WHERE gm.user_id = :user AND pv.id IS NULL
+    GROUP BY gm.group_id
+
+A posts oldalt az ix_posts_group_deleted_created, a post_views oldalt a
+unique_user_post_view (user_id, post_id) összetett index szolgálja ki, így a
+költség nem függ attól, hány posztot látott a user összesen.
+
+Átállás postview -> watermark: a GroupReadState sorok hiánya "nincs vízjel"-et
+jelent, a meglévő PostView sorok kivételként tovább érvényesek, így a számok
+nem változnak. A `python manage.py compact-read-state` parancs ezután a
+folytonosan olvasott szakaszokat vízjellé tömöríti és törli a feleslegessé
+vált PostView sorokat.
+"""
+from datetime import datetime, timezone
+
+from flask import current_app  # pyright: ignore[reportMissingImports]
+
+from db_helpers import insert_ignore_from_select, upsert
+from models import db, GroupMember, GroupReadState, Post, PostView
+
+POSTVIEW = "postview"
+WATERMARK = "watermark"
+
+
+def current_mode():
+    return current_app.config.get("READ_TRACKING_MODE", POSTVIEW)
+
+
+def _utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def unread_counts_by_group(user_id):
+    """{group_id: olvasatlan posztok száma} a user összes csoportjára."""
+    post_join = [
+        Post.group_id == GroupMember.group_id,
+        Post.deleted_at.is_(None),
+        Post.created_at >= GroupMember.joined_at,
+        Post.author_id != user_id,  # A saját posztjai ne számolódjanak
+    ]
+
+    query = db.session.query(GroupMember.group_id, db.func.count(Post.id))
+    if current_mode() == WATERMARK:
+        query = query.outerjoin(GroupReadState, db.and_(
+            GroupReadState.user_id == GroupMember.user_id,
+            GroupReadState.group_id == GroupMember.group_id,
+        ))
+        post_join.append(db.or_(
+            GroupReadState.last_read_at.is_(None),
+            Post.created_at > GroupReadState.last_read_at,
+        ))
+
+    rows = (
+        query
+        .outerjoin(Post, db.and_(*post_join))
+        .outerjoin(PostView, db.and_(
+            PostView.post_id == Post.id,
+            PostView.user_id == user_id,
+        ))
+        .filter(GroupMember.user_id == user_id, PostView.id.is_(None))
+        .group_by(GroupMember.group_id)
+        .all()
+    )
+    return {group_id: count for group_id, count in rows}
+
+
+def mark_group_read(user_id, group_id):
+    """A csoport összes posztját olvasottnak jelöli; visszaadja az újonnan jelöltek számát."""
+    if current_mode() == WATERMARK:
+        return _mark_group_read_watermark(user_id, group_id)
+    return _mark_group_read_postview(user_id, group_id)
+
+
+def _mark_group_read_postview(user_id, group_id):
+    # Egyetlen INSERT ... SELECT a csoport még nem látott, nem törölt posztjaira.
+    # A NOT EXISTS a felesleges sorokat szűri, az IGNORE pedig a párhuzamos
+    # fülek versenyhelyzetét kezeli a unique_user_post_view kulcson.
+    already_viewed = (
+        db.select(PostView.id)
+        .where(PostView.user_id == user_id, PostView.post_id == Post.id)
+        .exists()
+    )
+    unread_posts = (
+        db.select(
+            db.literal(user_id, db.Integer),
+            Post.id,
+            db.literal(_utcnow(), db.DateTime),
+        )
+        .where(Post.group_id == group_id, Post.deleted_at.is_(None), ~already_viewed)
+    )
+
+    marked_count = insert_ignore_from_select(
+        PostView, ["user_id", "post_id", "viewed_at"], unread_posts
+    )
+    db.session.commit()
+    return marked_count
+
+
+def _mark_group_read_watermark(user_id, group_id):
+    now = _utcnow()
+    state = db.session.get(GroupReadState, (user_id, group_id))
+
+    # A vízjel a most látható legújabb poszt created_at-ja, nem a falióra: egy korábban
+    # időbélyegzett, de csak a jelölés után commitolt poszt így olvasatlan marad
+    watermark = db.session.query(db.func.max(Post.created_at)).filter(Post.group_id == group_id).scalar()
+    if state is not None and (watermark is None or watermark < state.last_read_at):
+        watermark = state.last_read_at
+    if watermark is None:
+        return 0
+
+    # Újonnan olvasottá váló posztok: a régi vízjel utániak, amikhez nincs PostView kivétel
+    newly_read = (
+        db.session.query(db.func.count(Post.id))
+        .outerjoin(PostView, db.and_(PostView.post_id == Post.id, PostView.user_id == user_id))
+        .filter(Post.group_id == group_id, Post.deleted_at.is_(None), PostView.id.is_(None),
+                Post.created_at <= watermark)
+    )
+    if state is not None:
+        newly_read = newly_read.filter(Post.created_at > state.last_read_at)
+    marked_count = newly_read.scalar()
+
+    upsert(GroupReadState, {
+        "user_id": user_id,
+        "group_id": group_id,
+        "last_read_at": watermark,
+        "updated_at": now,
+    }, ["last_read_at", "updated_at"])
+
+    # A vízjel alá került kivételekre már nincs szükség
+    covered_posts = db.select(Post.id).where(Post.group_id == group_id, Post.created_at <= watermark)
+    PostView.query.filter(
+        PostView.user_id == user_id,
+        PostView.post_id.in_(covered_posts),
+    ).delete(synchronize_session=False)
+
+    db.session.commit()
+    return marked_count
+
+
+def compact_post_views(user_id=None):
+    """PostView sorok tömörítése vízjellé (postview -> watermark átálláshoz).
+
+    Minden tagságra a vízjel az utolsó olyan olvasott poszt created_at-ja, ami
+    előtt nincs olvasatlan poszt; az alatta lévő PostView sorokat törli.
+    Visszaadja: (beállított vízjelek száma, törölt PostView sorok száma).
+    """
+    memberships = GroupMember.query
+    if user_id is not None:
+        memberships = memberships.filter_by(user_id=user_id)
+
+    watermarks = 0
+    deleted = 0
+    for m in memberships.all():
+        first_unread = (
+            db.session.query(db.func.min(Post.created_at))
+            .outerjoin(PostView, db.and_(PostView.post_id == Post.id, PostView.user_id == m.user_id))
+            .filter(
+                Post.group_id == m.group_id,
+                Post.deleted_at.is_(None),
+                Post.created_at >= m.joined_at,
+                Post.author_id != m.user_id,
+                PostView.id.is_(None),
+            )
+            .scalar()
+        )
+
+        last_read = (
+            db.session.query(db.func.max(Post.created_at))
+            .join(PostView, db.and_(PostView.post_id == Post.id, PostView.user_id == m.user_id))
+            .filter(Post.group_id == m.group_id)
+        )
+        if first_unread is not None:
+            last_read = last_read.filter(Post.created_at < first_unread)
+        last_read = last_read.scalar()
+
+        if last_read is None:
+            continue
+
+        state = db.session.get(GroupReadState, (m.user_id, m.group_id))
+        if state is not None and state.last_read_at >= last_read:
+            continue
+
+        upsert(GroupReadState, {
+            "user_id": m.user_id,
+            "group_id": m.group_id,
+            "last_read_at": last_read,
+            "updated_at": _utcnow(),
+        }, ["last_read_at", "updated_at"])
+        watermarks += 1
+
+        covered_posts = db.select(Post.id).where(Post.group_id == m.group_id, Post.created_at <= last_read)
+        deleted += PostView.query.filter(
+            PostView.user_id == m.user_id,
+            PostView.post_id.in_(covered_posts),
+        ).delete(synchronize_session=False)
+
+    db.session.commit()
+    return watermarks, deleted
@@ -0,0 +1,70 @@
+"""Server-Sent Events formázás és a GET /stream eseményfolyama.
+
+A stream egy broker-feliratkozásból olvas; adatbázist nem használ (a
+kezdő olvasatlan-számokat a route adja át), így a kapcsolat élete alatt
+nem tart DB kapcsolatot. Események:
+
+  * unread-counts  – kezdő állapot: {"unread_counts": {group_id: n}}
+  * post / comment / event – új tartalom a user valamelyik csoportjában
+  * unread-delta   – {"group_id", "delta"}: más által írt új poszt
+  * unread-count   – {"group_id", "unread"}: abszolút érték (pl. olvasottnak jelölés után)
+  * resync         – a kliens lemaradt, töltse újra a listáit
+  * membership     – belépés/kilépés; a stream ennek megfelelően fel/leiratkozik
+
+Üresjáratban HEARTBEAT másodpercenként komment-sor megy ki (proxy-k ne
+zárják le), MAX_SECONDS után a szerver zárja a kapcsolatot, az EventSource
+pedig retry ms múlva újracsatlakozik.
+"""
+import json
+import time
+
+from broker import group_channel
+
+HEARTBEAT = 15
+MAX_SECONDS = 300
+RETRY_MS = 3000
+
+
+def format_event(event_type, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event_type}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return "\n".join(lines) + "\n\n"
+
+
+def event_stream(subscription, user_id, unread_counts, heartbeat=HEARTBEAT,
+                 max_seconds=MAX_SECONDS, clock=time.monotonic):
+    deadline = clock() + max_seconds
+    try:
+        yield f"retry: {RETRY_MS}\n\n"
+        yield format_event("unread-counts", {"unread_counts": unread_counts})
+
+        while True:
+            remaining = deadline - clock()
+            if remaining <= 0:
+                return
+
+            event = subscription.get(timeout=min(heartbeat, remaining))
+            if subscription.lagged:
+                subscription.lagged = False
+                yield format_event("resync", {})
+                continue
+            if event is None:
+                yield ": ping\n\n"
+                continue
+
+            event_type, data = event["type"], event["data"]
+            if event_type == "membership":
+                if data["joined"]:
+                    subscription.add(group_channel(data["group_id"]))
+                else:
+                    subscription.remove(group_channel(data["group_id"]))
+
+            yield format_event(event_type, data, event["id"])
+
+            if event_type == "post" and data.get("author_id") != user_id:
+                yield format_event("unread-delta", {"group_id": data["group_id"], "delta": 1})
+    finally:
+        subscription.close()
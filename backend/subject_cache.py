@@ -0,0 +1,169 @@
+"""Tárgykereső (/subjects/search) cache stale-while-revalidate működéssel.
+
+A kulcs (év, normalizált keresőszó), az érték a már feldolgozott
+[{code, name}, ...] lista, így egy ismételt keresés se hálózati hívást, se
+regex feldolgozást nem végez.
+
+  * friss bejegyzés (ttl-en belül): azonnal visszaadjuk,
+  * elavult bejegyzés (ttl + stale_ttl-en belül): azonnal visszaadjuk, és
+    a háttérben frissítjük,
+  * hiányzó bejegyzés: szinkron lekérés a hívó szálán (a párhuzamosságot
+    a http_client hosztonkénti korlátja szabja meg, nem egy közös pool).
+
+Ugyanarra a kulcsra egyszerre legfeljebb egy lekérés fut (a párhuzamos
+kérések ugyanazt a Future-t várják). A kis háttér pool csak az elavult
+bejegyzések frissítését futtatja. Sikertelen lekérés nem kerül a
+cache-be; frissítési hibánál az elavult bejegyzés marad érvényben.
+Beállítás: TANREND_API_URL, SUBJECT_CACHE_TTL, SUBJECT_CACHE_STALE_TTL,
+SUBJECT_CACHE_SIZE.
+"""
+import os
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import partial
+
+import requests  # pyright: ignore[reportMissingImports]
+from flask import current_app  # pyright: ignore[reportMissingImports]
+
+import http_client
+from cache import TTLCache
+
+DEFAULT_TTL = 600  # 10 perc, mint az elte_tanrend_api saját cache-e
+DEFAULT_STALE_TTL = 3600
+DEFAULT_SIZE = 2000
+
+# "IP-18AB1E-1 (magyar)" -> "IP-18AB1E"
+_CODE_SUFFIX = re.compile(r"^(.*?)-(\d+)$")
+
+
+class SubjectFetchError(Exception):
+    """A tanrend API nem érhető el vagy hibás választ adott."""
+
+
+def normalize_query(query):
+    return " ".join(query.split()).lower()
+
+
+def parse_tanrend_rows(rows):
+    """A tanrend API sorai (string[][]) -> egyedi tárgyak [{code, name}, ...]."""
+    subjects_by_code = {}
+    for row in rows:
+        if len(row) < 3:
+            continue
+
+        code = row[1].split("(")[0].strip()
+        m = _CODE_SUFFIX.match(code)
+        if m:
+            code = m.group(1)
+        name = row[2].strip()
+
+        if code and name and code not in subjects_by_code:
+            subjects_by_code[code] = {"code": code, "name": name}
+
+    return list(subjects_by_code.values())
+
+
+def fetch_subjects(api_url, year, query, timeout=10):
+    try:
+        resp = http_client.post(f"{api_url}/api", json={"year": year, "name": query}, timeout=timeout)
+    except requests.RequestException as e:
+        raise SubjectFetchError(str(e)) from e
+
+    if resp.status_code != 200:
+        raise SubjectFetchError(f"tanrend API status {resp.status_code}")
+
+    try:
+        return parse_tanrend_rows(resp.json())
+    except (ValueError, KeyError, TypeError) as e:
+        # Nem JSON (pl. proxy hibaoldal) vagy nem a várt szerkezet
+        raise SubjectFetchError(f"hibás tanrend válasz: {e}") from e
+
+
+class SubjectCache:
+    def __init__(self, fetch, ttl=DEFAULT_TTL, stale_ttl=DEFAULT_STALE_TTL,
+                 maxsize=DEFAULT_SIZE, clock=time.monotonic, max_workers=2):
+        self.fetch = fetch
+        self.ttl = ttl
+        self._clock = clock
+        # A TTLCache a teljes (friss + elavult) élettartamig tartja a bejegyzést,
+        # a frissességet a tárolt fetched_at alapján döntjük el.
+        self._entries = TTLCache(maxsize=maxsize, ttl=ttl + stale_ttl, clock=clock)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="subject-refresh")
+        self.stats = {"hits": 0, "stale": 0, "misses": 0}
+
+    def search(self, year, query):
+        key = (year, normalize_query(query))
+        entry = self._entries.get(key)
+
+        if entry is None:
+            self._count("misses")
+            future, owner = self._claim(key)
+            if owner:
+                # Hiányzó bejegyzés: a hívó szálán töltjük be, a többi azonos kérés erre vár
+                self._load(key, future)
+            return future.result()
+
+        fetched_at, subjects = entry
+        if self._clock() - fetched_at >= self.ttl:
+            self._count("stale")
+            future, owner = self._claim(key)
+            if owner:
+                self._executor.submit(self._load, key, future)
+        else:
+            self._count("hits")
+        return subjects
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _claim(self, key):
+        """(a kulcs folyamatban lévő Future-je, mi töltjük-e be)."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future, False
+            future = self._inflight[key] = Future()
+            return future, True
+
+    def _load(self, key, future):
+        try:
+            subjects = self.fetch(*key)
+            self._entries.set(key, (self._clock(), subjects))
+            future.set_result(subjects)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def drain(self, timeout=None):
+        """Megvárja a folyamatban lévő frissítéseket (tesztekhez)."""
+        with self._lock:
+            futures = list(self._inflight.values())
+        wait(futures, timeout=timeout)
+
+    def clear(self):
+        self._entries.clear()
+
+
+def init_subject_cache(app):
+    def setting(name, default):
+        return app.config.get(name, os.getenv(name, default))
+
+    api_url = setting("TANREND_API_URL", "https://elte-orarend.vercel.app")
+    app.extensions["subject_cache"] = SubjectCache(
+        partial(fetch_subjects, api_url),
+        ttl=int(setting("SUBJECT_CACHE_TTL", DEFAULT_TTL)),
+        stale_ttl=int(setting("SUBJECT_CACHE_STALE_TTL", DEFAULT_STALE_TTL)),
+        maxsize=int(setting("SUBJECT_CACHE_SIZE", DEFAULT_SIZE)),
+    )
+    return app.extensions["subject_cache"]
+
+
+def search_subjects(year, query):
+    return current_app.extensions["subject_cache"].search(year, query)
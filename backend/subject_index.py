@@ -0,0 +1,157 @@
+"""Offline tárgykatalógus: félévenkénti memóriabeli index a /subjects/search-hez.
+
+A subjects táblába a `python manage.py import-subjects <fájl> --year <félév>`
+tölt be egy teljes félévet (JSON vagy CSV dump). Induláskor minden félév
+egy SubjectIndex-be kerül:
+
+  * kód-prefix: rendezett (kód, sorszám) lista + bisect,
+  * név: szó-prefix rendezett listán, 3+ karakteres keresésnél trigram
+    posting-listák metszete, majd részszöveg-ellenőrzés.
+
+Ha a kért félévhez van pillanatkép, a keresés hálózat nélkül fut (a tanrend
+kiesésekor is). Ha nincs, a route a subject_cache-en át a tanrend API-hoz fordul.
+"""
+import csv
+import json
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from flask import current_app  # pyright: ignore[reportMissingImports]
+
+from models import db, Subject
+from subject_cache import normalize_query, parse_tanrend_rows
+
+DEFAULT_LIMIT = 100
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _prefix_matches(sorted_keys, prefix):
+    """(kulcs, sorszám) párok rendezett listájából a prefix-szel kezdődők sorszámai."""
+    i = bisect_left(sorted_keys, (prefix,))
+    while i < len(sorted_keys) and sorted_keys[i][0].startswith(prefix):
+        yield sorted_keys[i][1]
+        i += 1
+
+
+class SubjectIndex:
+    def __init__(self, subjects):
+        """subjects: [{code, name}, ...] (a sorrend egyben a találatok sorrendje)."""
+        self.subjects = list(subjects)
+        self._names = [normalize_query(s["name"]) for s in self.subjects]
+        self._codes = sorted((s["code"].lower(), i) for i, s in enumerate(self.subjects))
+        self._words = sorted(
+            (word, i) for i, name in enumerate(self._names) for word in set(name.split())
+        )
+        self._trigrams = defaultdict(set)
+        for i, name in enumerate(self._names):
+            for tri in _trigrams(name):
+                self._trigrams[tri].add(i)
+
+    def __len__(self):
+        return len(self.subjects)
+
+    def _name_matches(self, query):
+        if len(query) < 3:
+            return sorted(set(_prefix_matches(self._words, query)))
+
+        postings = sorted((self._trigrams.get(tri, set()) for tri in _trigrams(query)), key=len)
+        candidates = set.intersection(*postings) if postings else set()
+        return sorted(i for i in candidates if query in self._names[i])
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Előbb a kód-prefix, utána a névben egyező tárgyak, [{code, name}, ...]."""
+        query = normalize_query(query)
+        if not query:
+            return []
+
+        seen = set()
+        results = []
+        for i in [*_prefix_matches(self._codes, query), *self._name_matches(query)]:
+            if i in seen:
+                continue
+            seen.add(i)
+            results.append(self.subjects[i])
+            if len(results) >= limit:
+                break
+        return results
+
+
+class SubjectCatalog:
+    """{félév: SubjectIndex}; a csere atomikus, így keresés közben is újratölthető."""
+
+    def __init__(self):
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def get(self, year):
+        return self._indexes.get(year)
+
+    def years(self):
+        return sorted(self._indexes)
+
+    def set(self, year, subjects):
+        index = SubjectIndex(subjects)
+        with self._lock:
+            self._indexes = {**self._indexes, year: index}
+        return index
+
+    def load_from_db(self):
+        by_year = defaultdict(list)
+        rows = db.session.query(Subject.year, Subject.code, Subject.name).order_by(Subject.year, Subject.code)
+        for year, code, name in rows:
+            by_year[year].append({"code": code, "name": name})
+
+        with self._lock:
+            self._indexes = {year: SubjectIndex(subjects) for year, subjects in by_year.items()}
+        return sum(len(index) for index in self._indexes.values())
+
+
+def read_dump(path):
+    """JSON vagy CSV dump -> [{code, name}, ...].
+
+    Elfogadott formák: [{code, name}, ...] objektumok, a tanrend API nyers
+    sorai (string[][]), illetve code,name fejlécű vagy fejléc nélküli CSV
+    (utóbbi a tanrend sorainak oszlopsorrendjével).
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.lower().endswith(".json"):
+            data = json.load(f)
+            if data and isinstance(data[0], dict):
+                return _dedupe({"code": row["code"].strip(), "name": row["name"].strip()} for row in data)
+            return parse_tanrend_rows(data)
+
+        rows = list(csv.reader(f))
+
+    if rows and [c.strip().lower() for c in rows[0][:2]] == ["code", "name"]:
+        return _dedupe({"code": r[0].strip(), "name": r[1].strip()} for r in rows[1:] if len(r) >= 2)
+    return parse_tanrend_rows(rows)
+
+
+def _dedupe(subjects):
+    by_code = {}
+    for s in subjects:
+        if s["code"] and s["name"]:
+            by_code.setdefault(s["code"], s)
+    return list(by_code.values())
+
+
+def import_snapshot(year, subjects):
+    """A félév pillanatképét lecseréli a subjects táblában; visszaadja a sorok számát."""
+    Subject.query.filter_by(year=year).delete(synchronize_session=False)
+    if subjects:
+        db.session.execute(db.insert(Subject), [{"year": year, **s} for s in subjects])
+    db.session.commit()
+    return len(subjects)
+
+
+def init_subject_catalog(app):
+    app.extensions["subject_catalog"] = SubjectCatalog()
+    return app.extensions["subject_catalog"]
+
+
+def get_index(year):
+    return current_app.extensions["subject_catalog"].get(year)
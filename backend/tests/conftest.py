@@ -1,11 +1,36 @@
+import os
+import time
+from contextlib import contextmanager
+
+# A Config import-időben olvassa a DATABASE_URL-t, ezért még az app import előtt
+os.environ.setdefault("DATABASE_URL", "sqlite:///:memory:")
+# Az email outbox workert a tesztek maguk indítják, ha kell
+os.environ.setdefault("EMAIL_OUTBOX_WORKER", "off")
+os.environ.setdefault("NOTIFICATION_FANOUT", "manual")
+os.environ.setdefault("DERIVATIVES_MODE", "manual")
+# N+1 lekérdezés a tesztben kivételt dob (query_guard.py)
+os.environ.setdefault("QUERY_GUARD", "raise")
+
 import pytest
+from sqlalchemy import event
 from app import create_app
-from models import db
+from models import db, User
+from auth import create_jwt_token
+from routes import set_user_interests
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "query_budget(n): a tesztben minden kérés legfeljebb n SQL utasítást adhat ki"
+    )
+
 
 @pytest.fixture
-def app():
+def app(request):
     app = create_app()
     app.config["TESTING"] = True
+    budget = request.node.get_closest_marker("query_budget")
+    if budget is not None:
+        app.config["QUERY_BUDGET"] = budget.args[0]
     app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///:memory:"
     app.config["SECRET_KEY"] = "test-secret"
     app.config["UPLOAD_FOLDER"] = "/tmp/uploads"
@@ -20,3 +45,58 @@ def app():
 def client(app):
     return app.test_client()
 
+
+@pytest.fixture
+def make_user(app):
+    """Felhasználó közvetlenül az adatbázisba (a /register Brevo hívása nélkül)."""
+    counter = {"n": 0}
+
+    def _make_user(hobbies=None, **fields):
+        counter["n"] += 1
+        n = counter["n"]
+        user = User(
+            email=fields.pop("email", f"user{n}@inf.elte.hu"),
+            secondary_email=fields.pop("secondary_email", f"user{n}@gmail.com"),
+            password_hash=fields.pop("password_hash", "x"),
+            major=fields.pop("major", "Informatika"),
+            name=fields.pop("name", f"Teszt User {n}"),
+            hobbies=hobbies,
+            **fields
+        )
+        set_user_interests(user, hobbies)
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    return _make_user
+
+
+@pytest.fixture
+def auth_header():
+    def _auth_header(user_id):
+        return {"Authorization": f"Bearer {create_jwt_token(user_id)}"}
+
+    return _auth_header
+
+
+@pytest.fixture
+def count_queries(app):
+    """Megszámolja a blokkon belül kiadott SQL utasításokat és az eltelt időt."""
+
+    @contextmanager
+    def _count_queries():
+        stats = {"count": 0, "statements": [], "elapsed": 0.0}
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            stats["count"] += 1
+            stats["statements"].append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        started = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats["elapsed"] = time.perf_counter() - started
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+    return _count_queries
@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import auth
+from config import Config
+
+
+def test_repeated_requests_hit_token_cache(client, make_user, auth_header):
+    user = make_user()
+    headers = auth_header(user.id)
+    before = dict(auth.token_cache_stats)
+
+    for _ in range(3):
+        assert client.get("/groups/my-groups", headers=headers).status_code == 200
+
+    assert auth.token_cache_stats["misses"] - before["misses"] == 1
+    assert auth.token_cache_stats["hits"] - before["hits"] == 2
+
+
+def test_expired_token_is_rejected(client, make_user):
+    user = make_user()
+    expired = jwt.encode(
+        {"user_id": user.id, "exp": datetime.now(timezone.utc) - timedelta(seconds=1)},
+        Config.SECRET_KEY, algorithm="HS256",
+    )
+
+    res = client.get("/groups/my-groups", headers={"Authorization": f"Bearer {expired}"})
+    assert res.status_code == 401
+
+
+def test_tampered_payload_is_not_served_from_cache(client, make_user, auth_header):
+    user = make_user()
+    other = make_user()
+    token = auth_header(user.id)["Authorization"].split(" ")[1]
+    client.get("/profile", headers={"Authorization": f"Bearer {token}"})
+
+    # Ugyanaz az aláírás, másik user payloadja
+    header, _, signature = token.split(".")
+    forged_payload = jwt.encode(
+        {"user_id": other.id, "exp": datetime.now(timezone.utc) + timedelta(hours=1)},
+        "wrong-key", algorithm="HS256",
+    ).split(".")[1]
+    forged = f"{header}.{forged_payload}.{signature}"
+
+    res = client.get("/profile", headers={"Authorization": f"Bearer {forged}"})
+    assert res.status_code == 401
+
+
+def test_current_user_loaded_once_per_request(client, make_user, auth_header, count_queries):
+    user = make_user()
+
+    with count_queries() as stats:
+        res = client.get("/profile", headers=auth_header(user.id))
+
+    assert res.status_code == 200
+    assert res.get_json()["email"] == user.email
+    assert sum("FROM users" in s for s in stats["statements"]) == 1
+
+
+def test_malformed_authorization_header(client):
+    assert client.get("/groups/my-groups", headers={"Authorization": "Bearer"}).status_code == 401
+    assert client.get("/groups/my-groups", headers={"Authorization": "token"}).status_code == 401
@@ -0,0 +1,45 @@
+from bench_data import counts_for, generate
+from bench_endpoints import ENDPOINTS, compare, run_endpoints
+from models import db, Comment, Post, User
+
+
+def test_every_read_endpoint_answers_on_generated_data(app, client):
+    # A tesztekben a query_guard "raise" módban fut: N+1 esetén itt is elbukik
+    dataset = generate(scale=0, seed=3)
+    app.extensions["subject_catalog"].load_from_db()
+
+    results = run_endpoints(client, dataset, iterations=2, warmup=0)
+
+    assert set(results) == {name for name, _ in ENDPOINTS}
+    assert {name: r["status"] for name, r in results.items() if r["status"] != 200} == {}
+    assert all(r["queries"] >= 0 and r["p50_ms"] > 0 for r in results.values())
+
+
+def test_generator_is_deterministic(app):
+    dataset = generate(scale=0, seed=3)
+    minimum = counts_for(0)
+
+    assert db.session.query(User).count() == minimum["users"]
+    assert db.session.query(Post).count() == minimum["posts"]
+    assert db.session.query(Comment).count() == minimum["comments"]
+    first = [(p.group_id, p.author_id) for p in Post.query.order_by(Post.id).limit(20)]
+
+    db.drop_all()
+    db.create_all()
+    assert generate(scale=0, seed=3) == dataset
+    assert [(p.group_id, p.author_id) for p in Post.query.order_by(Post.id).limit(20)] == first
+
+
+def test_compare_flags_slower_p50_and_extra_queries():
+    baseline = {"endpoints": {
+        "a": {"p50_ms": 10.0, "queries": 2},
+        "b": {"p50_ms": 10.0, "queries": 2},
+        "c": {"p50_ms": 0.5, "queries": 1},
+    }}
+    current = {"endpoints": {
+        "a": {"p50_ms": 15.0, "queries": 2},
+        "b": {"p50_ms": 10.5, "queries": 3},
+        "c": {"p50_ms": 0.9, "queries": 1},  # arányban lassabb, de a zajszint alatt
+    }}
+
+    assert {row[0]: row[-1] for row in compare(baseline, current)} == {"a": True, "b": True, "c": False}
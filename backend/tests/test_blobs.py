@@ -0,0 +1,140 @@
+import hashlib
+import io
+import os
+import time
+from datetime import datetime
+
+import pytest
+
+import blobs
+from models import db, Blob, Comment, CommentAttachment, Group, GroupMember, Post, PostAttachment
+
+
+@pytest.fixture
+def upload_dir(app, tmp_path):
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    return tmp_path
+
+
+def seed_posts(author, n):
+    group = Group(name="Blob", subject="Blob", creator_id=author.id)
+    db.session.add(group)
+    db.session.flush()
+    db.session.add(GroupMember(group_id=group.id, user_id=author.id, joined_at=datetime(2026, 1, 1)))
+    posts = [Post(title=f"P{i}", content=".", group_id=group.id, author_id=author.id) for i in range(n)]
+    db.session.add_all(posts)
+    db.session.commit()
+    return [p.id for p in posts]
+
+
+def upload(client, headers, post_id, payload, name="eloadas.pdf"):
+    res = client.post(f"/posts/{post_id}/attachments", headers=headers,
+                      data={"file": (io.BytesIO(payload), name)}, content_type="multipart/form-data")
+    assert res.status_code == 201
+    return res.get_json()["attachment"]
+
+
+def blob_files(upload_dir):
+    return sorted(p for p in (upload_dir / "blobs").rglob("*") if p.is_file())
+
+
+def test_same_content_is_stored_once(app, client, make_user, auth_header, upload_dir):
+    author = make_user()
+    headers = auth_header(author.id)
+    post_ids = seed_posts(author, 3)
+    payload = b"%PDF-1.4 ugyanaz az eloadas" * 1000
+
+    first = upload(client, headers, post_ids[0], payload)
+    second = upload(client, headers, post_ids[1], payload, name="masolat.pdf")
+    upload(client, headers, post_ids[2], b"mas tartalom", name="mas.pdf")
+
+    assert first["url"] == second["url"]
+    assert second["filename"] == "masolat.pdf"
+    assert len(blob_files(upload_dir)) == 2
+    assert not list((upload_dir / ".tmp").iterdir())
+
+    blob = Blob.query.filter_by(path=blobs.blob_key(hashlib.sha256(payload).hexdigest())).one()
+    assert blob.ref_count == 2
+    assert blob.size == len(payload)
+    assert {a.blob_id for a in PostAttachment.query.filter(PostAttachment.post_id.in_(post_ids[:2]))} == {blob.id}
+
+
+def test_blob_is_collected_with_its_last_reference(app, client, make_user, auth_header, upload_dir):
+    author = make_user()
+    headers = auth_header(author.id)
+    post_id = seed_posts(author, 1)[0]
+    payload = b"kozos jegyzet"
+    post_attachment = upload(client, headers, post_id, payload, name="jegyzet.txt")
+
+    comment = Comment(post_id=post_id, author_id=author.id, comment="en is feltoltom")
+    db.session.add(comment)
+    db.session.commit()
+    res = client.post(f"/comments/{comment.id}/attachments", headers=headers,
+                      data={"file": (io.BytesIO(payload), "jegyzet.txt")}, content_type="multipart/form-data")
+    comment_attachment = res.get_json()["attachment"]
+    assert comment_attachment["file_url"] == post_attachment["url"]
+
+    assert client.delete(f"/attachments/{post_attachment['id']}", headers=headers).status_code == 200
+    assert len(blob_files(upload_dir)) == 1
+    assert Blob.query.one().ref_count == 1
+
+    # Az /attachments/<id> előbb a poszt csatolmányok között keres, az id-k pedig ütközhetnek,
+    # ezért a komment csatolmányt közvetlenül töröljük
+    blobs.delete_attachment(db.session.get(CommentAttachment, comment_attachment["id"]))
+    assert blob_files(upload_dir) == []
+    assert Blob.query.count() == 0
+
+
+def test_missing_file_is_restored_from_reupload(app, client, make_user, auth_header, upload_dir):
+    author = make_user()
+    headers = auth_header(author.id)
+    post_ids = seed_posts(author, 2)
+    upload(client, headers, post_ids[0], b"elveszett")
+    path = upload_dir / Blob.query.one().path
+    path.unlink()
+
+    upload(client, headers, post_ids[1], b"elveszett")
+
+    assert path.read_bytes() == b"elveszett"
+    assert Blob.query.one().ref_count == 2
+
+
+def test_collect_garbage_recounts_and_removes_orphans(app, client, make_user, auth_header, upload_dir):
+    author = make_user()
+    headers = auth_header(author.id)
+    post_id = seed_posts(author, 1)[0]
+    upload(client, headers, post_id, b"marad")
+
+    orphan_row = Blob(sha256="f" * 64, size=1, path="blobs/ff/" + "f" * 64, ref_count=5)
+    db.session.add(orphan_row)
+    db.session.commit()
+    stray = upload_dir / "blobs" / "00" / ("0" * 64)
+    stray.parent.mkdir(parents=True)
+    stray.write_bytes(b"x")
+    old = time.time() - 7200
+    os.utime(stray, (old, old))
+
+    rows, files = blobs.collect_garbage()
+
+    assert (rows, files) == (1, 1)
+    assert not stray.exists()
+    assert (upload_dir / blobs.blob_key(hashlib.sha256(b"marad").hexdigest())).exists()
+    assert Blob.query.one().ref_count == 1
+
+
+def test_same_content_with_different_extensions_shares_one_file(app, client, make_user, auth_header, upload_dir):
+    author = make_user()
+    headers = auth_header(author.id)
+    post_ids = seed_posts(author, 2)
+    digest = hashlib.sha256(b"jegyzet vagy pdf").hexdigest()
+
+    as_txt = upload(client, headers, post_ids[0], b"jegyzet vagy pdf", name="jegyzet.txt")
+    as_pdf = upload(client, headers, post_ids[1], b"jegyzet vagy pdf", name="jegyzet.pdf")
+
+    assert as_txt["url"] == f"/uploads/blobs/{digest[:2]}/{digest}.txt"
+    assert as_pdf["url"] == f"/uploads/blobs/{digest[:2]}/{digest}.pdf"
+    assert blob_files(upload_dir) == [upload_dir / blobs.blob_key(digest)]
+    assert Blob.query.one().ref_count == 2
+    assert client.get(as_txt["url"]).mimetype == "text/plain"
+    assert client.get(as_pdf["url"]).mimetype == "application/pdf"
+
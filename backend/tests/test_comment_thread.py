@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+from models import db, Group, Post, Comment, CommentAttachment
+
+
+def seed_thread(user_id, comment_count, same_timestamp=False):
+    group = Group(name=f"Komment csoport {comment_count}", subject="Komment", creator_id=user_id)
+    db.session.add(group)
+    db.session.flush()
+    post = Post(title="Vizsga", content="ZH infók", group_id=group.id, author_id=user_id)
+    db.session.add(post)
+    db.session.flush()
+
+    base = datetime(2026, 1, 1)
+    comments = [
+        Comment(
+            comment=f"Komment {i}",
+            post_id=post.id,
+            author_id=user_id,
+            created_at=base if same_timestamp else base + timedelta(minutes=i),
+        )
+        for i in range(comment_count)
+    ]
+    db.session.add_all(comments)
+    db.session.flush()
+    db.session.add_all([
+        CommentAttachment(comment_id=c.id, filename="megoldas.pdf", file_url="/uploads/comments/megoldas.pdf")
+        for c in comments
+    ])
+    db.session.commit()
+    return post
+
+
+def test_list_comments_query_count_is_constant(client, make_user, count_queries):
+    user = make_user()
+    small = seed_thread(user.id, 3)
+    large = seed_thread(user.id, 250)
+
+    with count_queries() as small_stats:
+        client.get(f"/posts/{small.id}/comments")
+    with count_queries() as large_stats:
+        res = client.get(f"/posts/{large.id}/comments")
+
+    comments = res.get_json()["comments"]
+    assert len(comments) == 250
+    assert all(len(c["attachments"]) == 1 for c in comments)
+    assert small_stats["count"] == large_stats["count"]
+
+
+def test_list_comments_cursor_pagination(client, make_user):
+    user = make_user()
+    post = seed_thread(user.id, 5, same_timestamp=True)
+
+    first = client.get(f"/posts/{post.id}/comments?limit=2").get_json()
+    assert [c["content"] for c in first["comments"]] == ["Komment 0", "Komment 1"]
+
+    seen = [c["id"] for c in first["comments"]]
+    cursor = first["next_cursor"]
+    while cursor:
+        data = client.get(f"/posts/{post.id}/comments?limit=2&after={cursor}").get_json()
+        seen.extend(c["id"] for c in data["comments"])
+        cursor = data["next_cursor"]
+
+    assert seen == sorted(seen)
+    assert len(seen) == 5
+
+
+def test_list_comments_since_returns_only_newer(client, make_user):
+    user = make_user()
+    post = seed_thread(user.id, 4)
+    all_comments = client.get(f"/posts/{post.id}/comments").get_json()["comments"]
+    last_seen = all_comments[1]["id"]
+
+    res = client.get(f"/posts/{post.id}/comments?since={last_seen}")
+
+    assert res.status_code == 200
+    assert [c["id"] for c in res.get_json()["comments"]] == [c["id"] for c in all_comments[2:]]
+    assert "next_cursor" not in res.get_json()
+
+
+def test_list_comments_invalid_since_is_rejected(client, make_user):
+    post = seed_thread(make_user().id, 2)
+
+    res = client.get(f"/posts/{post.id}/comments?since=abc")
+
+    assert res.status_code == 400
+
+
+def test_list_comments_since_unknown_comment_is_404(client, make_user):
+    user = make_user()
+    post = seed_thread(user.id, 2)
+    other = seed_thread(user.id, 3)
+    foreign = Comment.query.filter_by(post_id=other.id).first().id
+
+    assert client.get(f"/posts/{post.id}/comments?since=999999").status_code == 404
+    assert client.get(f"/posts/{post.id}/comments?since={foreign}").status_code == 404
+
+
+def test_list_comments_since_deleted_comment_still_anchors(client, make_user):
+    post = seed_thread(make_user().id, 3)
+    first = Comment.query.filter_by(post_id=post.id).order_by(Comment.id).first()
+    first.deleted_at = datetime(2026, 1, 2)
+    db.session.commit()
+
+    res = client.get(f"/posts/{post.id}/comments?since={first.id}")
+
+    assert res.status_code == 200
+    assert [c["content"] for c in res.get_json()["comments"]] == ["Komment 1", "Komment 2"]
@@ -0,0 +1,178 @@
+import io
+from datetime import datetime
+
+import pytest
+
+import blobs
+import derivatives
+from models import db, Blob, Group, GroupMember, Post, PostAttachment
+
+
+@pytest.fixture
+def upload_dir(app, tmp_path):
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def fake_renderer(monkeypatch):
+    """Pillow/pdftoppm nélkül is futó renderelő: a származék a forrás első bájtjai."""
+    calls = []
+
+    def renderable(path):
+        with open(path, "rb") as f:
+            return f.read(4) in (b"\x89PNG", b"%PDF")
+
+    def render(blob_key):
+        calls.append(blob_key)
+        if not renderable(derivatives.uploads.path_for_key(blob_key)):
+            return None
+        keys = derivatives.derivative_key(blob_key, "thumb"), derivatives.derivative_key(blob_key, "preview")
+        for key in keys:
+            with open(derivatives.uploads.path_for_key(blob_key), "rb") as src, \
+                    open(derivatives.uploads.path_for_key(key), "wb") as dest:
+                dest.write(src.read(16))
+        return keys
+
+    monkeypatch.setattr(derivatives, "render", render)
+    monkeypatch.setattr(derivatives, "supports", renderable)
+    return calls
+
+
+def seed_posts(author, n=1):
+    group = Group(name="Képek", subject="Képek", creator_id=author.id)
+    db.session.add(group)
+    db.session.flush()
+    db.session.add(GroupMember(group_id=group.id, user_id=author.id, joined_at=datetime(2026, 1, 1)))
+    posts = [Post(title=f"P{i}", content=".", group_id=group.id, author_id=author.id) for i in range(n)]
+    db.session.add_all(posts)
+    db.session.commit()
+    return group.id, [p.id for p in posts]
+
+
+def upload(client, headers, post_id, payload, name):
+    res = client.post(f"/posts/{post_id}/attachments", headers=headers,
+                      data={"file": (io.BytesIO(payload), name)}, content_type="multipart/form-data")
+    assert res.status_code == 201
+    return res.get_json()["attachment"]
+
+
+def drain(app):
+    app.extensions["derivatives"].drain()
+
+
+def test_thumbnails_are_generated_off_the_request_and_listed(app, client, make_user, auth_header,
+                                                             upload_dir, fake_renderer):
+    author = make_user()
+    headers = auth_header(author.id)
+    group_id, (post_id,) = seed_posts(author)
+
+    attachment = upload(client, headers, post_id, b"\x89PNG kep", "kep.png")
+    assert fake_renderer == []  # a kérésben nem renderelünk
+    assert db.session.get(PostAttachment, attachment["id"]).thumbnail_url is None
+
+    drain(app)
+
+    posts = client.get(f"/groups/{group_id}/posts", headers=headers).get_json()["posts"]
+    listed = posts[0]["attachments"][0]
+    base = attachment["url"].rsplit(".", 1)[0]
+    assert listed["thumbnail_url"] == f"{base}.thumb.jpg"
+    assert listed["preview_url"] == f"{base}.preview.jpg"
+    assert (upload_dir / listed["thumbnail_url"].removeprefix("/uploads/")).exists()
+
+    res = client.get(listed["thumbnail_url"])
+    assert res.status_code == 200
+    assert res.cache_control.immutable
+
+
+def test_known_content_reuses_existing_derivatives(app, client, make_user, auth_header,
+                                                   upload_dir, fake_renderer):
+    author = make_user()
+    headers = auth_header(author.id)
+    _, post_ids = seed_posts(author, 2)
+    upload(client, headers, post_ids[0], b"%PDF eloadas", "eloadas.pdf")
+    drain(app)
+
+    second = upload(client, headers, post_ids[1], b"%PDF eloadas", "masolat.pdf")
+    drain(app)
+
+    assert len(fake_renderer) == 1
+    assert db.session.get(PostAttachment, second["id"]).thumbnail_url.endswith(".thumb.jpg")
+
+
+def test_unsupported_and_failed_files(app, client, make_user, auth_header, upload_dir,
+                                      fake_renderer, monkeypatch):
+    author = make_user()
+    headers = auth_header(author.id)
+    _, (post_id,) = seed_posts(author)
+
+    upload(client, headers, post_id, b"csak szoveg", "jegyzet.txt")
+    drain(app)
+    assert fake_renderer == []  # be sem kerül a sorba
+    text_blob = Blob.query.one()
+    assert derivatives.generate(text_blob.id) == derivatives.UNSUPPORTED
+
+    def broken(blob_key):
+        raise OSError("sérült kép")
+
+    monkeypatch.setattr(derivatives, "render", broken)
+    attachment = upload(client, headers, post_id, b"\x89PNG rossz", "rossz.png")
+    drain(app)
+
+    blob = db.session.get(Blob, db.session.get(PostAttachment, attachment["id"]).blob_id)
+    assert blob.derivatives_status == derivatives.FAILED
+    assert blob.thumbnail_path is None
+
+
+def test_derivatives_are_collected_with_the_blob(app, client, make_user, auth_header,
+                                                upload_dir, fake_renderer):
+    author = make_user()
+    headers = auth_header(author.id)
+    _, (post_id,) = seed_posts(author)
+    attachment = upload(client, headers, post_id, b"\x89PNG torlendo", "t.png")
+    drain(app)
+    assert len([p for p in (upload_dir / "blobs").rglob("*") if p.is_file()]) == 3
+
+    blobs.delete_attachment(db.session.get(PostAttachment, attachment["id"]))
+
+    assert [p for p in (upload_dir / "blobs").rglob("*") if p.is_file()] == []
+
+
+def test_pool_runs_jobs_in_background_threads(app, make_user, upload_dir, fake_renderer):
+    # Egy worker: a teszt :memory: SQLite-ja egyetlen, szálak között megosztott kapcsolat
+    pool = derivatives.DerivativePool(app, workers=1)
+    try:
+        ids = []
+        for i in range(4):
+            key = blobs.blob_key(f"{i:02d}{'0' * 62}")
+            path = upload_dir / key
+            path.parent.mkdir(parents=True)
+            path.write_bytes(b"\x89PNG %d" % i)
+            blob = Blob(sha256=f"{i:02d}{'0' * 62}", size=5, path=key, ref_count=1)
+            db.session.add(blob)
+            db.session.commit()
+            ids.append(blob.id)
+
+        for blob_id in ids:
+            pool.submit(blob_id)
+        pool.drain()
+    finally:
+        pool.stop()
+
+    db.session.expire_all()
+    assert {b.derivatives_status for b in Blob.query} == {derivatives.DONE}
+
+
+def test_pillow_renders_bounded_jpegs(app, upload_dir):
+    Image = pytest.importorskip("PIL.Image")
+    key = blobs.blob_key("ab" + "0" * 62)
+    source = upload_dir / key
+    source.parent.mkdir(parents=True)
+    Image.new("RGBA", (2400, 1200), (255, 0, 0, 128)).save(source)
+
+    thumb_key, preview_key = derivatives.render(key)
+
+    with Image.open(upload_dir / thumb_key) as thumb, Image.open(upload_dir / preview_key) as preview:
+        assert thumb.format == preview.format == "JPEG"
+        assert thumb.size == (320, 160)
+        assert preview.size == (1280, 640)
@@ -0,0 +1,227 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import email_outbox
+import http_client
+from email_outbox import BrevoSender, OutboxWorker
+from models import db, EmailOutbox, User
+
+
+class SinkHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        status = self.server.statuses.pop(0) if self.server.statuses else 201
+        if status < 300:
+            self.server.received.append(payload)
+
+        body = b"{}"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def sink():
+    """Brevo-szerű helyi HTTP fogadó: a sikeresen fogadott üzeneteket gyűjti."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SinkHandler)
+    server.daemon_threads = True
+    server.received = []
+    server.statuses = []
+    server.url = f"http://127.0.0.1:{server.server_address[1]}/v3/smtp/email"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def no_network(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("a kérés közben nem mehet ki email")
+
+    monkeypatch.setattr(http_client, "post", fail)
+
+
+def test_register_enqueues_email_instead_of_sending(client, no_network):
+    res = client.post("/register", json={
+        "email": "uj@inf.elte.hu",
+        "secondaryEmail": "uj@gmail.com",
+        "password": "x",
+        "name": "Új Ödön",
+        "major": "Informatika",
+    })
+
+    assert res.status_code == 201
+    message = EmailOutbox.query.one()
+    assert message.to_email == "uj@gmail.com"
+    assert message.to_name == "Új Ödön"
+    assert message.subject == "🎓 StudyConnect - Üdv, Új!"
+    assert message.status == email_outbox.PENDING
+    assert "Ideiglenes jelszavad" in message.html_body
+    assert "Ideiglenes jelszavad:" in message.text_body
+
+
+@pytest.mark.parametrize("name", [None, "", "   "])
+def test_register_without_name(client, no_network, name):
+    payload = {"email": "nevtelen@inf.elte.hu", "secondaryEmail": "nevtelen@gmail.com", "major": "Informatika"}
+    if name is not None:
+        payload["name"] = name
+
+    res = client.post("/register", json=payload)
+
+    assert res.status_code == 201
+    assert User.query.filter_by(email="nevtelen@inf.elte.hu").count() == 1
+    assert EmailOutbox.query.one().to_email == "nevtelen@gmail.com"
+
+
+def test_forgot_password_succeeds_even_if_brevo_is_down(client, make_user, no_network):
+    make_user(secondary_email="elfelejtett@gmail.com")
+
+    res = client.post("/forgot-password", json={"email": "elfelejtett@gmail.com"})
+
+    assert res.status_code == 200
+    assert EmailOutbox.query.filter_by(to_email="elfelejtett@gmail.com").count() == 1
+
+
+def test_batch_is_sent_to_sink_and_body_purged(app, sink):
+    for i in range(3):
+        email_outbox.enqueue(f"user{i}@gmail.com", f"Tárgy {i}", f"<p>{i}</p>", text_body=str(i), to_name=f"User {i}")
+    db.session.commit()
+
+    processed, sent = email_outbox.process_batch(BrevoSender(sink.url, api_key="test"), batch_size=2)
+    assert (processed, sent) == (2, 2)
+    assert email_outbox.process_batch(BrevoSender(sink.url, api_key="test")) == (1, 1)
+
+    assert [m["to"][0]["email"] for m in sink.received] == [f"user{i}@gmail.com" for i in range(3)]
+    assert sink.received[0]["subject"] == "Tárgy 0"
+    assert sink.received[0]["htmlContent"] == "<p>0</p>"
+    assert sink.received[0]["textContent"] == "0"
+    assert all(m.status == email_outbox.SENT and m.html_body is m.text_body is None for m in EmailOutbox.query)
+
+
+def test_failed_send_is_retried_with_backoff_then_marked_failed(app, sink, monkeypatch):
+    monkeypatch.setattr(email_outbox, "MAX_ATTEMPTS", 3)
+    sink.statuses = [500, 503, 500]
+    message = email_outbox.enqueue("x@gmail.com", "Tárgy", "<p>x</p>")
+    db.session.commit()
+    sender = BrevoSender(sink.url)
+
+    assert email_outbox.process_batch(sender) == (1, 0)
+    db.session.refresh(message)
+    assert message.status == email_outbox.PENDING
+    assert message.attempts == 1
+    assert "Brevo 500" in message.last_error
+    # A visszalépés alatt nem kerül újra sorra
+    assert email_outbox.process_batch(sender) == (0, 0)
+
+    for attempt in (2, 3):
+        message.next_attempt_at -= timedelta(hours=2)
+        db.session.commit()
+        email_outbox.process_batch(sender)
+        db.session.refresh(message)
+        assert message.attempts == attempt
+
+    assert message.status == email_outbox.FAILED
+    assert sink.received == []
+
+
+def test_failed_message_body_is_purged(app, sink, monkeypatch):
+    monkeypatch.setattr(email_outbox, "MAX_ATTEMPTS", 1)
+    sink.statuses = [500]
+    message = email_outbox.enqueue("x@gmail.com", "Tárgy", "<p>jelszó: titok</p>", text_body="jelszó: titok")
+    db.session.commit()
+
+    assert email_outbox.process_batch(BrevoSender(sink.url)) == (1, 0)
+
+    db.session.refresh(message)
+    assert message.status == email_outbox.FAILED
+    assert message.html_body is None and message.text_body is None
+
+
+def test_backoff_grows_and_is_capped():
+    assert email_outbox.backoff(1) == timedelta(seconds=30)
+    assert email_outbox.backoff(3) == timedelta(minutes=2)
+    assert email_outbox.backoff(20) == email_outbox.BACKOFF_MAX
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    current = {"now": datetime(2026, 1, 1, 12, 0, 0)}
+    monkeypatch.setattr(email_outbox, "_utcnow", lambda: current["now"])
+    return current
+
+
+def test_message_reclaimed_after_lease_expiry_is_not_sent_again(app, clock):
+    first = email_outbox.enqueue("elso@gmail.com", "1", "<p>1</p>")
+    second = email_outbox.enqueue("masodik@gmail.com", "2", "<p>2</p>")
+    db.session.commit()
+    second_id = second.id
+    sent = []
+
+    def slow_sender(message):
+        sent.append(message.to_email)
+        if len(sent) == 1:
+            # A küldés túlfut a foglaláson, közben egy másik worker lefoglalja a második sort
+            clock["now"] += email_outbox.LEASE + timedelta(minutes=1)
+            EmailOutbox.query.filter_by(id=second_id).update({
+                "attempts": EmailOutbox.attempts + 1,
+                "next_attempt_at": clock["now"] + email_outbox.LEASE,
+            })
+            db.session.commit()
+
+    assert email_outbox.process_batch(slow_sender) == (1, 1)
+
+    assert sent == ["elso@gmail.com"]
+    second = db.session.get(EmailOutbox, second_id)
+    assert second.status == email_outbox.PENDING
+    assert second.attempts == 2
+
+
+def test_lease_running_low_is_renewed_before_send(app, clock):
+    for i in range(2):
+        email_outbox.enqueue(f"user{i}@gmail.com", str(i), "<p></p>")
+    db.session.commit()
+    sent = []
+
+    def slow_sender(message):
+        sent.append(message.to_email)
+        clock["now"] += email_outbox.LEASE - timedelta(seconds=30)
+
+    assert email_outbox.process_batch(slow_sender) == (2, 2)
+    assert sent == ["user0@gmail.com", "user1@gmail.com"]
+    assert EmailOutbox.query.filter_by(status=email_outbox.SENT).count() == 2
+
+
+def test_worker_thread_delivers_after_notify(app, sink):
+    worker = OutboxWorker(app, BrevoSender(sink.url), poll_interval=60)
+    # Az első (üres) kör végéig várunk: a memóriabeli SQLite kapcsolat közös a szállal,
+    # egy közben záródó worker session rollbackje elvinné a még nem commitolt sort
+    run_once, passes = worker.run_once, []
+    worker.run_once = lambda: passes.append(run_once()) or passes[-1]
+    worker.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not passes and time.monotonic() < deadline:
+            time.sleep(0.01)
+        email_outbox.enqueue("szal@gmail.com", "Háttér", "<p>szál</p>")
+        db.session.commit()
+        worker.notify()
+
+        deadline = time.monotonic() + 5
+        while not sink.received and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        worker.stop()
+
+    assert [m["to"][0]["email"] for m in sink.received] == ["szal@gmail.com"]
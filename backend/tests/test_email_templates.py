@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+from email_templates import EmailTemplates, SUBJECTS
+
+
+@pytest.fixture(scope="module")
+def templates():
+    return EmailTemplates()
+
+
+def test_welcome_renders_html_and_text(templates):
+    subject, html, text = templates.render("welcome", first_name="Ödön", temp_password="a&b<c>")
+
+    assert subject == "🎓 StudyConnect - Üdv, Ödön!"
+    assert "Sikeres regisztráció!" in html
+    # HTML-ben escape-elve, a szöveges változatban nyersen
+    assert "a&amp;b&lt;c&gt;" in html
+    assert "Ideiglenes jelszavad: a&b<c>" in text
+    assert "<" not in text.replace("a&b<c>", "")
+
+
+def test_subject_is_not_html_escaped(templates):
+    subject, _, _ = templates.render("welcome", first_name="O'Neil&Co", temp_password="x")
+
+    assert subject == "🎓 StudyConnect - Üdv, O'Neil&Co!"
+
+
+def test_temp_password_includes_login_url(templates):
+    subject, html, text = templates.render(
+        "temp_password", first_name="Ödön", temp_password="x", login_url="example.hu/login"
+    )
+
+    assert subject == SUBJECTS["temp_password"]
+    assert "<strong>example.hu/login</strong>" in html
+    assert "Belépés (ELTE emaillel): example.hu/login" in text
+
+
+def test_missing_variable_is_an_error(templates):
+    with pytest.raises(Exception):
+        templates.render("welcome", first_name="Ödön")
+
+
+def test_render_does_not_touch_the_filesystem(templates, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("a sablonoknak induláskor kell lefordulniuk")
+
+    monkeypatch.setattr(templates.env.loader, "get_source", fail)
+    templates.render("temp_password", first_name="A", temp_password="x", login_url="y")
+
+
+def test_render_benchmark(templates):
+    """Tömeges kiküldésnél egy üzenet csak változó-behelyettesítés."""
+    n = 500
+    started = time.perf_counter()
+    for i in range(n):
+        templates.render("welcome", first_name=f"User{i}", temp_password=f"pw{i}")
+    per_message = (time.perf_counter() - started) / n
+
+    print(f"\nemail render: {per_message * 1e6:.1f} µs/üzenet ({n} db)")
+    assert per_message < 0.002
@@ -0,0 +1,101 @@
+import hashlib
+import os
+
+import pytest
+
+
+@pytest.fixture
+def upload_dir(app, tmp_path):
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    return tmp_path
+
+
+def put_blob(upload_dir, payload, ext=".pdf"):
+    digest = hashlib.sha256(payload).hexdigest()
+    path = upload_dir / "blobs" / digest[:2] / digest
+    path.parent.mkdir(parents=True)
+    path.write_bytes(payload)
+    return digest, f"/uploads/blobs/{digest[:2]}/{digest}{ext}"
+
+
+def test_blob_has_strong_etag_and_immutable_cache(client, upload_dir):
+    digest, url = put_blob(upload_dir, b"%PDF" + os.urandom(4096))
+
+    res = client.get(url)
+
+    assert res.status_code == 200
+    assert res.headers["ETag"] == f'"{digest}"'
+    assert res.mimetype == "application/pdf"
+    assert res.headers["Accept-Ranges"] == "bytes"
+    cache = res.cache_control
+    assert cache.public and cache.immutable and cache.max_age == 365 * 24 * 3600
+
+
+def test_if_none_match_returns_304(client, upload_dir):
+    digest, url = put_blob(upload_dir, b"valami")
+
+    res = client.get(url, headers={"If-None-Match": f'"{digest}"'})
+
+    assert res.status_code == 304
+    assert res.data == b""
+
+
+def test_range_request(client, upload_dir):
+    payload = bytes(range(256)) * 40
+    _, url = put_blob(upload_dir, payload)
+
+    res = client.get(url, headers={"Range": "bytes=100-199"})
+
+    assert res.status_code == 206
+    assert res.data == payload[100:200]
+    assert res.headers["Content-Range"] == f"bytes 100-199/{len(payload)}"
+
+
+def test_same_blob_is_served_with_each_attachments_type(client, upload_dir):
+    digest, pdf_url = put_blob(upload_dir, b"ugyanaz")
+
+    as_pdf = client.get(pdf_url)
+    as_txt = client.get(pdf_url.removesuffix(".pdf") + ".txt")
+
+    assert as_pdf.mimetype == "application/pdf"
+    assert as_txt.mimetype == "text/plain"
+    assert as_pdf.data == as_txt.data == b"ugyanaz"
+    assert client.get(pdf_url.removesuffix(".pdf") + ".html").status_code == 403
+
+
+def test_legacy_file_is_served_without_immutable(client, upload_dir):
+    (upload_dir / "posts").mkdir()
+    (upload_dir / "posts" / "20260101_regi.txt").write_bytes(b"regi")
+
+    res = client.get("/uploads/posts/20260101_regi.txt")
+
+    assert res.status_code == 200
+    assert res.data == b"regi"
+    assert res.headers["ETag"]
+    assert not res.cache_control.immutable
+    assert res.cache_control.max_age == 3600
+
+
+def test_rejects_traversal_unknown_types_and_missing_files(client, upload_dir):
+    (upload_dir / "titok.pdf").write_bytes(b"x")
+
+    assert client.get("/uploads/../etc/passwd.txt").status_code in (403, 404)
+    assert client.get("/uploads/posts/..%2F..%2Ftitok.pdf").status_code in (403, 404)
+    assert client.get("/uploads/posts/script.html").status_code == 403
+    assert client.get("/uploads/posts/nincs.pdf").status_code == 404
+
+
+def test_x_accel_redirect_hands_off_to_proxy(app, client, upload_dir):
+    app.config["UPLOAD_SENDFILE"] = "x-accel"
+    digest, url = put_blob(upload_dir, b"nagy pdf")
+
+    res = client.get(url)
+
+    assert res.status_code == 200
+    assert res.data == b""
+    assert res.headers["X-Accel-Redirect"] == f"/protected-uploads/blobs/{digest[:2]}/{digest}"
+    assert res.headers["ETag"] == f'"{digest}"'
+    assert res.mimetype == "application/pdf"
+    assert res.cache_control.immutable
+
+    assert client.get(url, headers={"If-None-Match": f'"{digest}"'}).status_code == 304
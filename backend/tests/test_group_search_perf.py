@@ -0,0 +1,105 @@
+import random
+
+import pytest
+from models import db, User, Group, GroupMember, Interest, user_interests
+
+GROUP_COUNT = 500
+MEMBER_COUNT = 20_000
+USER_COUNT = 2_000
+HOBBIES = ["sport", "zene", "programozás", "sakk", "futás", "filmek", "olvasás", "főzés"]
+
+
+@pytest.fixture
+def large_search_dataset(app):
+    """500 csoport ugyanarra a tárgyra, 20 000 tagsággal (determinisztikus)."""
+    rnd = random.Random(42)
+    hobbies_by_user = {u: rnd.sample(HOBBIES, 2) for u in range(1, USER_COUNT + 1)}
+
+    db.session.execute(db.insert(User), [
+        {
+            "id": u,
+            "email": f"bench{u}@inf.elte.hu",
+            "secondary_email": f"bench{u}@gmail.com",
+            "password_hash": "x",
+            "major": "Informatika",
+            "name": f"Bench {u}",
+            "hobbies": ",".join(hobbies),
+            "is_active": True,
+        }
+        for u, hobbies in hobbies_by_user.items()
+    ])
+    db.session.execute(db.insert(Interest), [
+        {"id": i, "name": name} for i, name in enumerate(HOBBIES, start=1)
+    ])
+    db.session.execute(user_interests.insert(), [
+        {"user_id": u, "interest_id": HOBBIES.index(h) + 1}
+        for u, hobbies in hobbies_by_user.items()
+        for h in hobbies
+    ])
+    db.session.execute(db.insert(Group), [
+        {
+            "id": g,
+            "name": f"Analízis Study Group #{g}",
+            "subject": "Analízis",
+            "creator_id": 1,
+        }
+        for g in range(1, GROUP_COUNT + 1)
+    ])
+
+    per_user = MEMBER_COUNT // USER_COUNT
+    db.session.execute(db.insert(GroupMember), [
+        {"group_id": g, "user_id": u, "role": "member"}
+        for u in range(1, USER_COUNT + 1)
+        for g in rnd.sample(range(1, GROUP_COUNT + 1), per_user)
+    ])
+    db.session.commit()
+    return {"user_id": 1}
+
+
+def test_search_groups_constant_query_count(client, auth_header, count_queries, large_search_dataset):
+    headers = auth_header(large_search_dataset["user_id"])
+
+    with count_queries() as stats:
+        res = client.get("/groups/search?q=Analízis", headers=headers)
+
+    assert res.status_code == 200
+    data = res.get_json()
+    assert len(data["all_groups"]) == GROUP_COUNT + 1  # +1: automatikusan létrehozott üres csoport
+    assert sum(g["member_count"] for g in data["all_groups"]) == MEMBER_COUNT
+    assert sum(g["is_member"] for g in data["all_groups"]) == MEMBER_COUNT // USER_COUNT
+    assert data["recommended_group"]["same_interest_members"] > 0
+
+    print(f"\n/groups/search: {GROUP_COUNT} csoport, {MEMBER_COUNT} tag -> "
+          f"{stats['count']} lekérdezés, {stats['elapsed'] * 1000:.1f} ms")
+    # user + csoportok + 2 pontozó lekérdezés + az üres csoport létrehozása
+    assert stats["count"] <= 8
+
+
+def test_search_groups_scores_match_members(client, app, make_user, auth_header):
+    me = make_user(hobbies="sport,zene")
+    friend = make_user(hobbies="zene")
+    stranger = make_user(hobbies="sakk")
+
+    g1 = Group(name="Algo #1", subject="Algoritmusok", creator_id=me.id)
+    g2 = Group(name="Algo #2", subject="Algoritmusok", creator_id=me.id)
+    db.session.add_all([g1, g2])
+    db.session.flush()
+    db.session.add_all([
+        GroupMember(group_id=g1.id, user_id=stranger.id),
+        GroupMember(group_id=g2.id, user_id=friend.id),
+        GroupMember(group_id=g2.id, user_id=me.id),
+    ])
+    db.session.commit()
+
+    res = client.get("/groups/search?q=Algo", headers=auth_header(me.id))
+    data = res.get_json()
+
+    by_id = {g["id"]: g for g in data["all_groups"]}
+    assert by_id[g1.id]["member_count"] == 1
+    assert by_id[g1.id]["same_interest_members"] == 0
+    assert by_id[g1.id]["is_member"] is False
+    assert by_id[g2.id]["member_count"] == 2
+    assert by_id[g2.id]["same_interest_members"] == 2
+    assert by_id[g2.id]["is_member"] is True
+    assert data["recommended_group"]["id"] == g2.id
+    assert data["recommended_group"]["is_member"] is True
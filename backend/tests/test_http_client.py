@@ -0,0 +1,141 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from http_client import CLOSED, HALF_OPEN, OPEN, CircuitOpenError, OutboundHTTP, PoolSaturatedError
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+
+        if self.path == "/slow":
+            self.server.release.wait(5)
+        status = 500 if self.path == "/fail" else 200
+
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.release = threading.Event()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.release.set()
+    server.shutdown()
+    server.server_close()
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_connections_are_reused(stub_server):
+    client = OutboundHTTP()
+    for _ in range(5):
+        assert client.request("POST", f"{stub_server}/ok", json={}).json() == {"path": "/ok"}
+
+    stats = client.stats()[stub_server.split("//")[1]]
+    assert stats["requests"] == 5
+    assert stats["connections_opened"] == 1
+    client.close()
+
+
+def test_breaker_opens_fails_fast_and_recovers(stub_server):
+    clock = FakeClock()
+    client = OutboundHTTP(clock=clock)
+    host = stub_server.split("//")[1]
+    client.configure(host, failure_threshold=2, reset_timeout=30)
+
+    assert client.request("POST", f"{stub_server}/fail").status_code == 500
+    assert client.request("POST", f"{stub_server}/fail").status_code == 500
+    assert client.stats()[host]["breaker_state"] == OPEN
+
+    with pytest.raises(CircuitOpenError):
+        client.request("POST", f"{stub_server}/ok")
+    assert client.stats()[host]["rejected_open"] == 1
+    assert client.stats()[host]["requests"] == 2
+
+    # reset_timeout után egy próbakérés: sikertelen -> újra nyit, sikeres -> zár
+    clock.now = 31
+    assert client.request("POST", f"{stub_server}/fail").status_code == 500
+    assert client.stats()[host]["breaker_state"] == OPEN
+    clock.now = 62
+    assert client.request("POST", f"{stub_server}/ok").status_code == 200
+    assert client.stats()[host]["breaker_state"] == CLOSED
+    assert client.stats()[host]["breaker_opened"] == 2
+    client.close()
+
+
+def test_half_open_allows_a_single_trial():
+    from http_client import CircuitBreaker
+
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    clock.now = 10
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+
+
+def test_concurrency_cap_rejects_when_saturated(stub_server):
+    client = OutboundHTTP()
+    host = stub_server.split("//")[1]
+    client.configure(host, max_concurrent=1, acquire_timeout=0.05)
+
+    slow = threading.Thread(target=client.request, args=("POST", f"{stub_server}/slow"), daemon=True)
+    slow.start()
+    deadline = time.monotonic() + 5
+    while client.stats()[host]["in_flight"] == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    started = time.perf_counter()
+    with pytest.raises(PoolSaturatedError):
+        client.request("POST", f"{stub_server}/ok")
+    assert time.perf_counter() - started < 1
+
+    stats = client.stats()[host]
+    assert stats["rejected_saturated"] == 1
+    assert stats["max_in_flight"] == 1
+    # A telítettség nem a host hibája: a breaker zárva marad
+    assert stats["breaker_state"] == CLOSED
+
+    # A slow szerver-oldali Event-re vár; a fixture teardown engedi el
+    slow.join(timeout=0)
+    client.close()
+
+
+def test_unreachable_host_counts_as_failure():
+    import requests
+
+    client = OutboundHTTP()
+    client.configure("127.0.0.1:9", failure_threshold=1, timeout=(0.2, 0.2))
+
+    with pytest.raises(requests.ConnectionError):
+        client.request("POST", "http://127.0.0.1:9/api")
+    with pytest.raises(CircuitOpenError):
+        client.request("POST", "http://127.0.0.1:9/api")
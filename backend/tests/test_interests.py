@@ -0,0 +1,52 @@
+import http_client
+import routes
+from models import User, Interest
+
+
+def test_register_stores_normalized_interests(client, monkeypatch):
+    # Az üdvözlő email az outboxba kerül, a kérés közben nincs kimenő hívás
+    def no_network(*args, **kwargs):
+        raise AssertionError("register nem hívhat külső API-t")
+
+    monkeypatch.setattr(http_client, "post", no_network)
+
+    res = client.post("/register", json={
+        "email": "hobbi@inf.elte.hu",
+        "secondaryEmail": "hobbi@gmail.com",
+        "password": "password123",
+        "name": "Hobbi Hanna",
+        "major": "Informatika",
+        "hobbies": ["Sport", " zene ", ""]
+    })
+
+    assert res.status_code == 201
+    # A válasz alakja változatlan: a hobbik továbbra is stringként jönnek vissza
+    assert res.get_json()["user"]["hobbies"] == "Sport, zene ,"
+
+    user = User.query.filter_by(email="hobbi@inf.elte.hu").first()
+    assert sorted(i.name for i in user.interests) == ["sport", "zene"]
+
+
+def test_interests_are_shared_between_users(app, make_user):
+    a = make_user(hobbies="sakk,zene")
+    b = make_user(hobbies="Zene")
+
+    assert Interest.query.count() == 2
+    zene = Interest.query.filter_by(name="zene").one()
+    assert {u.id for u in zene.users} == {a.id, b.id}
+
+
+def test_interest_created_concurrently_is_reused(app, make_user, monkeypatch):
+    insert_ignore = routes.insert_ignore
+
+    def racing_insert_ignore(model, rows):
+        # Egy másik kérés épp az első lekérdezés után hozta létre ugyanazt az érdeklődést
+        insert_ignore(model, [{"name": "zene"}])
+        return insert_ignore(model, rows)
+
+    monkeypatch.setattr(routes, "insert_ignore", racing_insert_ignore)
+
+    user = make_user(hobbies="sakk,zene")
+
+    assert sorted(i.name for i in user.interests) == ["sakk", "zene"]
+    assert Interest.query.count() == 2
@@ -0,0 +1,104 @@
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+import logging_setup
+
+
+@pytest.fixture
+def log_output():
+    """Saját kimenetre konfigurált naplózás; a teszt végén a következő create_app újra beállítja."""
+    buf = io.StringIO()
+    services = []
+
+    def _configure(**options):
+        service = logging_setup.configure(stream=buf, **options)
+        services.append(service)
+        return service
+
+    def records():
+        services[-1].flush()
+        return [json.loads(line) for line in buf.getvalue().splitlines()]
+
+    yield _configure, records
+    if services:
+        services[-1].shutdown()
+        logging_setup._service = None
+
+
+def test_records_are_json_written_by_a_background_thread(log_output):
+    configure, records = log_output
+    service = configure(level="INFO")
+    writers = []
+    original_emit = service.output.emit
+    service.output.emit = lambda record: (writers.append(threading.current_thread()), original_emit(record))
+
+    logging.getLogger("routes").info("poszt létrehozva %s", 42, extra={"group_id": 7})
+    try:
+        raise ValueError("hiba")
+    except ValueError:
+        logging.getLogger("routes").exception("sikertelen")
+
+    first, second = records()
+    assert first["level"] == "INFO"
+    assert first["logger"] == "routes"
+    assert first["msg"] == "poszt létrehozva 42"
+    assert first["group_id"] == 7
+    assert first["ts"].endswith("Z")
+    assert "ValueError: hiba" in second["exc"]
+    assert writers and all(t is not threading.main_thread() for t in writers)
+
+
+def test_request_context_is_captured(app, client, log_output, make_user, auth_header):
+    configure, records = log_output
+    configure(level="INFO")
+    user = make_user()
+
+    @app.route("/_log-probe")
+    def probe():
+        from flask import g
+        g.user_id = user.id
+        logging.getLogger("routes").warning("próba")
+        return "ok"
+
+    res = client.get("/_log-probe", headers={"X-Request-ID": "abc123"})
+
+    assert res.headers["X-Request-ID"] == "abc123"
+    (record,) = [r for r in records() if r["msg"] == "próba"]
+    assert record["request_id"] == "abc123"
+    assert record["method"] == "GET"
+    assert record["path"] == "/_log-probe"
+    assert record["user_id"] == user.id
+
+
+def test_per_module_levels_and_debug_sampling(log_output):
+    configure, records = log_output
+    draws = iter([0.5, 0.01, 0.5, 0.01])
+    service = configure(level="WARNING", levels=logging_setup.parse_levels("routes=DEBUG, http_client=ERROR"),
+                        sample_rates=logging_setup.parse_sample_rates("DEBUG=0.1"))
+    service.sampling.rng = lambda: next(draws)
+
+    for i in range(4):
+        logging.getLogger("routes").debug("részlet %d", i)
+    logging.getLogger("routes").info("info")
+    logging.getLogger("http_client").warning("elnyelve")
+    logging.getLogger("subject_cache").info("elnyelve")
+    logging.getLogger("subject_cache").warning("átmegy")
+
+    assert [r["msg"] for r in records()] == ["részlet 1", "részlet 3", "info", "átmegy"]
+
+
+def test_full_queue_drops_instead_of_blocking(log_output):
+    configure, records = log_output
+    service = configure(level="INFO", queue_size=5)
+    service.listener.stop()  # senki sem üríti a sort
+
+    for i in range(20):
+        logging.getLogger("routes").info("zaj %d", i)
+
+    assert service.handler.dropped == 15
+    service.listener.start()
+    assert len(records()) == 5
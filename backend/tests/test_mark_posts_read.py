@@ -0,0 +1,51 @@
+from datetime import datetime, timedelta
+
+from models import db, Group, GroupMember, Post, PostView
+
+
+def seed(me, other, post_count):
+    group = Group(name=f"Jelölés {post_count}", subject="Jelölés", creator_id=me.id)
+    db.session.add(group)
+    db.session.flush()
+    db.session.add(GroupMember(group_id=group.id, user_id=me.id, joined_at=datetime(2026, 1, 1)))
+    db.session.execute(db.insert(Post), [
+        {"title": "p", "content": "c", "group_id": group.id, "author_id": other.id,
+         "created_at": datetime(2026, 1, 1) + timedelta(minutes=i)}
+        for i in range(post_count)
+    ])
+    db.session.commit()
+    return group
+
+
+def test_mark_posts_read_is_one_statement(client, make_user, auth_header, count_queries):
+    me, other = make_user(), make_user()
+    headers = auth_header(me.id)
+    small = seed(me, other, 3)
+    large = seed(me, other, 500)
+
+    with count_queries() as small_stats:
+        client.post(f"/groups/{small.id}/mark-posts-read", headers=headers)
+    with count_queries() as large_stats:
+        res = client.post(f"/groups/{large.id}/mark-posts-read", headers=headers)
+
+    assert res.get_json()["marked_count"] == 500
+    assert small_stats["count"] == large_stats["count"]
+    inserts = [s for s in large_stats["statements"] if s.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 1
+
+
+def test_mark_posts_read_skips_already_viewed(client, make_user, auth_header):
+    me, other = make_user(), make_user()
+    group = seed(me, other, 4)
+    first = Post.query.filter_by(group_id=group.id).first()
+    db.session.add(PostView(user_id=me.id, post_id=first.id))
+    db.session.commit()
+    headers = auth_header(me.id)
+
+    res = client.post(f"/groups/{group.id}/mark-posts-read", headers=headers)
+    assert res.get_json()["marked_count"] == 3
+
+    again = client.post(f"/groups/{group.id}/mark-posts-read", headers=headers)
+    assert again.status_code == 200
+    assert again.get_json()["marked_count"] == 0
+    assert PostView.query.filter_by(user_id=me.id).count() == 4
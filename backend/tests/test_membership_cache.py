@@ -0,0 +1,107 @@
+import pytest
+import membership
+from models import db, Group, GroupMember
+
+
+class FakeRedis:
+    """Redis-kompatibilis (get/set(ex=)/delete) helyi csere a tesztekhez."""
+
+    def __init__(self):
+        self.data = {}
+
+    def get(self, name):
+        return self.data.get(name)
+
+    def set(self, name, value, ex=None):
+        self.data[name] = value.encode("utf-8")
+
+    def delete(self, name):
+        self.data.pop(name, None)
+
+
+@pytest.fixture(params=["memory", "redis"])
+def service(request, app):
+    if request.param == "redis":
+        backend = membership.RedisBackend(FakeRedis())
+    else:
+        backend = membership.MemoryBackend()
+    app.extensions["membership"] = membership.MembershipService(backend, ttl=30)
+    return app.extensions["membership"]
+
+
+def make_group(creator):
+    group = Group(name="Tagság", subject="Tagság", creator_id=creator.id)
+    db.session.add(group)
+    db.session.commit()
+    return group
+
+
+def test_status_single_query_then_cached(service, make_user, count_queries):
+    user = make_user()
+    user_id, group_id = user.id, make_group(user).id
+
+    with count_queries() as first:
+        assert service.status(user_id, group_id) == membership.NOT_MEMBER
+    with count_queries() as second:
+        assert service.status(user_id, group_id) == membership.NOT_MEMBER
+    assert service.status(user_id, 9999) == membership.GROUP_MISSING
+
+    assert first["count"] == 1
+    assert second["count"] == 0
+
+
+def test_missing_group_is_not_cached(service, make_user):
+    user = make_user()
+    next_id = (db.session.query(db.func.max(Group.id)).scalar() or 0) + 1
+    assert service.status(user.id, next_id) == membership.GROUP_MISSING
+
+    group = make_group(user)
+
+    assert group.id == next_id
+    assert service.status(user.id, group.id) == membership.NOT_MEMBER
+
+
+def test_join_and_leave_invalidate(client, service, make_user, auth_header):
+    user = make_user()
+    group = make_group(user)
+    headers = auth_header(user.id)
+
+    assert client.get(f"/groups/{group.id}/events", headers=headers).status_code == 403
+
+    assert client.post("/groups/join", json={"group_id": group.id}, headers=headers).status_code == 201
+    assert client.get(f"/groups/{group.id}/events", headers=headers).status_code == 200
+
+    assert client.delete(f"/groups/{group.id}/leave", headers=headers).status_code == 200
+    assert client.get(f"/groups/{group.id}/events", headers=headers).status_code == 403
+
+
+def test_group_scoped_endpoint_authorizes_in_one_query(client, service, make_user, auth_header, count_queries):
+    user = make_user()
+    group = make_group(user)
+    db.session.add(GroupMember(group_id=group.id, user_id=user.id))
+    db.session.commit()
+    headers = auth_header(user.id)
+    url = f"/groups/{group.id}/events"
+
+    with count_queries() as cold:
+        assert client.get(url, headers=headers).status_code == 200
+    with count_queries() as warm:
+        assert client.get(url, headers=headers).status_code == 200
+
+    # hideg: tagság (1) + események (1); meleg: csak az események
+    assert cold["count"] == 2
+    assert warm["count"] == 1
+    assert client.get("/groups/424242/events", headers=headers).status_code == 404
+
+
+def test_memory_cache_is_disabled_with_multiple_workers(app, make_user, count_queries):
+    app.config["SERVER_WORKERS"] = 3
+    service = membership.init_membership(app)
+    user = make_user()
+    user_id, group_id = user.id, make_group(user).id
+
+    assert isinstance(service.backend, membership.NullBackend)
+    with count_queries() as queries:
+        assert service.status(user_id, group_id) == membership.NOT_MEMBER
+        assert service.status(user_id, group_id) == membership.NOT_MEMBER
+    assert queries["count"] == 2
@@ -0,0 +1,157 @@
+import json
+import re
+
+import pytest
+import requests
+
+import auth
+import http_client
+from metrics import Metrics, RequestStats
+
+ENDPOINT = "/notifications/unread-count"
+
+
+def sample(text, name, **labels):
+    """Egy minta értéke a Prometheus szövegből (a címkék sorrendje a regisztráció szerinti)."""
+    for line in text.splitlines():
+        if line.startswith(name + "{"):
+            found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', line[len(name):line.rindex("}")]))
+            if all(found.get(k) == v for k, v in labels.items()):
+                return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+def test_request_is_recorded_per_endpoint(client, make_user, auth_header):
+    user = make_user()
+    for _ in range(2):
+        assert client.get(ENDPOINT, headers=auth_header(user.id)).status_code == 200
+
+    res = client.get("/metrics")
+
+    assert res.status_code == 200
+    assert res.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    text = res.get_data(as_text=True)
+    assert sample(text, "http_requests_total", method="GET", endpoint=ENDPOINT, status="200") == 2
+    assert sample(text, "http_request_duration_seconds_count", method="GET", endpoint=ENDPOINT) == 2
+    assert sample(text, "http_request_duration_seconds_bucket", endpoint=ENDPOINT, le="+Inf") == 2
+    assert sample(text, "http_response_size_bytes_count", endpoint=ENDPOINT) == 2
+    assert sample(text, "db_queries_per_request_count", endpoint=ENDPOINT) == 2
+    assert sample(text, "db_queries_total", endpoint=ENDPOINT) >= 2
+    assert sample(text, "db_query_seconds_total", endpoint=ENDPOINT) > 0
+
+
+def test_unmatched_paths_share_one_label(client):
+    client.get("/nincs/ilyen/1")
+    client.get("/nincs/ilyen/2")
+
+    text = client.get("/metrics").get_data(as_text=True)
+
+    assert sample(text, "http_requests_total", endpoint="<unmatched>", status="404") == 2
+    assert "/nincs/ilyen" not in text
+
+
+def test_query_count_headers_match_executed_statements(app, client, make_user, auth_header, count_queries):
+    app.extensions["metrics"].debug_headers = True
+    user = make_user()
+    headers = auth_header(user.id)
+
+    with count_queries() as stats:
+        res = client.get(ENDPOINT, headers=headers)
+
+    assert int(res.headers["X-Query-Count"]) == stats["count"]
+    assert re.fullmatch(
+        r'db;dur=\d+\.\d;desc="\d+ queries", app;dur=\d+\.\d', res.headers["Server-Timing"]
+    )
+
+
+def test_debug_headers_off_by_default(client, make_user, auth_header):
+    user = make_user()
+
+    res = client.get(ENDPOINT, headers=auth_header(user.id))
+
+    assert "X-Query-Count" not in res.headers
+    assert "Server-Timing" not in res.headers
+
+
+def test_metrics_token(app, client):
+    app.config["METRICS_TOKEN"] = "titok"
+
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer titok"}).status_code == 200
+
+
+def test_worker_snapshots_are_summed(tmp_path):
+    stats = RequestStats()
+    stats.queries = 3
+    stats.db_seconds = 0.5
+    worker_a = Metrics(directory=str(tmp_path))
+    worker_b = Metrics(directory=str(tmp_path))
+    worker_a.registry.record("GET", "/x", 200, 0.02, 100, stats)
+    worker_b.registry.record("GET", "/x", 200, 0.2, 5000, stats)
+    # Másik folyamat pillanatképe (a saját pid-fájlt a collect felülírja)
+    (tmp_path / "99999999.json").write_text(json.dumps(worker_b.registry.snapshot()))
+
+    text = worker_a.collect()
+
+    assert sample(text, "http_requests_total", endpoint="/x") == 2
+    assert sample(text, "http_request_duration_seconds_bucket", endpoint="/x", le="0.025") == 1
+    assert sample(text, "http_request_duration_seconds_bucket", endpoint="/x", le="0.25") == 2
+    assert sample(text, "db_queries_total", endpoint="/x") == 6
+    assert sample(text, "db_query_seconds_total", endpoint="/x") == 1
+
+
+def test_exiting_worker_is_folded_into_the_retired_snapshot(tmp_path):
+    stats = RequestStats()
+    stats.queries = 1
+    live = Metrics(directory=str(tmp_path))
+    live.registry.record("GET", "/x", 200, 0.01, 10, stats)
+
+    # Egymás után kilépő (max_requests miatt cserélt) workerek
+    for _ in range(3):
+        exiting = Metrics(directory=str(tmp_path))
+        exiting.registry.add_collector(lambda registry: registry.outbound_in_flight.set(("h",), 1))
+        exiting.registry.record("GET", "/x", 200, 0.01, 10, stats)
+        exiting.flush(force=True)
+        exiting.retire()
+        exiting.flush(force=True)  # a retire után már nem ír
+
+    assert sorted(p.name for p in tmp_path.glob("*.json")) == ["retired.json"]
+    text = live.collect()
+    assert sample(text, "http_requests_total", endpoint="/x") == 4
+    assert sample(text, "db_queries_total", endpoint="/x") == 4
+    assert sample(text, "http_client_in_flight", host="h") is None
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+def test_outbound_http_and_token_cache_stats_are_exported(client, monkeypatch, make_user, auth_header):
+    monkeypatch.setattr(http_client, "default_client", http_client.OutboundHTTP())
+    # Zárt port: a kapcsolódás azonnal elbukik, egy hiba után nyit a breaker
+    http_client.configure("127.0.0.1:9", failure_threshold=1)
+    with pytest.raises(requests.ConnectionError):
+        http_client.get("http://127.0.0.1:9/")
+    with pytest.raises(http_client.CircuitOpenError):
+        http_client.get("http://127.0.0.1:9/")
+
+    before = dict(auth.token_cache_stats)
+    headers = auth_header(make_user().id)
+    for _ in range(3):
+        client.get(ENDPOINT, headers=headers)
+
+    text = client.get("/metrics").get_data(as_text=True)
+
+    host = "127.0.0.1:9"
+    assert sample(text, "http_client_requests_total", host=host) == 1
+    assert sample(text, "http_client_failures_total", host=host) == 1
+    assert sample(text, "http_client_rejected_total", host=host, reason="breaker_open") == 1
+    assert sample(text, "http_client_rejected_total", host=host, reason="pool_saturated") == 0
+    assert sample(text, "http_client_breaker_opened_total", host=host) == 1
+    assert sample(text, "http_client_breaker_state", host=host, state="open") == 1
+    assert sample(text, "http_client_breaker_state", host=host, state="closed") == 0
+    assert sample(text, "http_client_in_flight", host=host) == 0
+    assert sample(text, "http_client_max_concurrent", host=host) == 8
+    assert "# TYPE http_client_in_flight gauge" in text
+    # A token már egy korábbi tesztből is a cache-ben lehet: a három kérés összesen számít
+    hits = sample(text, "auth_token_cache_total", result="hit")
+    misses = sample(text, "auth_token_cache_total", result="miss")
+    assert hits >= before["hits"] + 2
+    assert hits + misses == before["hits"] + before["misses"] + 3
@@ -0,0 +1,136 @@
+from datetime import datetime
+
+import notifications
+from models import db, Group, GroupMember, Notification, NotificationCounter, User
+
+
+def seed_group(owner, members):
+    group = Group(name="Értesítés", subject="Értesítés", creator_id=owner.id)
+    db.session.add(group)
+    db.session.flush()
+    db.session.add_all(
+        GroupMember(group_id=group.id, user_id=u.id, joined_at=datetime(2026, 1, 1)) for u in [owner, *members]
+    )
+    db.session.commit()
+    return group.id
+
+
+def drain(app):
+    app.extensions["notifications"].drain()
+
+
+def test_post_fan_out_runs_after_the_request(app, client, make_user, auth_header):
+    author, a, b = make_user(name="Szerző Sára"), make_user(), make_user()
+    author_id, a_id, b_id = author.id, a.id, b.id
+    group_id = seed_group(author, [a, b])
+
+    res = client.post(f"/groups/{group_id}/posts", json={"title": "Zh", "content": "holnap"},
+                      headers=auth_header(author_id))
+    assert res.status_code == 201
+    # A kérés csak sorba tette a feladatot
+    assert Notification.query.count() == 0
+
+    drain(app)
+    rows = Notification.query.order_by(Notification.user_id).all()
+    assert [n.user_id for n in rows] == [a_id, b_id]
+    assert {n.type for n in rows} == {notifications.POST}
+    assert rows[0].content == "Szerző Sára új posztot írt: Zh"
+    assert rows[0].ref_id == res.get_json()["post"]["id"]
+    assert notifications.unread_count(a_id) == 1
+    assert notifications.unread_count(author_id) == 0
+
+
+def test_fan_out_is_constant_number_of_statements(app, make_user, count_queries):
+    author = make_user()
+    author_id = author.id
+    db.session.execute(db.insert(User), [
+        {"email": f"tag{i}@inf.elte.hu", "secondary_email": f"tag{i}@gmail.com", "name": f"Tag {i}",
+         "password_hash": "x", "major": "Informatika"}
+        for i in range(300)
+    ])
+    members = User.query.filter(User.id != author_id).all()
+    group_id = seed_group(author, members)
+
+    with count_queries() as stats:
+        assert notifications.fan_out(notifications.EVENT, group_id, author_id, 1, "Vizsga") == 300
+
+    inserts = [s for s in stats["statements"] if s.lstrip().upper().startswith("INSERT")]
+    assert len(inserts) == 2
+    assert stats["count"] <= 3
+
+    # Második esemény: a számláló nő, nem duplikálódik
+    notifications.fan_out(notifications.EVENT, group_id, author_id, 2, "Vizsga 2")
+    assert NotificationCounter.query.count() == 300
+    assert {c.unread for c in NotificationCounter.query} == {2}
+
+
+def test_comment_and_event_fan_out(app, client, make_user, auth_header):
+    author, member = make_user(), make_user()
+    member_id = member.id
+    group_id = seed_group(author, [member])
+    headers = auth_header(author.id)
+
+    post_id = client.post(f"/groups/{group_id}/posts", json={"title": "Kérdés", "content": "?"},
+                          headers=headers).get_json()["post"]["id"]
+    client.post(f"/posts/{post_id}/comments", json={"content": "válasz"}, headers=headers)
+    client.post(f"/groups/{group_id}/events", json={"title": "Konzi", "date": "2026-11-01T10:00:00Z"},
+                headers=headers)
+    drain(app)
+
+    types = [n.type for n in Notification.query.filter_by(user_id=member_id).order_by(Notification.id)]
+    assert types == [notifications.POST, notifications.COMMENT, notifications.EVENT]
+    assert notifications.unread_count(member_id) == 3
+
+
+def test_list_paginates_and_mark_read_updates_counter(app, client, make_user, auth_header):
+    author, me = make_user(), make_user()
+    author_id, me_id = author.id, me.id
+    group_id = seed_group(author, [me])
+    for i in range(5):
+        notifications.fan_out(notifications.POST, group_id, author_id, i, f"Poszt {i}")
+    headers = auth_header(me_id)
+
+    first = client.get("/notifications?limit=3", headers=headers).get_json()
+    assert first["unread_count"] == 5
+    assert len(first["notifications"]) == 3
+    second = client.get(f"/notifications?limit=3&before={first['next_cursor']}", headers=headers).get_json()
+    assert len(second["notifications"]) == 2
+    assert second["next_cursor"] is None
+    ids = [n["id"] for n in first["notifications"] + second["notifications"]]
+    assert ids == sorted(ids, reverse=True)
+
+    res = client.post(f"/notifications/{ids[0]}/read", headers=headers)
+    assert res.get_json()["unread_count"] == 4
+    # Ismételt jelölés nem csökkenti tovább
+    assert client.post(f"/notifications/{ids[0]}/read", headers=headers).get_json()["unread_count"] == 4
+
+    assert client.post("/notifications/read-all", headers=headers).get_json()["marked_count"] == 4
+    assert client.get("/notifications/unread-count", headers=headers).get_json() == {"unread_count": 0}
+
+
+def test_cannot_mark_someone_elses_notification(app, client, make_user, auth_header):
+    author, member, stranger = make_user(), make_user(), make_user()
+    member_id = member.id
+    group_id = seed_group(author, [member])
+    notifications.fan_out(notifications.POST, group_id, author.id, 1, "Titok")
+    notification_id = Notification.query.filter_by(user_id=member_id).one().id
+
+    res = client.post(f"/notifications/{notification_id}/read", headers=auth_header(stranger.id))
+    assert res.status_code == 404
+    assert notifications.unread_count(member_id) == 1
+
+
+def test_background_thread_processes_jobs(app, make_user):
+    author, member = make_user(), make_user()
+    author_id, member_id = author.id, member.id
+    group_id = seed_group(author, [member])
+
+    fanout = notifications.FanoutQueue(app).start()
+    try:
+        fanout.submit(kind=notifications.POST, group_id=group_id, actor_id=author_id, ref_id=1, title="Szál")
+        fanout.drain()
+    finally:
+        fanout.stop()
+
+    db.session.expire_all()
+    assert notifications.unread_count(member_id) == 1
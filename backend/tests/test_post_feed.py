@@ -0,0 +1,87 @@
+from datetime import datetime, timedelta
+
+from models import db, Group, GroupMember, Post, Comment, PostAttachment
+
+
+def seed_group_posts(user_id, post_count, same_timestamp=False):
+    group = Group(name=f"Feed csoport {post_count}", subject="Feed", creator_id=user_id)
+    db.session.add(group)
+    db.session.flush()
+    db.session.add(GroupMember(group_id=group.id, user_id=user_id))
+
+    base = datetime(2026, 1, 1)
+    posts = [
+        Post(
+            title=f"Poszt {i}",
+            content="tartalom",
+            group_id=group.id,
+            author_id=user_id,
+            created_at=base if same_timestamp else base + timedelta(minutes=i),
+        )
+        for i in range(post_count)
+    ]
+    db.session.add_all(posts)
+    db.session.flush()
+
+    for p in posts:
+        db.session.add_all([
+            Comment(comment="a", post_id=p.id, author_id=user_id),
+            Comment(comment="b", post_id=p.id, author_id=user_id),
+            Comment(comment="törölt", post_id=p.id, author_id=user_id, deleted_at=base),
+            PostAttachment(post_id=p.id, filename="jegyzet.pdf", file_url="/uploads/posts/jegyzet.pdf"),
+        ])
+    db.session.commit()
+    return group
+
+
+def test_list_posts_query_count_is_constant(client, make_user, auth_header, count_queries):
+    user = make_user()
+    headers = auth_header(user.id)
+    small = seed_group_posts(user.id, 5)
+    large = seed_group_posts(user.id, 300)
+
+    with count_queries() as small_stats:
+        res_small = client.get(f"/groups/{small.id}/posts", headers=headers)
+    with count_queries() as large_stats:
+        res_large = client.get(f"/groups/{large.id}/posts", headers=headers)
+
+    assert res_small.status_code == res_large.status_code == 200
+    posts = res_large.get_json()["posts"]
+    assert len(posts) == 300
+    assert all(p["comment_count"] == 2 for p in posts)
+    assert all(len(p["attachments"]) == 1 for p in posts)
+
+    print(f"\n/groups/<id>/posts: 5 poszt -> {small_stats['count']} lekérdezés "
+          f"({small_stats['elapsed'] * 1000:.1f} ms), 300 poszt -> {large_stats['count']} lekérdezés "
+          f"({large_stats['elapsed'] * 1000:.1f} ms)")
+    assert small_stats["count"] == large_stats["count"]
+
+
+def test_list_posts_keyset_pagination(client, make_user, auth_header):
+    user = make_user()
+    headers = auth_header(user.id)
+    # Azonos created_at: a kurzornak az id-t is figyelembe kell vennie
+    group = seed_group_posts(user.id, 7, same_timestamp=True)
+
+    seen = []
+    cursor = None
+    while True:
+        url = f"/groups/{group.id}/posts?limit=3"
+        if cursor:
+            url += f"&before={cursor}"
+        data = client.get(url, headers=headers).get_json()
+        seen.extend(p["id"] for p in data["posts"])
+        cursor = data["next_cursor"]
+        if not cursor:
+            break
+
+    assert len(seen) == 7
+    assert seen == sorted(seen, reverse=True)
+
+
+def test_list_posts_invalid_cursor(client, make_user, auth_header):
+    user = make_user()
+    group = seed_group_posts(user.id, 1)
+
+    res = client.get(f"/groups/{group.id}/posts?before=nem-kurzor", headers=auth_header(user.id))
+    assert res.status_code == 400
@@ -0,0 +1,86 @@
+import pytest
+
+from models import db, Group, GroupMember, User
+from query_guard import QueryGuardError, normalize, repeated_selects
+
+
+@pytest.fixture
+def groups_with_members(make_user):
+    """4 csoport ugyanabból a tárgyból, mindegyikben ugyanaz az 5 tag."""
+    users = [make_user() for _ in range(5)]
+    groups = [Group(name=f"Analízis {i}", subject="Analízis", creator_id=users[0].id) for i in range(4)]
+    db.session.add_all(groups)
+    db.session.flush()
+    db.session.add_all([GroupMember(group_id=grp.id, user_id=u.id) for grp in groups for u in users])
+    db.session.commit()
+    return users, groups
+
+
+def test_normalize_ignores_parameters_and_in_list_length():
+    assert normalize("SELECT * FROM users WHERE users.id = ?") == normalize(
+        "SELECT *  FROM users\nWHERE users.id = %(pk_1)s"
+    )
+    assert normalize("SELECT a FROM t WHERE t.id IN (?, ?, ?)") == normalize("SELECT a FROM t WHERE t.id IN (?)")
+    assert normalize("SELECT a FROM t WHERE t.name = 'x' LIMIT 10") == "SELECT a FROM t WHERE t.name = ? LIMIT ?"
+
+
+def test_repeated_selects_only_counts_selects_over_threshold():
+    statements = ["SELECT * FROM users WHERE users.id = ?"] * 3 + ["UPDATE users SET name = ?"] * 5 + [
+        "SELECT * FROM posts WHERE posts.id = ?"
+    ] * 2
+
+    assert repeated_selects(statements, threshold=3) == [("SELECT * FROM users WHERE users.id = ?", 3)]
+
+
+def test_lazy_load_in_loop_fails_the_request(app, client, groups_with_members, auth_header):
+    users, groups = groups_with_members
+
+    @app.route("/test-n-plus-one/<int:group_id>")
+    def n_plus_one(group_id):
+        members = GroupMember.query.filter_by(group_id=group_id).all()
+        return {"names": [db.session.get(User, m.user_id).name for m in members]}
+
+    with pytest.raises(QueryGuardError, match="N\\+1"):
+        client.get(f"/test-n-plus-one/{groups[0].id}")
+
+
+@pytest.mark.query_budget(3)
+def test_members_list_has_no_n_plus_one(client, groups_with_members, auth_header):
+    users, groups = groups_with_members
+
+    res = client.get(f"/groups/{groups[0].id}/members", headers=auth_header(users[0].id))
+
+    assert res.status_code == 200
+    assert sorted(m["user_id"] for m in res.get_json()["members"]) == sorted(u.id for u in users)
+    assert {m["name"] for m in res.get_json()["members"]} == {u.name for u in users}
+
+
+@pytest.mark.query_budget(2)
+def test_my_groups_has_no_n_plus_one(client, groups_with_members, auth_header):
+    users, groups = groups_with_members
+
+    res = client.get("/groups/my-groups", headers=auth_header(users[1].id))
+
+    assert res.status_code == 200
+    assert sorted(grp["id"] for grp in res.get_json()["groups"]) == sorted(grp.id for grp in groups)
+
+
+@pytest.mark.query_budget(4)
+def test_groups_by_subject_has_no_n_plus_one(client, groups_with_members, auth_header, make_user):
+    users, groups = groups_with_members
+    outsider = make_user()
+
+    res = client.get("/groups/by-subject?name=Analízis", headers=auth_header(outsider.id))
+
+    assert res.status_code == 200
+    body = res.get_json()
+    assert len(body) == 4
+    assert all(grp["member_count"] == 5 and grp["is_member"] is False for grp in body)
+
+
+@pytest.mark.query_budget(1)
+def test_budget_overrun_fails_the_request(client, groups_with_members, auth_header):
+    users, groups = groups_with_members
+
+    with pytest.raises(QueryGuardError, match="keret"):
+        client.get("/groups/search?q=Anal", headers=auth_header(users[0].id))
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+
+import pytest
+import read_tracking
+from models import db, Group, GroupMember, GroupReadState, Post, PostView
+
+
+@pytest.fixture
+def watermark_mode(app):
+    app.config["READ_TRACKING_MODE"] = read_tracking.WATERMARK
+    yield
+    app.config["READ_TRACKING_MODE"] = read_tracking.POSTVIEW
+
+
+def seed(me, other, post_count=5):
+    joined = datetime(2026, 1, 1)
+    group = Group(name="Vízjel", subject="Vízjel", creator_id=me.id)
+    db.session.add(group)
+    db.session.flush()
+    db.session.add(GroupMember(group_id=group.id, user_id=me.id, joined_at=joined))
+    posts = [
+        Post(title=f"p{i}", content="c", group_id=group.id, author_id=other.id,
+             created_at=joined + timedelta(hours=i + 1))
+        for i in range(post_count)
+    ]
+    db.session.add_all(posts)
+    db.session.commit()
+    return group, posts
+
+
+def unread(client, headers, group):
+    return client.get("/groups/unread-counts", headers=headers).get_json()["unread_counts"][str(group.id)]
+
+
+def test_watermark_keeps_counts_of_existing_post_views(client, make_user, auth_header, watermark_mode):
+    me, other = make_user(), make_user()
+    group, posts = seed(me, other)
+    # Régi (postview módban írt) adatok: a 2. és 4. poszt olvasott
+    db.session.add_all([PostView(user_id=me.id, post_id=posts[1].id),
+                        PostView(user_id=me.id, post_id=posts[3].id)])
+    db.session.commit()
+
+    assert unread(client, auth_header(me.id), group) == 3
+
+
+def test_mark_all_read_is_a_watermark_upsert(client, make_user, auth_header, watermark_mode):
+    me, other = make_user(), make_user()
+    group, posts = seed(me, other)
+    db.session.add(PostView(user_id=me.id, post_id=posts[0].id))
+    db.session.commit()
+    headers = auth_header(me.id)
+
+    res = client.post(f"/groups/{group.id}/mark-posts-read", headers=headers)
+
+    assert res.status_code == 200
+    assert res.get_json()["marked_count"] == 4
+    assert db.session.get(GroupReadState, (me.id, group.id)) is not None
+    assert PostView.query.filter_by(user_id=me.id).count() == 0
+    assert unread(client, headers, group) == 0
+
+    db.session.add(Post(title="új", content="c", group_id=group.id, author_id=other.id,
+                        created_at=datetime.utcnow() + timedelta(minutes=1)))
+    db.session.commit()
+    assert unread(client, headers, group) == 1
+
+    again = client.post(f"/groups/{group.id}/mark-posts-read", headers=headers)
+    assert again.get_json()["marked_count"] == 1
+
+
+def test_compact_post_views_preserves_counts(client, make_user, auth_header, watermark_mode):
+    me, other = make_user(), make_user()
+    group, posts = seed(me, other)
+    # Folytonosan olvasott az első három, a negyedik olvasatlan, az ötödik olvasott
+    db.session.add_all([PostView(user_id=me.id, post_id=p.id) for p in (posts[0], posts[1], posts[2], posts[4])])
+    db.session.commit()
+    headers = auth_header(me.id)
+    assert unread(client, headers, group) == 1
+
+    watermarks, deleted = read_tracking.compact_post_views()
+
+    assert (watermarks, deleted) == (1, 3)
+    assert db.session.get(GroupReadState, (me.id, group.id)).last_read_at == posts[2].created_at
+    assert unread(client, headers, group) == 1
+
+
+def test_post_committed_after_the_mark_with_an_earlier_timestamp_stays_unread(
+        client, make_user, auth_header, watermark_mode):
+    me, other = make_user(), make_user()
+    group, posts = seed(me, other, post_count=2)
+    headers = auth_header(me.id)
+
+    assert client.post(f"/groups/{group.id}/mark-posts-read", headers=headers).status_code == 200
+    assert db.session.get(GroupReadState, (me.id, group.id)).last_read_at == posts[-1].created_at
+
+    # created_at a jelölés előtti (a kérés elején kapta), de csak a jelölés után commitolódott
+    late = Post(title="késő", content="c", group_id=group.id, author_id=other.id,
+                created_at=posts[-1].created_at + timedelta(minutes=5))
+    db.session.add(late)
+    db.session.commit()
+    assert late.created_at < datetime.utcnow()
+
+    assert unread(client, headers, group) == 1
+    assert client.post(f"/groups/{group.id}/mark-posts-read", headers=headers).get_json()["marked_count"] == 1
+    assert unread(client, headers, group) == 0
@@ -0,0 +1,71 @@
+import os
+import runpy
+import threading
+
+import app as app_module
+from app import create_app
+
+
+def thread_names():
+    return {t.name for t in threading.enumerate()}
+
+
+def test_preloaded_app_starts_background_threads_only_after_fork(monkeypatch):
+    monkeypatch.setenv("EMAIL_OUTBOX_WORKER", "thread")
+    monkeypatch.setenv("NOTIFICATION_FANOUT", "thread")
+    # A naplózás queue listenere folyamatonként egyszer indul, és fork után újraindul
+    # (logging_setup.py): ha ez az első app a folyamatban, ne számítson bele
+    create_app(start_background=False)
+    before = thread_names()
+
+    # gunicorn --preload master (wsgi.py): nem indulhat szál, a fork nem örökölné
+    app = create_app(start_background=False)
+    app.config.update(EMAIL_OUTBOX_WORKER="thread", NOTIFICATION_FANOUT="thread")
+    assert thread_names() - before == set()
+
+    # post_worker_init a workerben
+    app_module.start_background(app)
+    try:
+        assert {"email-outbox", "notification-fanout"} <= thread_names()
+        with app.app_context():
+            with app.extensions["broker"].subscribe(["group:1"]) as subscription:
+                app.extensions["broker"].publish("group:1", "post", {"id": 1})
+                assert subscription.get(timeout=1)["data"] == {"id": 1}
+    finally:
+        app_module.stop_background(app)
+
+    assert not {"email-outbox", "notification-fanout"} & (thread_names() - before)
+
+
+
+def load_gunicorn_conf(monkeypatch, tmp_path, **env):
+    # A konfiguráció maga is ír a környezetbe: ezeket előre beállítjuk, hogy a teszt végén visszaálljanak
+    for name in ("SERVER_WORKERS", "STREAM_MAX_CONNECTIONS"):
+        monkeypatch.setenv(name, "")
+    monkeypatch.setenv("METRICS_DIR", str(tmp_path))
+    for name in ("WEB_CONCURRENCY", "MEMBERSHIP_CACHE_BACKEND", "BROKER_BACKEND",
+                 "GUNICORN_THREADS", "GUNICORN_REQUEST_THREADS", "GUNICORN_STREAM_THREADS"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(os.path.join(os.path.dirname(app_module.__file__), "gunicorn.conf.py"))
+
+
+def test_gunicorn_runs_one_worker_without_redis(monkeypatch, tmp_path):
+    conf = load_gunicorn_conf(monkeypatch, tmp_path)
+
+    assert conf["workers"] == 1
+    assert conf["threads"] == 8 + 64
+    assert os.environ["SERVER_WORKERS"] == "1"
+    assert os.environ["STREAM_MAX_CONNECTIONS"] == "64"
+
+
+def test_gunicorn_scales_workers_with_redis_and_skips_stream_threads_without_broker(monkeypatch, tmp_path):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: {0, 1}, raising=False)
+    conf = load_gunicorn_conf(monkeypatch, tmp_path, MEMBERSHIP_CACHE_BACKEND="redis", BROKER_BACKEND="redis")
+    assert conf["workers"] == 5
+    assert conf["threads"] == 8 + 64
+
+    conf = load_gunicorn_conf(monkeypatch, tmp_path, WEB_CONCURRENCY="3")
+    assert conf["workers"] == 3
+    assert conf["threads"] == 8
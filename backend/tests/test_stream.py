@@ -0,0 +1,244 @@
+import http.client
+import json
+import threading
+import time
+from datetime import datetime
+
+import queue
+
+import pytest
+from werkzeug.serving import make_server
+
+import sse
+from auth import create_jwt_token
+from broker import Broker, BrokerFull, RedisBackend, group_channel, init_broker, user_channel
+from models import db, Group, GroupMember, User
+
+
+def test_broker_delivers_only_to_channel_subscribers():
+    broker = Broker()
+    a = broker.subscribe([group_channel(1)])
+    b = broker.subscribe([group_channel(2)])
+
+    broker.publish(group_channel(1), "post", {"post_id": 7})
+
+    assert a.get(timeout=0.1)["data"] == {"post_id": 7}
+    assert b.get(timeout=0.01) is None
+    a.close()
+    b.close()
+    assert broker.subscriber_count() == 0
+
+
+def test_slow_subscriber_is_marked_lagged_instead_of_blocking():
+    broker = Broker()
+    sub = broker.subscribe([group_channel(1)], maxsize=2)
+    for i in range(5):
+        broker.publish(group_channel(1), "post", {"i": i})
+
+    assert sub.lagged
+    events = sse.event_stream(sub, user_id=1, unread_counts={}, heartbeat=0.01, max_seconds=1)
+    assert next(events).startswith("retry:")
+    assert next(events).startswith("event: unread-counts")
+    assert next(events) == "event: resync\ndata: {}\n\n"
+    events.close()
+    assert broker.subscriber_count() == 0
+
+
+def test_stream_follows_membership_and_emits_unread_delta():
+    broker = Broker()
+    sub = broker.subscribe([user_channel(1)])
+    events = sse.event_stream(sub, user_id=1, unread_counts={}, heartbeat=0.01, max_seconds=5)
+    next(events), next(events)
+
+    broker.publish(user_channel(1), "membership", {"group_id": 9, "joined": True})
+    assert "event: membership" in next(events)
+    broker.publish(group_channel(9), "post", {"group_id": 9, "post_id": 1, "author_id": 2})
+    assert "event: post" in next(events)
+    assert next(events) == 'event: unread-delta\ndata: {"group_id": 9, "delta": 1}\n\n'
+    assert next(events) == ": ping\n\n"
+    events.close()
+
+
+class FakeRedis:
+    """Redis PUBLISH/SUBSCRIBE minimális, folyamaton belüli utánzata."""
+
+    def __init__(self):
+        self.subscriptions = []
+
+    def publish(self, channel, message):
+        for ch, q in self.subscriptions:
+            if ch == channel:
+                q.put({"type": "message", "data": message})
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return FakePubSub(self)
+
+
+class FakePubSub:
+    def __init__(self, redis):
+        self.redis = redis
+        self.queue = queue.Queue()
+
+    def subscribe(self, channel):
+        self.redis.subscriptions.append((channel, self.queue))
+
+    def listen(self):
+        while True:
+            message = self.queue.get()
+            if message is None:
+                return
+            yield message
+
+    def close(self):
+        self.queue.put(None)
+
+
+def test_redis_backend_delivers_across_workers():
+    redis = FakeRedis()
+    worker_a = Broker(RedisBackend(redis))
+    worker_b = Broker(RedisBackend(redis))
+    sub = worker_b.subscribe([group_channel(3)])
+
+    worker_a.publish(group_channel(3), "comment", {"comment_id": 11})
+
+    event = sub.get(timeout=2)
+    assert event["type"] == "comment"
+    assert event["data"] == {"comment_id": 11}
+    worker_a.close()
+    worker_b.close()
+
+
+def test_stream_requires_token(client):
+    assert client.get("/stream").status_code == 401
+    assert client.get("/stream?token=rossz").status_code == 401
+
+
+def test_subscriptions_are_capped_per_worker():
+    broker = Broker(max_subscriptions=2)
+    a = broker.subscribe([group_channel(1)])
+    broker.subscribe([group_channel(2)])
+
+    with pytest.raises(BrokerFull):
+        broker.subscribe([group_channel(3)])
+
+    a.close()
+    a.close()
+    broker.subscribe([group_channel(3)])
+    with pytest.raises(BrokerFull):
+        broker.subscribe([group_channel(4)])
+
+
+def test_stream_answers_503_when_all_stream_slots_are_taken(app, client, make_user, auth_header):
+    user = make_user()
+    app.extensions["broker"].max_subscriptions = 1
+    held = app.extensions["broker"].subscribe([user_channel(999)])
+
+    res = client.get("/stream", headers=auth_header(user.id))
+
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "5"
+    held.close()
+
+
+def test_memory_broker_disables_stream_with_multiple_workers(app, client, make_user, auth_header):
+    user = make_user()
+    app.config["SERVER_WORKERS"] = 3
+    init_broker(app)
+
+    res = client.get("/stream", headers=auth_header(user.id))
+
+    assert res.status_code == 503
+
+
+# --- Harness: sok párhuzamos stream egy valódi, szálas helyi szerveren ---
+
+class StreamReader(threading.Thread):
+    def __init__(self, port, token):
+        super().__init__(daemon=True)
+        self.port = port
+        self.token = token
+        self.events = []
+        self.connected = threading.Event()
+
+    def run(self):
+        conn = http.client.HTTPConnection("127.0.0.1", self.port, timeout=10)
+        conn.request("GET", f"/stream?token={self.token}")
+        response = conn.getresponse()
+        event_type = None
+        try:
+            while True:
+                line = response.readline().decode("utf-8")
+                if not line:
+                    return
+                line = line.rstrip("\n")
+                if line.startswith("event: "):
+                    event_type = line[len("event: "):]
+                elif line.startswith("data: "):
+                    self.events.append((event_type, json.loads(line[len("data: "):])))
+                    if event_type == "unread-counts":
+                        self.connected.set()
+        except OSError:
+            pass
+        finally:
+            conn.close()
+
+    def types(self):
+        return [t for t, _ in self.events]
+
+
+@pytest.fixture
+def live_server(app):
+    app.config["STREAM_HEARTBEAT"] = 0.2
+    app.config["STREAM_MAX_SECONDS"] = 3
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_port
+    server.shutdown()
+
+
+def test_many_concurrent_streams_receive_group_activity(app, client, live_server, make_user, auth_header):
+    n_clients = 40
+    author = make_user()
+    db.session.execute(db.insert(User), [
+        {"email": f"nezo{i}@inf.elte.hu", "secondary_email": f"nezo{i}@gmail.com", "name": f"Néző {i}",
+         "password_hash": "x", "major": "Informatika"}
+        for i in range(n_clients)
+    ])
+    group = Group(name="Élő", subject="Élő", creator_id=author.id)
+    db.session.add(group)
+    db.session.flush()
+    viewer_ids = [uid for (uid,) in db.session.query(User.id).filter(User.id != author.id)]
+    db.session.execute(db.insert(GroupMember), [
+        {"group_id": group.id, "user_id": uid, "joined_at": datetime(2026, 1, 1)}
+        for uid in [author.id, *viewer_ids]
+    ])
+    db.session.commit()
+    group_id, author_id = group.id, author.id
+
+    readers = [StreamReader(live_server, create_jwt_token(uid)) for uid in viewer_ids]
+    for reader in readers:
+        reader.start()
+    for reader in readers:
+        assert reader.connected.wait(10)
+    assert app.extensions["broker"].subscriber_count() == n_clients
+
+    started = time.perf_counter()
+    res = client.post(f"/groups/{group_id}/posts", json={"title": "Élő", "content": "adás"},
+                      headers=auth_header(author_id))
+    assert res.status_code == 201
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and not all("unread-delta" in r.types() for r in readers):
+        time.sleep(0.01)
+    fan_out_latency = time.perf_counter() - started
+
+    for reader in readers:
+        assert "post" in reader.types()
+        assert ("unread-delta", {"group_id": group_id, "delta": 1}) in reader.events
+    print(f"\n{n_clients} stream, kézbesítés: {fan_out_latency * 1000:.1f} ms")
+
+    # MAX_SECONDS után a szerver zár, a feliratkozások felszabadulnak
+    for reader in readers:
+        reader.join(10)
+    assert app.extensions["broker"].subscriber_count() == 0
@@ -0,0 +1,193 @@
+import threading
+import time
+
+import pytest
+
+import subject_cache
+from subject_cache import SubjectCache, SubjectFetchError, parse_tanrend_rows
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeResponse:
+    def __init__(self, rows, status_code=200):
+        self.rows = rows
+        self.status_code = status_code
+
+    def json(self):
+        return self.rows
+
+
+ROWS = [
+    ["H 10:00", "IP-18AB1E-1 (magyar)", "Algoritmusok és adatszerkezetek I."],
+    ["K 12:00", "IP-18AB1G-2", "Algoritmusok és adatszerkezetek I."],
+    ["K 12:00", "IP-18AB1E-2", "Algoritmusok és adatszerkezetek I."],
+    ["rövid sor"],
+]
+
+
+def test_parse_tanrend_rows_dedupes_codes():
+    assert parse_tanrend_rows(ROWS) == [
+        {"code": "IP-18AB1E", "name": "Algoritmusok és adatszerkezetek I."},
+        {"code": "IP-18AB1G", "name": "Algoritmusok és adatszerkezetek I."},
+    ]
+
+
+def test_repeat_search_is_served_from_cache(client, monkeypatch, make_user, auth_header):
+    calls = []
+
+    def fake_post(url, json, timeout):
+        calls.append(json)
+        return FakeResponse(ROWS)
+
+    monkeypatch.setattr(subject_cache.http_client, "post", fake_post)
+    headers = auth_header(make_user().id)
+
+    first = client.get("/subjects/search?q=IP-18AB1&year=2025-2026-2", headers=headers)
+    again = client.get("/subjects/search?q=  ip-18ab1 &year=2025-2026-2", headers=headers)
+    other_year = client.get("/subjects/search?q=IP-18AB1&year=2025-2026-1", headers=headers)
+
+    assert first.status_code == 200
+    assert [s["code"] for s in first.get_json()] == ["IP-18AB1E", "IP-18AB1G"]
+    assert again.get_json() == first.get_json()
+    assert other_year.status_code == 200
+    assert [c["year"] for c in calls] == ["2025-2026-2", "2025-2026-1"]
+
+
+def test_upstream_error_returns_502_and_is_not_cached(client, monkeypatch, make_user, auth_header):
+    responses = [FakeResponse([], status_code=500), FakeResponse(ROWS)]
+    monkeypatch.setattr(subject_cache.http_client, "post", lambda *a, **kw: responses.pop(0))
+    headers = auth_header(make_user().id)
+
+    assert client.get("/subjects/search?q=IP", headers=headers).status_code == 502
+    assert client.get("/subjects/search?q=IP", headers=headers).status_code == 200
+
+
+class HtmlResponse(FakeResponse):
+    def json(self):
+        raise ValueError("Expecting value: line 1 column 1 (char 0)")
+
+
+def test_non_json_response_is_a_fetch_error(client, monkeypatch, make_user, auth_header):
+    monkeypatch.setattr(subject_cache.http_client, "post", lambda *a, **kw: HtmlResponse(None))
+
+    assert client.get("/subjects/search?q=IP", headers=auth_header(make_user().id)).status_code == 502
+    with pytest.raises(SubjectFetchError):
+        subject_cache.fetch_subjects("http://tanrend", "2025-2026-2", "IP")
+
+
+def test_stale_entry_is_served_while_refreshing():
+    clock = FakeClock()
+    release = threading.Event()
+    calls = []
+
+    def fetch(year, query):
+        calls.append(query)
+        if len(calls) > 1:
+            release.wait(5)
+        return [{"code": f"v{len(calls)}", "name": query}]
+
+    cache = SubjectCache(fetch, ttl=10, stale_ttl=100, clock=clock)
+    assert cache.search("2025-2026-2", "ip")[0]["code"] == "v1"
+
+    clock.now = 50
+    # Elavult: azonnal a régi érték jön, a frissítés a háttérben fut (egyszer)
+    assert cache.search("2025-2026-2", "ip")[0]["code"] == "v1"
+    assert cache.search("2025-2026-2", "ip")[0]["code"] == "v1"
+    release.set()
+    cache.drain(timeout=5)
+
+    assert calls == ["ip", "ip"]
+    assert cache.search("2025-2026-2", "ip")[0]["code"] == "v2"
+    assert cache.stats == {"hits": 1, "stale": 2, "misses": 1}
+
+
+def test_failed_refresh_keeps_stale_entry_and_expired_entry_refetches():
+    clock = FakeClock()
+    results = [
+        [{"code": "A", "name": "a"}],
+        SubjectFetchError("le"),
+        [{"code": "B", "name": "b"}],
+        [{"code": "C", "name": "c"}],
+    ]
+
+    def fetch(year, query):
+        result = results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    cache = SubjectCache(fetch, ttl=10, stale_ttl=20, clock=clock)
+    cache.search("y", "q")
+
+    clock.now = 15
+    assert cache.search("y", "q")[0]["code"] == "A"
+    cache.drain(timeout=5)
+    assert cache.search("y", "q")[0]["code"] == "A"
+    cache.drain(timeout=5)
+    assert cache.search("y", "q")[0]["code"] == "B"
+
+    # ttl + stale_ttl után már nincs mit kiszolgálni: szinkron lekérés
+    clock.now = 100
+    assert cache.search("y", "q")[0]["code"] == "C"
+
+
+def test_lru_bound():
+    cache = SubjectCache(lambda year, query: [], maxsize=2)
+    for q in ("a", "b", "c"):
+        cache.search("y", q)
+    assert len(cache._entries) == 2
+
+
+def test_misses_fetch_on_the_calling_thread_and_share_one_fetch_per_key():
+    started = threading.Barrier(5, timeout=5)
+    release = threading.Event()
+    fetch_threads = []
+
+    def fetch(year, query):
+        fetch_threads.append((query, threading.current_thread().name))
+        if query != "közös":
+            # Négy különböző kulcs egyszerre tölt: nem állnak sorba a 2 szálas pool mögött
+            started.wait()
+        release.wait(5)
+        return [{"code": query, "name": query}]
+
+    cache = SubjectCache(fetch, max_workers=2)
+    claim, claims = cache._claim, []
+
+    def counting_claim(key):
+        result = claim(key)
+        claims.append(key)
+        return result
+
+    cache._claim = counting_claim
+    results = {}
+
+    def search(name, query):
+        results[name] = cache.search("y", query)
+
+    threads = [threading.Thread(target=search, args=(f"k{i}", f"k{i}"), name=f"kérés-{i}") for i in range(4)]
+    threads += [threading.Thread(target=search, args=(f"közös{i}", "közös"), name=f"közös-{i}") for i in range(3)]
+    for t in threads[:4]:
+        t.start()
+    started.wait()
+    for t in threads[4:]:
+        t.start()
+    # Mind a hét kérés bent van (a közös kulcsra egy tölt, kettő a Future-jére vár)
+    deadline = time.monotonic() + 5
+    while len(claims) < 7 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join(5)
+
+    assert sorted(q for q, _ in fetch_threads) == ["k0", "k1", "k2", "k3", "közös"]
+    assert all(not name.startswith("subject-refresh") for _, name in fetch_threads)
+    assert results["közös0"] == results["közös1"] == results["közös2"] == [{"code": "közös", "name": "közös"}]
+    assert cache.stats["misses"] == 7
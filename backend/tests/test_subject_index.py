@@ -0,0 +1,85 @@
+import json
+import time
+
+import subject_cache
+import subject_index
+from models import Subject
+from subject_index import SubjectIndex
+
+SUBJECTS = [
+    {"code": "IP-18AB1E", "name": "Algoritmusok és adatszerkezetek I."},
+    {"code": "IP-18AB2E", "name": "Algoritmusok és adatszerkezetek II."},
+    {"code": "IP-18ANALE", "name": "Analízis"},
+    {"code": "IP-18KVSZE", "name": "Valószínűségszámítás és statisztika"},
+]
+
+
+def test_index_matches_code_prefix_then_name():
+    index = SubjectIndex(SUBJECTS)
+
+    assert [s["code"] for s in index.search("ip-18ab")] == ["IP-18AB1E", "IP-18AB2E"]
+    # Név részszöveg (trigram) és szó-prefix (rövid keresés)
+    assert [s["code"] for s in index.search("szerkezetek ii")] == ["IP-18AB2E"]
+    assert [s["code"] for s in index.search("an")] == ["IP-18ANALE"]
+    assert [s["code"] for s in index.search("statisztika")] == ["IP-18KVSZE"]
+    assert index.search("nincs ilyen") == []
+    assert len(index.search("ip", limit=2)) == 2
+
+
+def test_read_dump_formats(tmp_path):
+    objects = tmp_path / "objects.json"
+    objects.write_text(json.dumps(SUBJECTS), encoding="utf-8")
+    raw_rows = tmp_path / "rows.json"
+    raw_rows.write_text(json.dumps([["H 10:00", "IP-18AB1E-1 (magyar)", "Algoritmusok"]]), encoding="utf-8")
+    with_header = tmp_path / "subjects.csv"
+    with_header.write_text("code,name\nIP-18ANALE,Analízis\nIP-18ANALE,Analízis\n", encoding="utf-8")
+
+    assert subject_index.read_dump(str(objects)) == SUBJECTS
+    assert subject_index.read_dump(str(raw_rows)) == [{"code": "IP-18AB1E", "name": "Algoritmusok"}]
+    assert subject_index.read_dump(str(with_header)) == [{"code": "IP-18ANALE", "name": "Analízis"}]
+
+
+def test_imported_snapshot_serves_search_without_network(app, client, monkeypatch, make_user, auth_header):
+    def no_network(*args, **kwargs):
+        raise AssertionError("a pillanatképes félév nem hívhatja a tanrend API-t")
+
+    monkeypatch.setattr(subject_cache.http_client, "post", no_network)
+    headers = auth_header(make_user().id)
+
+    assert subject_index.import_snapshot("2025-2026-2", SUBJECTS) == 4
+    # Újraimport: a félév pillanatképe lecserélődik, nem duplikálódik
+    subject_index.import_snapshot("2025-2026-2", SUBJECTS[:3])
+    assert Subject.query.filter_by(year="2025-2026-2").count() == 3
+    assert app.extensions["subject_catalog"].load_from_db() == 3
+
+    res = client.get("/subjects/search?q=analízis&year=2025-2026-2", headers=headers)
+    assert res.status_code == 200
+    assert res.get_json() == [{"code": "IP-18ANALE", "name": "Analízis"}]
+
+
+def test_unknown_year_falls_back_to_tanrend(app, client, monkeypatch, make_user, auth_header):
+    class FakeResponse:
+        status_code = 200
+
+        def json(self):
+            return [["H 10:00", "IP-18AB1E-1", "Algoritmusok"]]
+
+    monkeypatch.setattr(subject_cache.http_client, "post", lambda *a, **kw: FakeResponse())
+    app.extensions["subject_catalog"].set("2025-2026-2", SUBJECTS)
+
+    res = client.get("/subjects/search?q=IP&year=2024-2025-1", headers=auth_header(make_user().id))
+    assert res.get_json() == [{"code": "IP-18AB1E", "name": "Algoritmusok"}]
+
+
+def test_search_is_fast_on_full_semester():
+    subjects = [{"code": f"IP-{i:05d}", "name": f"Tárgy {i} szeminárium"} for i in range(10_000)]
+    index = SubjectIndex(subjects)
+
+    started = time.perf_counter()
+    for _ in range(200):
+        index.search("ip-0999")
+        index.search("9999 szem")
+    elapsed = time.perf_counter() - started
+
+    assert [s["code"] for s in index.search("9999 szem")] == ["IP-09999"]
+    assert elapsed < 1.0
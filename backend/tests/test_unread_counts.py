@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models import db, Group, GroupMember, Post, PostView
+
+
+def seed_groups(user_id, other_id, group_count=10, posts_per_group=30):
+    joined = datetime(2026, 1, 1)
+    groups = []
+    for g in range(group_count):
+        group = Group(name=f"Olvasatlan #{g}", subject="Olvasatlan", creator_id=user_id)
+        db.session.add(group)
+        db.session.flush()
+        db.session.add(GroupMember(group_id=group.id, user_id=user_id, joined_at=joined))
+        groups.append(group)
+
+    for group in groups:
+        db.session.execute(db.insert(Post), [
+            {
+                "title": "p", "content": "c", "group_id": group.id, "author_id": other_id,
+                "created_at": joined + timedelta(minutes=i),
+            }
+            for i in range(posts_per_group)
+        ])
+    db.session.commit()
+    return groups
+
+
+def add_view_history(user_id, author_id, count):
+    """A user korábbi olvasási előzményei egy olyan csoportban, aminek már nem tagja."""
+    group = Group(name=f"Régi csoport {count}", subject="Régi", creator_id=author_id)
+    db.session.add(group)
+    db.session.flush()
+    post_ids = db.session.execute(db.insert(Post).returning(Post.id), [
+        {"title": "r", "content": "c", "group_id": group.id, "author_id": author_id}
+        for _ in range(count)
+    ]).scalars().all()
+    db.session.execute(db.insert(PostView), [
+        {"user_id": user_id, "post_id": post_id, "viewed_at": datetime(2025, 1, 1)}
+        for post_id in post_ids
+    ])
+    db.session.commit()
+
+
+def test_unread_counts_values(client, make_user, auth_header):
+    me = make_user()
+    other = make_user()
+    joined = datetime(2026, 1, 1)
+
+    group = Group(name="Számláló", subject="Számláló", creator_id=me.id)
+    empty = Group(name="Üres", subject="Számláló", creator_id=me.id)
+    db.session.add_all([group, empty])
+    db.session.flush()
+    db.session.add_all([
+        GroupMember(group_id=group.id, user_id=me.id, joined_at=joined),
+        GroupMember(group_id=empty.id, user_id=me.id, joined_at=joined),
+    ])
+    before_join = Post(title="régi", content="c", group_id=group.id, author_id=other.id,
+                       created_at=joined - timedelta(days=1))
+    own = Post(title="saját", content="c", group_id=group.id, author_id=me.id,
+               created_at=joined + timedelta(hours=1))
+    deleted = Post(title="törölt", content="c", group_id=group.id, author_id=other.id,
+                   created_at=joined + timedelta(hours=1), deleted_at=joined + timedelta(hours=2))
+    seen = Post(title="látott", content="c", group_id=group.id, author_id=other.id,
+                created_at=joined + timedelta(hours=1))
+    unseen = Post(title="új", content="c", group_id=group.id, author_id=other.id,
+                  created_at=joined + timedelta(hours=1))
+    db.session.add_all([before_join, own, deleted, seen, unseen])
+    db.session.flush()
+    db.session.add(PostView(user_id=me.id, post_id=seen.id))
+    db.session.commit()
+
+    res = client.get("/groups/unread-counts", headers=auth_header(me.id))
+
+    assert res.status_code == 200
+    assert res.get_json()["unread_counts"] == {str(group.id): 1, str(empty.id): 0}
+
+
+@pytest.mark.query_budget(1)
+def test_unread_counts_flat_as_view_history_grows(client, make_user, auth_header, count_queries):
+    me = make_user()
+    other = make_user()
+    seed_groups(me.id, other.id)
+    headers = auth_header(me.id)
+
+    queries = {}
+    for history in (100, 20_000):
+        add_view_history(me.id, other.id, history)
+        with count_queries() as stats:
+            for _ in range(5):
+                res = client.get("/groups/unread-counts", headers=headers)
+        assert res.status_code == 200
+        assert set(res.get_json()["unread_counts"].values()) == {30}
+        queries[history] = stats["count"]
+
+    # Egyetlen aggregáló utasítás, az olvasási előzmények számától függetlenül (a keret túllépése 500)
+    assert queries[100] == queries[20_000] == 5
@@ -0,0 +1,129 @@
+import hashlib
+import io
+import os
+import tracemalloc
+from datetime import datetime
+
+import pytest
+from werkzeug.test import EnvironBuilder
+
+from models import db, Group, GroupMember, Post, PostAttachment
+
+
+@pytest.fixture
+def upload_dir(app, tmp_path):
+    app.config["UPLOAD_FOLDER"] = str(tmp_path)
+    return tmp_path
+
+
+def seed_post(author):
+    group = Group(name="Feltöltés", subject="Feltöltés", creator_id=author.id)
+    db.session.add(group)
+    db.session.flush()
+    db.session.add(GroupMember(group_id=group.id, user_id=author.id, joined_at=datetime(2026, 1, 1)))
+    post = Post(title="Jegyzet", content="pdf", group_id=group.id, author_id=author.id)
+    db.session.add(post)
+    db.session.commit()
+    return group.id, post.id
+
+
+def blob_files(upload_dir):
+    return [p for p in (upload_dir / "blobs").rglob("*") if p.is_file()]
+
+
+def leftovers(upload_dir):
+    tmp = upload_dir / ".tmp"
+    return list(tmp.iterdir()) if tmp.exists() else []
+
+
+def test_upload_is_hashed_and_renamed_into_place(app, client, make_user, auth_header, upload_dir):
+    author = make_user()
+    _, post_id = seed_post(author)
+    payload = os.urandom(300 * 1024)
+
+    res = client.post(f"/posts/{post_id}/attachments", headers=auth_header(author.id),
+                      data={"file": (io.BytesIO(payload), "../jegyzet 1.pdf")},
+                      content_type="multipart/form-data")
+
+    assert res.status_code == 201
+    digest = hashlib.sha256(payload).hexdigest()
+    assert res.get_json()["attachment"]["url"] == f"/uploads/blobs/{digest[:2]}/{digest}.pdf"
+
+    stored = upload_dir / "blobs" / digest[:2] / digest
+    assert stored.read_bytes() == payload
+    assert leftovers(upload_dir) == []
+    assert PostAttachment.query.one().filename == "jegyzet_1.pdf"
+
+
+def test_multiple_files_in_create_post(app, client, make_user, auth_header, upload_dir):
+    author = make_user()
+    group_id, _ = seed_post(author)
+
+    res = client.post(f"/groups/{group_id}/posts", headers=auth_header(author.id),
+                      data={"title": "Két fájl", "content": "...",
+                            "files": [(io.BytesIO(b"a" * 10), "a.txt"), (io.BytesIO(b"b" * 10), "a.txt")]},
+                      content_type="multipart/form-data")
+
+    assert res.status_code == 201
+    assert len(blob_files(upload_dir)) == 2
+    assert leftovers(upload_dir) == []
+
+
+def test_oversized_file_is_rejected_while_streaming(app, client, make_user, auth_header, upload_dir):
+    app.config["UPLOAD_MAX_FILE_SIZE"] = 64 * 1024
+    author = make_user()
+    _, post_id = seed_post(author)
+
+    res = client.post(f"/posts/{post_id}/attachments", headers=auth_header(author.id),
+                      data={"file": (io.BytesIO(b"x" * (256 * 1024)), "nagy.bin")},
+                      content_type="multipart/form-data")
+
+    assert res.status_code == 413
+    assert not (upload_dir / "blobs").exists()
+    assert leftovers(upload_dir) == []
+    assert PostAttachment.query.count() == 0
+
+
+def test_large_upload_memory_does_not_grow_with_file_size(app, client, make_user, auth_header, upload_dir):
+    size = 8 * 1024 * 1024
+    app.config["UPLOAD_MAX_FILE_SIZE"] = size
+    app.config["MAX_CONTENT_LENGTH"] = size + 64 * 1024
+    author = make_user()
+    _, post_id = seed_post(author)
+    headers = auth_header(author.id)
+
+    # A kérés törzse maga is memóriában van (a test client így építi fel), ezért
+    # csak a kiszolgálás közbeni csúcsot mérjük, a törzs előállítása után
+    builder = EnvironBuilder(path=f"/posts/{post_id}/attachments", method="POST", headers=headers,
+                             data={"file": (io.BytesIO(b"z" * size), "nagy.bin")},
+                             content_type="multipart/form-data")
+    environ = builder.get_environ()
+
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        res = client.open(environ)
+        peak = tracemalloc.get_traced_memory()[1] - baseline
+    finally:
+        tracemalloc.stop()
+
+    assert res.status_code == 201
+    digest = hashlib.sha256(b"z" * size).hexdigest()
+    assert (upload_dir / "blobs" / digest[:2] / digest).stat().st_size == size
+    assert peak < size / 4
+
+
+def test_delete_removes_file(app, client, make_user, auth_header, upload_dir):
+    author = make_user()
+    _, post_id = seed_post(author)
+    res = client.post(f"/posts/{post_id}/attachments", headers=auth_header(author.id),
+                      data={"file": (io.BytesIO(b"torlendo"), "t.txt")},
+                      content_type="multipart/form-data")
+    attachment_id = res.get_json()["attachment"]["id"]
+    assert len(blob_files(upload_dir)) == 1
+
+    res = client.delete(f"/attachments/{attachment_id}", headers=auth_header(author.id))
+
+    assert res.status_code == 200
+    assert blob_files(upload_dir) == []
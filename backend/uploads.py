@@ -0,0 +1,162 @@
+"""Közös feltöltési szolgáltatás: egy menetben lemezre írás, SHA-256, méretkorlát.
+
+A Werkzeug multipart parser a fájlrészeket egy általa kért streambe írja
+(Request._get_file_stream). Az UploadRequest ide egy HashingTempFile-t ad:
+ez fix méretű darabokban, közvetlenül az UPLOAD_FOLDER/.tmp alá ír, közben
+számolja a SHA-256-ot és a méretet, és UPLOAD_MAX_FILE_SIZE átlépésekor
+azonnal 413-mal megszakítja a feltöltést. A memóriahasználat így a fájl
+méretétől független, és nincs második másolás.
+
+A végleges helyre (blobs.store) a kész ideiglenes fájl os.replace-szel,
+atomikusan kerül, így félig írt fájl sosem látszik a kiszolgált útvonalon.
+A fel nem használt ideiglenes fájlok a kérés végén (close) törlődnek.
+"""
+import hashlib
+import os
+import tempfile
+
+from flask import Request, current_app  # pyright: ignore[reportMissingImports]
+from werkzeug.exceptions import RequestEntityTooLarge  # pyright: ignore[reportMissingImports]
+from werkzeug.utils import secure_filename  # pyright: ignore[reportMissingImports]
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+
+
+class StoredFile:
+    def __init__(self, path, url, filename, mime_type, sha256, size, blob_id=None,
+                 thumbnail_url=None, preview_url=None):
+        self.path = path
+        self.url = url
+        self.filename = filename
+        self.mime_type = mime_type
+        self.sha256 = sha256
+        self.size = size
+        self.blob_id = blob_id
+        self.thumbnail_url = thumbnail_url
+        self.preview_url = preview_url
+
+
+class HashingTempFile:
+    """Írás közben hash-elő és méretet ellenőrző ideiglenes fájl (file-szerű objektum)."""
+
+    def __init__(self, directory, max_size):
+        os.makedirs(directory, exist_ok=True)
+        fd, self.path = tempfile.mkstemp(dir=directory, prefix="upload-")
+        self._file = os.fdopen(fd, "w+b")
+        self._hash = hashlib.sha256()
+        self.max_size = max_size
+        self.size = 0
+        self.committed = False
+
+    def write(self, data):
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise RequestEntityTooLarge(f"A fájl nagyobb, mint {self.max_size} bájt")
+        self._hash.update(data)
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._hash.hexdigest()
+
+    def commit_to(self, final_path):
+        """Az ideiglenes fájl atomikus áthelyezése a végleges helyére."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        os.replace(self.path, final_path)
+        self.committed = True
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+        if not self.committed and os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __getattr__(self, name):
+        # read/seek/tell/flush stb. a FileStorage felől
+        return getattr(self._file, name)
+
+
+class UploadRequest(Request):
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        spool = HashingTempFile(temp_dir(), max_file_size())
+        # Félbeszakadt (pl. 413) feltöltésnél a fájl nem kerül a request.files-ba,
+        # ezért magunk tartjuk nyilván, hogy a kérés végén törölhessük
+        self.__dict__.setdefault("_upload_spools", []).append(spool)
+        return spool
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            for spool in self.__dict__.pop("_upload_spools", ()):
+                spool.close()
+
+
+def upload_root():
+    return current_app.config["UPLOAD_FOLDER"]
+
+
+def temp_dir():
+    return os.path.join(upload_root(), ".tmp")
+
+
+def max_file_size():
+    return int(current_app.config.get("UPLOAD_MAX_FILE_SIZE", DEFAULT_MAX_FILE_SIZE))
+
+
+def _copy_to_temp(stream):
+    """Tartalék út, ha a stream nem a mi HashingTempFile-unk (pl. kézzel épített FileStorage)."""
+    spool = HashingTempFile(temp_dir(), max_file_size())
+    try:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+            spool.write(chunk)
+    except Exception:
+        spool.close()
+        raise
+    return spool
+
+
+def spool(file_storage):
+    """A feltöltött fájl kész (hash-elt, méretében ellenőrzött) ideiglenes fájlja."""
+    stream = file_storage.stream
+    if isinstance(stream, HashingTempFile):
+        return stream
+    return _copy_to_temp(stream)
+
+
+def safe_filename(file_storage):
+    return secure_filename(file_storage.filename or "") or "file"
+
+
+def url_for_key(key):
+    """Az UPLOAD_FOLDER-hez relatív útvonal -> kiszolgált URL."""
+    return f"/uploads/{key}"
+
+
+def path_for_key(key):
+    return os.path.join(upload_root(), *key.split("/"))
+
+
+def path_for_url(file_url):
+    """/uploads/<kind>/<név> URL -> abszolút útvonal (None, ha kilógna az upload mappából)."""
+    relative = file_url.lstrip("/")
+    if relative.startswith("uploads/"):
+        relative = relative[len("uploads/"):]
+    root = os.path.realpath(upload_root())
+    path = os.path.realpath(os.path.join(root, relative))
+    if os.path.commonpath([root, path]) != root:
+        return None
+    return path
+
+
+def remove_file(file_url):
+    path = path_for_url(file_url)
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def init_uploads(app):
+    app.request_class = UploadRequest
+    app.config.setdefault("UPLOAD_MAX_FILE_SIZE", DEFAULT_MAX_FILE_SIZE)
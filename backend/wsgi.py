@@ -0,0 +1,11 @@
+"""WSGI belépési pont az éles szerverhez: gunicorn -c gunicorn.conf.py wsgi:app
+
+A gunicorn --preload miatt ez a master folyamatban töltődik be, a workerek
+fork-kal öröklik (közös, már importált kód és lefordított sablonok). A
+háttérszálak (email outbox, értesítés fan-out, redis listener) itt nem
+indulnak: szál nem éli túl a fork-ot, ezért a gunicorn.conf.py
+post_worker_init hookja indítja őket minden workerben.
+"""
+from app import create_app
+
+app = create_app(start_background=False)
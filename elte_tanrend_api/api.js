@@ -9,6 +9,15 @@ app.use(cors({ origin: '*' }));
 
 const CACHE = new Map();
 const CACHE_TTL = 10 * 60 * 1000; // 10 perc
+const CACHE_MAX_ENTRIES = 1000; // LRU korlát: a Map beszúrási sorrendje = használati sorrend
+
+function cacheSet(key, value) {
+    CACHE.delete(key);
+    CACHE.set(key, value);
+    while (CACHE.size > CACHE_MAX_ENTRIES) {
+        CACHE.delete(CACHE.keys().next().value);
+    }
+}
 
 const RequestBodySchema = {
     year: (val) => /^\d{4}-\d{4}-\d$/.test(val),
@@ -21,7 +30,11 @@ async function fetchSearchData(searchMode, searchName, year) {
     const cacheKey = `${searchMode}:${searchName}:${year}`;
     
     const cached = CACHE.get(cacheKey);
-    if (cached && Date.now() - cached.timestamp < CACHE_TTL) return cached.data;
+    if (cached && Date.now() - cached.timestamp < CACHE_TTL) {
+        cacheSet(cacheKey, cached);
+        return cached.data;
+    }
+    if (cached) CACHE.delete(cacheKey);
     
     const controller = new AbortController();
     const timeoutId = setTimeout(() => controller.abort(), 10000);
@@ -45,7 +58,7 @@ async function fetchSearchData(searchMode, searchName, year) {
             if (row.length) data.push(row);
         });
         
-        CACHE.set(cacheKey, { data, timestamp: Date.now() });
+        cacheSet(cacheKey, { data, timestamp: Date.now() });
         return data;
     } catch (e) {
         clearTimeout(timeoutId);